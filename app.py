@@ -2,8 +2,27 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
 import os
+import html
+import tempfile
+
+from campaign_analytics.cube import CUBE_DIMENSIONS, Cube, build_cube
+from campaign_analytics.downsample import DEFAULT_WIDTH_PX, downsample
+from campaign_analytics.filters import FILTER_COLUMNS, BitmapIndex, filter_cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.geo import country_metrics
+from campaign_analytics.incremental import IncrementalStore
+from campaign_analytics.insights import mine_insights, top_findings
+from campaign_analytics.parallel import aggregate_shards, default_workers, resolve_shards
+from campaign_analytics.precompute import precomputer
+from campaign_analytics.profiling import Profiler
+from campaign_analytics.reports import report
+from campaign_analytics.ingestion import MEASURES, MISSING_CATEGORY
+from campaign_analytics.scoring import FEATURES, get_model, score_csv
+from campaign_analytics.shared_cache import shared_cache
+from campaign_analytics.storage import cache_csv, content_hash, iter_chunks
+from campaign_analytics.timeseries import series_store
+from campaign_analytics.uncertainty import CONFIDENCE
 
 # ===================================
 # 🎨 CARREGAR CSS EXTERNO
@@ -23,12 +42,15 @@ load_css()
 # ===================================
 # 📈 FUNÇÃO DE GRÁFICO DE LINHA
 # ===================================
-def create_neon_line_chart(data, title="Performance Trend"):
+def create_neon_line_chart(data, title="Performance Trend", width_px=DEFAULT_WIDTH_PX):
+    # Séries longas são reduzidas por LTTB e desenhadas com WebGL
+    data, webgl = downsample(data, 'x', 'y', width_px)
     fig = px.line(
         data,
         x='x',
         y='y',
-        title=title
+        title=title,
+        render_mode='webgl' if webgl else 'svg'
     )
     fig.update_traces(
         line=dict(color='#00FFFF', width=3),
@@ -60,197 +82,428 @@ def create_metric_card(value, label, change=None, change_type="positive"):
     </div>
     """
 
-# ===================================
-# 🚀 CONFIGURAÇÃO INICIAL
-# ===================================
-st.set_page_config(page_title="AI de Criativos", layout="wide")
+# Datasets e agregados ficam no cache do processo, um por conteúdo, e são
+# compartilhados (somente leitura) por todas as sessões abertas
+def load_cube(cache_file):
+    """Cubo das abas, lido do cache colunar só com as colunas necessárias"""
+    with profiler.stage('load.cube') as etapa:
+        # O nome do arquivo colunar já traz o hash do conteúdo do CSV
+        cube = shared_cache.get(
+            ('cubo', os.path.basename(cache_file)),
+            lambda: build_cube(iter_chunks(cache_file, CUBE_DIMENSIONS + MEASURES))
+        )
+        etapa.rows = cube.rows
+    return cube
+
+def load_shards(shards, workers):
+    """Cubo de vários CSVs; `shards` traz (caminho, tamanho, mtime) para invalidar o cache"""
+    with profiler.stage('load.shards') as etapa:
+        cube = shared_cache.get(('shards', shards), lambda: aggregate_shards([path for path, _, _ in shards], workers))
+        etapa.rows = cube.rows
+    return cube
+
+def upload_hash(uploaded_file):
+    """Hash do conteúdo do upload, calculado uma vez por arquivo enviado e não a cada rerun"""
+    file_id, digest = st.session_state.get('hash_upload', (None, None))
+    if file_id != uploaded_file.file_id:
+        with profiler.stage('load.hash'):
+            digest = content_hash(uploaded_file)
+        st.session_state['hash_upload'] = (uploaded_file.file_id, digest)
+    return digest
+
+def demo_cube():
+    with profiler.stage('load.demo', rows=300):
+        return shared_cache.get(('demo', 300, 42), lambda: Cube().update(generate_campaigns(300, seed=42)))
+
+def render_chart(fig, name):
+    """st.plotly_chart medido como etapa (é aqui que a figura é serializada)"""
+    with profiler.stage(f'render.{name}'):
+        st.plotly_chart(fig, use_container_width=True)
 
 # ===================================
-# 📁 UPLOAD DE ARQUIVO (com limite de 3MB)
+# 🧮 CONTEÚDO DAS ABAS (calculado em segundo plano)
 # ===================================
-st.sidebar.markdown("<h3 style='color: #00FFFF;'>🔼 Upload de Dados</h3>", unsafe_allow_html=True)
+# Cada função recebe o cubo e devolve agregados e figuras prontos para desenhar;
+# rodam no pool do `precomputer`, então não chamam st.* nem o profiler
+def com_barras_de_erro(tabela, metrica):
+    """Distâncias do valor até os limites do intervalo, no formato do error_y do Plotly"""
+    return tabela.assign(
+        erro_mais=tabela[f'{metrica}_max'] - tabela[metrica],
+        erro_menos=tabela[metrica] - tabela[f'{metrica}_min'],
+    )
 
-MAX_FILE_SIZE = 3 * 1024 * 1024  # 3MB
+def aba_cac(cube):
+    # CAC = custo total / conversões do grupo; grupos sem conversão ficam vazios.
+    # Intervalo por bootstrap: grupos pequenos aparecem com barras largas
+    tabela = report(cube, 'cac_por_criativo', intervals=True)
+    fig = px.bar(
+        com_barras_de_erro(tabela, 'cac'), x='tipo_criativo', y='cac', color='cta', barmode='group',
+        error_y='erro_mais', error_y_minus='erro_menos', title="CAC por Tipo de Criativo"
+    )
+    fig.update_traces(marker=dict(line=dict(width=1, color='white')))
+    return {'tabela': tabela, 'fig': fig}
+
+def aba_ctr(cube):
+    # Intervalo de Wilson do CTR de cada tipo
+    ctr_data = report(cube, 'ctr_por_tipo', intervals=True)
+    fig = px.bar(
+        com_barras_de_erro(ctr_data, 'ctr'), x='tipo_criativo', y='ctr',
+        error_y='erro_mais', error_y_minus='erro_menos',
+        title="CTR por Tipo de Criativo", color_discrete_sequence=['#00FFFF']
+    )
+    fig.update_traces(marker=dict(line=dict(width=1, color='white')))
+    return {'fig': fig}
 
-uploaded_file = st.sidebar.file_uploader(
-    "Carregue seu CSV (máx. 3MB)",
-    type=["csv"],
-    help="Arquivos maiores que 3MB serão rejeitados"
-)
+def aba_paises(cube):
+    # Rollup por país (poucas linhas) com o código ISO-3 resolvido uma vez por nome
+    por_pais = country_metrics(cube)
+    desconhecidos = por_pais.loc[por_pais['iso3'].isna() & (por_pais['pais'] != MISSING_CATEGORY), 'pais']
+    # Colunas ausentes no CSV (ou só com células em branco) chegam como MISSING_CATEGORY ou 0
+    totais = cube.rollup(columns=['custo_total', 'receita']).iloc[0]
+    vazias = [col for col, vazia in [('pais', (por_pais['pais'] == MISSING_CATEGORY).all()),
+                                     ('custo_total', totais['custo_total'] == 0),
+                                     ('receita', totais['receita'] == 0)] if vazia]
+    por_pais = por_pais.dropna(subset=['iso3', 'roas'])
+    aba = {'desconhecidos': list(desconhecidos), 'vazias': vazias, 'fig_pais': None, 'fig_mapa': None}
+    if vazias or por_pais.empty:
+        return aba
 
-if uploaded_file is not None:
-    if uploaded_file.size > MAX_FILE_SIZE:
-        st.sidebar.error("❌ Arquivo muito grande! O limite é 3MB.")
-        st.stop()
+    pais_df = por_pais.rename(columns={'pais': 'País', 'roas': 'ROAS'}).sort_values('ROAS', ascending=False)
+    aba['fig_pais'] = px.bar(pais_df, x='País', y='ROAS', title="ROAS por País",
+                             color='ROAS', color_continuous_scale='Blues')
+    # ❌ NÃO use update_layout com propriedades problemáticas
+    aba['fig_mapa'] = px.choropleth(
+        data_frame=por_pais,
+        locations='iso3',
+        locationmode='ISO-3',
+        color='roas',
+        hover_name='pais',
+        hover_data={'iso3': False, 'cac': ':.2f', 'ctr': ':.2%'},
+        color_continuous_scale='deep',
+        title="ROAS por País"
+    )
+    return aba
+
+def linha_achado(achado, status, verbo):
+    sinal = 'mais' if achado['lift'] > 0 else 'menos'
+    return (
+        f"<p><span class='status-indicator {status}'></span> <strong>{html.escape(achado['segmento'])}:</strong> "
+        f"{verbo} {abs(achado['lift']):.0%} {sinal} que a média "
+        f"<small>(q = {achado['q']:.3f})</small></p>"
+    )
+
+def linhas_achados(achados, verbo):
+    # Até 3 segmentos acima e 2 abaixo da média
+    acima = top_findings(achados, 3, 'positive')
+    abaixo = top_findings(achados, 2, 'negative')
+    return ([linha_achado(a, 'status-online', verbo) for _, a in acima.iterrows()]
+            + [linha_achado(a, 'status-warning', verbo) for _, a in abaixo.iterrows()])
+
+def aba_ia(cube):
+    # Segmentos (1 e 2 dimensões) com conversão/CTR significativamente diferente da média
+    achados_cvr = mine_insights(cube, 'cvr')
+    achados_ctr = mine_insights(cube, 'ctr')
+    recomendacoes = linhas_achados(achados_cvr, 'converte')
+    insights = linhas_achados(achados_ctr, 'tem CTR')
+    # Modelo carregado (ou treinado com dados_criativos.csv) só na primeira vez
+    top_criativos = get_model().top_combinations(5)
+    return {'recomendacoes': recomendacoes, 'insights': insights, 'top_criativos': top_criativos}
+
+ABAS = {'cac': aba_cac, 'ctr': aba_ctr, 'paises': aba_paises, 'ia': aba_ia}
+
+def mostrar_aba(nome, mostrar):
+    """Desenha a aba com o resultado pronto, ou um aviso enquanto ele é calculado"""
     try:
-        df = pd.read_csv(uploaded_file)
-        st.sidebar.success(f"✅ Dados carregados! ({uploaded_file.size // 1024} KB)")
+        aba = precomputer.result(chaves_abas[nome])
     except Exception as e:
-        st.sidebar.error(f"❌ Erro ao ler o CSV: {e}")
-        st.stop()
-else:
-    np.random.seed(42)
-    tipos = ["imagem única", "carrossel", "vídeo curto"]
-    imagens = ["pessoa sorrindo", "produto", "antes/depois"]
-    ctas = ["Compre agora", "Saiba mais", "Comece grátis", "Experimente"]
-    canais = ["Meta Ads", "Google Ads", "TikTok Ads"]
-    
-    data = []
-    for i in range(300):
-        tipo = np.random.choice(tipos)
-        imagem = np.random.choice(imagens)
-        cta = np.random.choice(ctas)
-        canal = np.random.choice(canais)
-        impressoes = np.random.randint(1000, 50000)
-        cliques = np.random.binomial(impressoes, 0.02)
-        leads = np.random.binomial(cliques, 0.1)
-        conversoes = np.random.binomial(leads, 0.05)
-        custo = np.random.uniform(500, 5000)
-        
-        if imagem == "pessoa sorrindo" and cta == "Comece grátis":
-            conversoes = int(conversoes * 1.8)
-        if tipo == "vídeo curto" and canal == "TikTok Ads":
-            conversoes = int(conversoes * 2.0)
-            
-        data.append({
-            'canal': canal,
-            'tipo_criativo': tipo,
-            'imagem_tipo': imagem,
-            'cta': cta,
-            'impressoes': impressoes,
-            'cliques': cliques,
-            'leads': leads,
-            'conversoes': conversoes,
-            'custo_total': custo
-        })
-    df = pd.DataFrame(data)
+        st.error(f"❌ Erro ao calcular esta aba: {e}")
+        return
+    if aba is None:
+        st.info("⏳ Calculando esta aba em segundo plano...")
+    else:
+        mostrar(aba)
 
 # ===================================
-# 🧭 ABAS HORIZONTAIS
+# 🚀 CONFIGURAÇÃO INICIAL
 # ===================================
-tabs = st.tabs([
-    "🏠 Home / Resumo Geral",
-    "🎯 CAC por Criativo",
-    "🎥 Desempenho de Criativos",
-    "📈 Canal & País",
-    "🧠 Sugestões da IA"
-])
-
-# === 1. HOME ===
-with tabs[0]:
-    st.markdown("<h2 class='dashboard-title'>Resumo Geral</h2>", unsafe_allow_html=True)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(create_metric_card("28%", "ROAS", "5.2", "positive"), unsafe_allow_html=True)
-    with col2:
-        st.markdown(create_metric_card("R$ 180", "CAC", "15.3", "positive"), unsafe_allow_html=True)
-    with col3:
-        st.markdown(create_metric_card("48k", "CONVERSÕES", "8.7", "positive"), unsafe_allow_html=True)
-    with col4:
-        st.markdown(create_metric_card("3.2x", "ROI", "4.1", "positive"), unsafe_allow_html=True)
-    
-    line_data = pd.DataFrame({
-        'x': list(range(30)),
-        'y': [20 + 10*np.sin(x/5) + np.random.normal(0, 2) for x in range(30)]
-    })
-    st.plotly_chart(create_neon_line_chart(line_data, "📈 Evolução do ROAS"), use_container_width=True)
-
-# === 2. CAC POR CRIATIVO ===
-with tabs[1]:
-    st.markdown("<h2 class='dashboard-title'>CAC por Criativo</h2>", unsafe_allow_html=True)
-    
-    df['cac'] = df['custo_total'] / df['conversoes'].replace(0, 1)
-    cac_por_criativo = df.groupby(['tipo_criativo', 'cta'])['cac'].mean().reset_index()
-    
-    st.dataframe(cac_por_criativo.style.format({"cac": "R$ {:.2f}"}))
-    
-    fig = px.bar(cac_por_criativo, x='tipo_criativo', y='cac', color='cta', title="CAC por Tipo de Criativo")
-    fig.update_traces(marker=dict(line=dict(width=1, color='white')))
-    st.plotly_chart(fig, use_container_width=True)
-
-# === 3. DESEMPENHO DE CRIATIVOS ===
-with tabs[2]:
-    st.markdown("<h2 class='dashboard-title'>Desempenho de Criativos</h2>", unsafe_allow_html=True)
-
-    st.subheader("🖼️ Pré-visualização de Criativos")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.image("https://via.placeholder.com/150/00FFFF/000000?text=Video+Short", caption="Vídeo curto - Pessoa sorrindo")
-        st.markdown("**CTR:** 3.2% | **CPA:** R$ 58")
-    with col2:
-        st.image("https://via.placeholder.com/150/0080FF/FFFFFF?text=Carrossel", caption="Carrossel - Antes/Depois")
-        st.markdown("**CTR:** 2.8% | **CPA:** R$ 65")
-    with col3:
-        st.image("https://via.placeholder.com/150/40E0D0/000000?text=Imagem+Unica", caption="Imagem única - Produto")
-        st.markdown("**CTR:** 1.9% | **CPA:** R$ 89")
-
-    st.subheader("📊 CTR por Tipo de Criativo")
-    ctr_data = df.groupby('tipo_criativo')['cliques'].sum() / df.groupby('tipo_criativo')['impressoes'].sum()
-    fig_ctr = px.bar(ctr_data, title="CTR por Tipo de Criativo", color_discrete_sequence=['#00FFFF'])
-    fig_ctr.update_traces(marker=dict(line=dict(width=1, color='white')))
-    st.plotly_chart(fig_ctr, use_container_width=True)
-
-# === 4. CANAL & PAÍS ===
-with tabs[3]:
-    st.markdown("<h2 class='dashboard-title'>Desempenho por Canal e País</h2>", unsafe_allow_html=True)
-
-    st.subheader("🌍 ROAS por País")
-    roas_por_pais = {
-        'Brasil': 2.8,
-        'EUA': 3.2,
-        'Alemanha': 2.5,
-        'França': 2.1,
-        'Canadá': 3.0
-    }
-    pais_df = pd.DataFrame(list(roas_por_pais.items()), columns=['País', 'ROAS'])
-    fig_pais = px.bar(pais_df, x='País', y='ROAS', title="ROAS por País", color='ROAS', color_continuous_scale='Blues')
-    st.plotly_chart(fig_pais, use_container_width=True)
-
-    st.subheader("🌎 Mapa de Desempenho por País")
-    mapa_data = pd.DataFrame({
-        'country': ['Brazil', 'United States', 'Germany', 'France', 'Canada', 'UK', 'Japan'],
-        'roas': [2.8, 3.2, 2.5, 2.1, 3.0, 3.1, 2.3]
-    })
-
-    fig_mapa = px.choropleth(
-        data_frame=mapa_data,
-        locations='country',           # ✅ Nome da coluna
-        locationmode='country names',  # ✅ Modo correto
-        color='roas',                  # ✅ Nome da coluna
-        hover_name='country',          # ✅ Nome da coluna
-        color_continuous_scale='deep',
-        range_color=[1.5, 3.5],
-        title="ROAS por País"
+st.set_page_config(page_title="AI de Criativos", layout="wide")
+
+# Painel de depuração antes do `try`: os toggles aparecem mesmo quando a
+# execução para no meio (st.stop()); as etapas só são medidas com ele ligado
+debug = st.sidebar.toggle("🛠️ Painel de depuração", key='painel_depuracao')
+st.sidebar.checkbox("Gravar etapas em .cache/perf.jsonl", key='log_desempenho', disabled=not debug)
+profiler = Profiler(enabled=debug)
+
+try:
+    # ===================================
+    # 📁 UPLOAD DE ARQUIVO (leitura em blocos)
+    # ===================================
+    st.sidebar.markdown("<h3 style='color: #00FFFF;'>🔼 Upload de Dados</h3>", unsafe_allow_html=True)
+
+    uploaded_file = st.sidebar.file_uploader(
+        "Carregue seu CSV",
+        type=["csv"],
+        help="Até 500 MB (o upload fica na memória do servidor). Para arquivos maiores, "
+             "informe o caminho no campo abaixo ou use `python -m campaign_analytics arquivo.csv`"
     )
 
-    # ❌ NÃO use update_layout com propriedades problemáticas
-    st.plotly_chart(fig_mapa, use_container_width=True)
+    append_mode = st.sidebar.checkbox(
+        "➕ Acrescentar ao histórico",
+        help="Soma ao histórico salvo só as linhas com id inédito, sem reprocessar o que já foi carregado"
+    )
 
-# === 5. SUGESTÕES DA IA ===
-with tabs[4]:
-    st.markdown("<h2 class='dashboard-title'>Sugestões da IA</h2>", unsafe_allow_html=True)
+    shard_source = st.sidebar.text_input(
+        "📂 Caminho, pasta ou padrão de CSVs",
+        placeholder="exports/*.csv",
+        help="Lidos direto do disco, em blocos e sem limite de tamanho; "
+             "vários CSVs (ex.: um por canal e dia) são agregados em paralelo"
+    )
+    workers = st.sidebar.number_input(
+        "⚙️ Processos", min_value=1, max_value=64, value=default_workers(),
+        help="Quantos CSVs são agregados ao mesmo tempo (padrão: núcleos da máquina)"
+    )
+
+    if append_mode:
+        store = IncrementalStore()
+        if uploaded_file is not None:
+            # Cada arquivo é acrescentado uma vez por sessão; o id já evita duplicar
+            applied = st.session_state.setdefault('historico_aplicado', set())
+            file_hash = upload_hash(uploaded_file)
+            if file_hash not in applied:
+                try:
+                    with profiler.stage('load.append') as etapa:
+                        added = etapa.rows = store.append(uploaded_file)
+                except Exception as e:
+                    st.sidebar.error(f"❌ Erro ao acrescentar o CSV: {e}")
+                    st.stop()
+                applied.add(file_hash)
+                st.sidebar.success(f"✅ {added:,} linhas novas acrescentadas")
+        cube = store.cube
+        dataset_key = ('historico', str(store.directory), cube.rows)
+        st.sidebar.info(f"📚 Histórico: {cube.rows:,} linhas")
+        if not cube.rows:
+            cube = demo_cube()
+    elif shard_source:
+        shards = resolve_shards(shard_source)
+        if not shards:
+            st.sidebar.error(f"❌ Nenhum CSV encontrado em {shard_source}")
+            st.stop()
+        try:
+            shards = tuple((path, os.path.getsize(path), os.path.getmtime(path)) for path in shards)
+            cube = load_shards(shards, workers)
+            dataset_key = ('shards', shards)
+            st.sidebar.success(f"✅ {len(shards)} shards agregados ({cube.rows:,} linhas)")
+        except Exception as e:
+            st.sidebar.error(f"❌ Erro ao agregar os shards: {e}")
+            st.stop()
+    elif uploaded_file is not None:
+        try:
+            with profiler.stage('load.csv_to_columnar'):
+                cache_file = cache_csv(uploaded_file, digest=upload_hash(uploaded_file))
+            cube = load_cube(cache_file)
+            dataset_key = ('cubo', os.path.basename(cache_file))
+            st.sidebar.success(f"✅ Dados carregados! ({cube.rows:,} linhas, {uploaded_file.size // 1024} KB)")
+        except Exception as e:
+            st.sidebar.error(f"❌ Erro ao ler o CSV: {e}")
+            st.stop()
+    else:
+        cube = demo_cube()
+        dataset_key = ('demo', 300, 42)
+
+    # ===================================
+    # 🔎 FILTROS (bitmaps montados uma vez por dataset)
+    # ===================================
+    st.sidebar.markdown("<h3 style='color: #00FFFF;'>🔎 Filtros</h3>", unsafe_allow_html=True)
+    with profiler.stage('filter.index'):
+        indice = shared_cache.get(('bitmaps', dataset_key), lambda: BitmapIndex.from_cube(cube))
+    rotulos_filtros = {'canal': "Canal", 'tipo_criativo': "Tipo de criativo", 'imagem_tipo': "Imagem", 'cta': "CTA"}
+    filtros = {
+        col: st.sidebar.multiselect(rotulos_filtros[col], indice.values(col), placeholder="Todos", key=f'filtro_{col}')
+        for col in FILTER_COLUMNS if col in indice.bitmaps
+    }
+    if any(filtros.values()):
+        with profiler.stage('filter.apply') as etapa:
+            cube = filter_cube(cube, indice, **filtros)
+            etapa.rows = cube.rows
+        # Os agregados das abas passam a ser por combinação de filtros
+        dataset_key = (dataset_key, tuple((col, tuple(sorted(v))) for col, v in filtros.items() if v))
+        st.sidebar.caption(f"{cube.rows:,} linhas selecionadas")
+
+    # ===================================
+    # ⏳ PRÉ-CÁLCULO DAS ABAS
+    # ===================================
+    # Tudo é agendado de uma vez; cada aba mostra o que já estiver pronto
+    chaves_abas = {nome: ('aba', nome, dataset_key) for nome in ABAS}
+    with profiler.stage('precompute.submit'):
+        for nome, chave in chaves_abas.items():
+            precomputer.submit(chave, lambda calcular=ABAS[nome], cube=cube: calcular(cube))
+
+    # ===================================
+    # 🧭 ABAS HORIZONTAIS
+    # ===================================
+    tabs = st.tabs([
+        "🏠 Home / Resumo Geral",
+        "🎯 CAC por Criativo",
+        "🎥 Desempenho de Criativos",
+        "📈 Canal & País",
+        "🧠 Sugestões da IA"
+    ])
+
+    # === 1. HOME ===
+    with tabs[0]:
+        st.markdown("<h2 class='dashboard-title'>Resumo Geral</h2>", unsafe_allow_html=True)
     
-    st.markdown("""
-    <div class='glass-card'>
-        <h3>🎯 Recomendações Automáticas</h3>
-        <p><span class='status-indicator status-online'></span> <strong>Brasil:</strong> Reduzir TikTok Ads em 20%</p>
-        <p><span class='status-indicator status-warning'></span> <strong>EUA:</strong> Aumentar Google Ads em 15%</p>
-        <p><span class='status-indicator status-online'></span> <strong>Alemanha:</strong> Manter orçamento atual</p>
-        <p><span class='status-indicator status-warning'></span> <strong>CTA ideal:</strong> 'Comece grátis' converte 68% mais</p>
-    </div>
-    """, unsafe_allow_html=True)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(create_metric_card("28%", "ROAS", "5.2", "positive"), unsafe_allow_html=True)
+        with col2:
+            st.markdown(create_metric_card("R$ 180", "CAC", "15.3", "positive"), unsafe_allow_html=True)
+        with col3:
+            st.markdown(create_metric_card("48k", "CONVERSÕES", "8.7", "positive"), unsafe_allow_html=True)
+        with col4:
+            st.markdown(create_metric_card("3.2x", "ROI", "4.1", "positive"), unsafe_allow_html=True)
     
-    st.markdown("""
-    <div class='glass-card'>
-        <h3>💡 Insights da IA</h3>
-        <p>• Criativos com <strong>imagem de pessoa sorrindo</strong> têm CTR 40% maior</p>
-        <p>• Formato <strong>vídeo curto</strong> no TikTok converte 2x mais</p>
-        <p>• Melhor horário: <strong>segundas entre 18h-20h</strong></p>
-    </div>
-    """, unsafe_allow_html=True)
+        # ROAS (receita / investimento) da série temporal, já agregada na granularidade
+        periodos = {"30 dias": (30, 'day'), "12 meses": (365, 'week'), "3 anos": (3 * 365, 'month')}
+        periodo = st.selectbox("Período", list(periodos))
+        with profiler.stage('load.timeseries') as etapa:
+            serie = series_store().last(*periodos[periodo])
+            etapa.rows = len(serie)
+        line_data = pd.DataFrame({'x': serie['date'], 'y': serie['roas']})
+        with profiler.stage('chart.roas'):
+            fig_roas = create_neon_line_chart(line_data, "📈 Evolução do ROAS")
+        render_chart(fig_roas, 'roas')
 
-# ===================================
-# 📦 RODAPÉ
-# ===================================
-st.markdown("<div class='footer'>💼 Projeto de portfólio | by [Seu Nome]</div>", unsafe_allow_html=True)
+    # === 2. CAC POR CRIATIVO ===
+    with tabs[1]:
+        st.markdown("<h2 class='dashboard-title'>CAC por Criativo</h2>", unsafe_allow_html=True)
+
+        def mostrar_cac(aba):
+            st.dataframe(aba['tabela'].style.format(
+                {"cac": "R$ {:.2f}", "cac_min": "R$ {:.2f}", "cac_max": "R$ {:.2f}"}, na_rep="sem conversões"
+            ))
+            st.caption(f"cac_min / cac_max: intervalo de {CONFIDENCE:.0%} (bootstrap sobre as células do cubo)")
+            render_chart(aba['fig'], 'cac_por_criativo')
+
+        mostrar_aba('cac', mostrar_cac)
+
+    # === 3. DESEMPENHO DE CRIATIVOS ===
+    with tabs[2]:
+        st.markdown("<h2 class='dashboard-title'>Desempenho de Criativos</h2>", unsafe_allow_html=True)
+
+        st.subheader("🖼️ Pré-visualização de Criativos")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.image("https://via.placeholder.com/150/00FFFF/000000?text=Video+Short",
+                     caption="Vídeo curto - Pessoa sorrindo")
+            st.markdown("**CTR:** 3.2% | **CPA:** R$ 58")
+        with col2:
+            st.image("https://via.placeholder.com/150/0080FF/FFFFFF?text=Carrossel",
+                     caption="Carrossel - Antes/Depois")
+            st.markdown("**CTR:** 2.8% | **CPA:** R$ 65")
+        with col3:
+            st.image("https://via.placeholder.com/150/40E0D0/000000?text=Imagem+Unica",
+                     caption="Imagem única - Produto")
+            st.markdown("**CTR:** 1.9% | **CPA:** R$ 89")
+
+        st.subheader("📊 CTR por Tipo de Criativo")
+        mostrar_aba('ctr', lambda aba: render_chart(aba['fig'], 'ctr_por_tipo'))
+
+    # === 4. CANAL & PAÍS ===
+    with tabs[3]:
+        st.markdown("<h2 class='dashboard-title'>Desempenho por Canal e País</h2>", unsafe_allow_html=True)
+
+        def mostrar_paises(aba):
+            if aba['vazias']:
+                colunas = ', '.join(f"`{col}`" for col in aba['vazias'])
+                st.info(f"ℹ️ Sem ROAS por país: os dados não têm (ou só têm células em branco em) {colunas}.")
+            elif aba['fig_pais'] is None:
+                st.info("ℹ️ Nenhum país dos dados foi reconhecido.")
+            else:
+                st.subheader("🌍 ROAS por País")
+                render_chart(aba['fig_pais'], 'roas_por_pais')
+                st.subheader("🌎 Mapa de Desempenho por País")
+                render_chart(aba['fig_mapa'], 'mapa')
+            if aba['desconhecidos']:
+                st.caption(f"⚠️ Países não reconhecidos (fora do mapa): {', '.join(aba['desconhecidos'])}")
+
+        mostrar_aba('paises', mostrar_paises)
+
+    # === 5. SUGESTÕES DA IA ===
+    with tabs[4]:
+        st.markdown("<h2 class='dashboard-title'>Sugestões da IA</h2>", unsafe_allow_html=True)
+
+        def mostrar_ia(aba):
+            recomendacoes = (''.join(aba['recomendacoes'])
+                             or '<p>Nenhum segmento converte de forma significativamente diferente da média.</p>')
+            insights = (''.join(aba['insights'])
+                        or '<p>Nenhum segmento tem CTR significativamente diferente da média.</p>')
+            st.markdown(f"""
+            <div class='glass-card'>
+                <h3>🎯 Recomendações Automáticas</h3>
+                {recomendacoes}
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.markdown(f"""
+            <div class='glass-card'>
+                <h3>💡 Insights da IA</h3>
+                {insights}
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.subheader("🤖 Combinações com maior probabilidade de sucesso")
+            st.dataframe(
+                aba['top_criativos'][FEATURES + ['probabilidade_sucesso']]
+                .style.format({'probabilidade_sucesso': '{:.0%}'}),
+                hide_index=True
+            )
+
+        mostrar_aba('ia', mostrar_ia)
+
+        if uploaded_file is not None and st.button("🎯 Pontuar criativos do arquivo"):
+            # Pontuado em blocos direto para um arquivo temporário, sem juntar o resultado na memória
+            with tempfile.TemporaryDirectory() as pasta:
+                saida = os.path.join(pasta, "previsoes_criativos.csv")
+                uploaded_file.seek(0)
+                with profiler.stage('score.csv') as etapa:
+                    etapa.rows = score_csv(uploaded_file, saida)
+                with open(saida, 'rb') as previsoes:
+                    st.download_button(
+                        "⬇️ Baixar previsões (CSV)",
+                        previsoes,
+                        file_name="previsoes_criativos.csv",
+                        mime="text/csv"
+                    )
+
+    # Abas ainda em cálculo: um fragmento consulta a fila e recarrega a página quando algo fica pronto
+    pendentes = precomputer.pending(chaves_abas.values())
+    if pendentes:
+        @st.fragment(run_every=0.5)
+        def aguardar_abas():
+            if len(precomputer.pending(pendentes)) < len(pendentes):
+                st.rerun()
+
+        aguardar_abas()
+
+    # ===================================
+    # 📦 RODAPÉ
+    # ===================================
+    st.markdown("<div class='footer'>💼 Projeto de portfólio | by [Seu Nome]</div>", unsafe_allow_html=True)
+
+    # ===================================
+    # 🛠️ PAINEL DE DEPURAÇÃO
+    # ===================================
+    if profiler.enabled:
+        etapas = profiler.summary()
+        with st.sidebar.expander("🛠️ Etapas desta execução", expanded=True):
+            st.dataframe(
+                etapas.style.format({'ms': '{:.1f}', 'pico_mb': '{:.1f}', 'linhas': '{:,.0f}'}, na_rep='—'),
+                hide_index=True
+            )
+            st.caption(f"Cache compartilhado: {shared_cache.stats()}")
+        if st.session_state.get('log_desempenho'):
+            profiler.export_jsonl(script='app.py')
+finally:
+    # Também quando a execução para antes do fim (st.stop(), exceção, novo rerun)
+    profiler.close()
@@ -0,0 +1,206 @@
+# benchmarks/run.py
+"""Suíte de benchmarks: ingestão, agregação, pontuação, dados de demo e gráficos.
+
+Uso: python -m benchmarks.run [--sizes 10000 1000000 10000000] [-o resultados.json]
+                              [--compare resultados_anteriores.json]
+
+Para cada tamanho é gerado um CSV no formato de `dados_criativos.csv`; cada
+caso registra o melhor tempo em `--repeat` execuções e o pico de memória
+(tracemalloc) em JSON, para comparar execuções e achar regressões.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pcsv
+
+from benchmarks.bench_metrics import measure
+from campaign_analytics import charts
+from campaign_analytics.attribution import Paths, attribute, generate_paths
+from campaign_analytics.cube import CUBE_DIMENSIONS, Cube
+from campaign_analytics.filters import BitmapIndex
+from campaign_analytics.generator import generate_campaigns, generate_dashboard_data
+from campaign_analytics.live import MinuteWindow, synthetic_events
+from campaign_analytics.ingestion import DTYPES, MEASURES
+from campaign_analytics.metrics import grouped_metrics
+from campaign_analytics.reports import report
+from campaign_analytics.schema import MISSING_CATEGORY, CodeTable
+from campaign_analytics.scoring import ScoringModel
+from campaign_analytics.storage import cache_csv, load_columns
+from campaign_analytics.uncertainty import metric_intervals
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+# Tempo acima disso (em relação à execução comparada) é marcado como regressão
+REGRESSION_RATIO = 1.2
+# Casos mais rápidos que isso oscilam demais para serem comparados
+MIN_SECONDS = 0.005
+
+
+def write_csv(df, path):
+    """CSV do DataFrame com a coluna `id` (via pyarrow, bem mais rápido que to_csv)."""
+    table = pa.Table.from_pandas(df.rename_axis('id').reset_index(), preserve_index=False)
+    # O escritor de CSV não aceita colunas de dicionário
+    table = table.cast(pa.schema([
+        field.with_type(pa.string()) if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ]))
+    pcsv.write_csv(table, path)
+
+
+def read_csv(path):
+    return pd.read_csv(path, dtype=DTYPES, usecols=lambda col: col in DTYPES)
+
+
+def minute_series(size):
+    """Série de CAC com `size` pontos (um por minuto) para o gráfico de evolução."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=size, freq='min'),
+        'cac': 50 + rng.normal(0, 5, size).cumsum() / np.sqrt(size),
+    })
+
+
+def sized_cases(size, workdir):
+    """Casos que dependem do número de linhas: (nome, função, argumento)."""
+    df = generate_campaigns(size, seed=0)
+    csv_path = workdir / f'criativos_{size}.csv'
+    write_csv(df, csv_path)
+    arrow_path = cache_csv(csv_path, cache_dir=workdir / 'colunar')
+    # Tabela de códigos só em memória: o benchmark não grava na tabela do usuário
+    table = CodeTable()
+    cube = Cube(table=table).update(df)
+    # Modelo ajustado em memória: o benchmark não treina nem grava o modelo do
+    # usuário. O gerador não tem texto_criativo, que chega à ingestão como n/d
+    model = ScoringModel.fit(df.assign(texto_criativo=MISSING_CATEGORY))
+    index = BitmapIndex.from_frame(df, table=table)
+    selection = {'canal': ['Meta Ads', 'TikTok Ads'], 'cta': ['Comece grátis']}
+    conversions = iter(range(10 ** 9))
+    live_events = synthetic_events(size, np.random.default_rng(0), time.time() - 3600, 3600)
+    # Um caminho de usuário por linha do tamanho
+    path_log = generate_paths(size, seed=0)
+    paths = Paths.from_log(*path_log)
+
+    return [
+        ('csv_load.read_csv', read_csv, csv_path),
+        # Diretório novo a cada execução para medir a conversão, não o acerto do cache
+        ('csv_load.columnar_convert',
+         lambda path: cache_csv(path, cache_dir=workdir / f'conv-{next(conversions)}'), csv_path),
+        ('csv_load.columnar_read', lambda path: load_columns(path, CUBE_DIMENSIONS + MEASURES), arrow_path),
+        ('aggregate.cube_build', lambda frame: Cube(table=table).update(frame), df),
+        ('aggregate.cac_por_criativo', lambda frame: grouped_metrics(frame, ['tipo_criativo', 'cta'], ['cac']), df),
+        ('aggregate.cac_por_criativo_cube', lambda c: report(c, 'cac_por_criativo'), cube),
+        ('aggregate.ctr_por_tipo', lambda frame: grouped_metrics(frame, ['tipo_criativo'], ['ctr']), df),
+        ('uncertainty.cac_bootstrap', lambda c: metric_intervals(c, ['tipo_criativo', 'cta'], 'cac'), cube),
+        ('uncertainty.ctr_wilson', lambda c: metric_intervals(c, ['tipo_criativo'], 'ctr'), cube),
+        ('filter.bitmap_index', lambda frame: BitmapIndex.from_frame(frame, table=table), df),
+        ('filter.bitmap_select', lambda s: index.mask(**s), selection),
+        ('filter.bitmap_aggregate', lambda s: index.aggregate(df, MEASURES, **s), selection),
+        ('scoring.predict_proba', model.predict_proba, df),
+        ('generate.campaigns', lambda n: generate_campaigns(n, seed=1), size),
+        ('live.window_add', lambda events: MinuteWindow().add(events), live_events),
+        ('attribution.from_log', lambda log: Paths.from_log(*log), path_log),
+        ('attribution.attribute', attribute, paths),
+        ('chart.cac_evolution', charts.cac_evolution_figure, minute_series(size)),
+    ]
+
+
+def fixed_cases():
+    """Casos de tamanho fixo (dados e gráficos do modern_dashboard.py)."""
+    _, channel_df, daily_df = generate_dashboard_data(seed=42)
+    return [
+        ('generate.dashboard_data', lambda seed: generate_dashboard_data(seed=seed), 42),
+        ('chart.cac_evolution_90d', charts.cac_evolution_figure, daily_df),
+        ('chart.spend_donut', charts.spend_donut_figure, channel_df),
+        ('chart.cac_bar', charts.cac_bar_figure, channel_df),
+        ('chart.cac_ctr_scatter', charts.cac_ctr_scatter_figure, channel_df),
+        ('chart.quality_gauge', charts.quality_gauge_figure, channel_df),
+    ]
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(sizes, repeat):
+    results = []
+
+    def record(name, func, arg, rows):
+        seconds, peak = measure(func, arg, repeat)
+        results.append({'case': name, 'rows': rows, 'seconds': seconds, 'peak_mb': peak})
+        print(f"{rows if rows is not None else '-':>12} {name:<34} {seconds:>10.4f} {peak:>10.1f}", flush=True)
+
+    print(f"{'linhas':>12} {'caso':<34} {'tempo (s)':>10} {'pico (MB)':>10}")
+    for name, func, arg in fixed_cases():
+        record(name, func, arg, None)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, func, arg in sized_cases(size, Path(workdir)):
+                record(name, func, arg, size)
+    return results
+
+
+def compare(results, previous):
+    """Imprime a razão de tempos contra uma execução anterior e devolve as regressões."""
+    before = {(r['case'], r['rows']): r['seconds'] for r in previous['results']}
+    regressions = []
+    print(f"\n{'linhas':>12} {'caso':<34} {'antes':>10} {'agora':>10} {'razão':>7}")
+    for r in results:
+        old = before.get((r['case'], r['rows']))
+        if not old:
+            continue
+        ratio = r['seconds'] / old
+        flag = ' ⚠️' if ratio > REGRESSION_RATIO and r['seconds'] > MIN_SECONDS else ''
+        if flag:
+            regressions.append(r)
+        rows = r['rows'] if r['rows'] is not None else '-'
+        print(f"{rows:>12} {r['case']:<34} {old:>10.4f} {r['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default='benchmarks/resultados.json')
+    parser.add_argument('--compare', help="JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat)
+    payload = {'meta': metadata(), 'results': results}
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(payload, indent=2))
+    print(f"\nResultados gravados em {args.output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        if compare(results, previous):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
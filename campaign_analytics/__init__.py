@@ -0,0 +1 @@
+"""Camada de análise dos dashboards de criativos (sem dependência do Streamlit)."""
@@ -0,0 +1,5 @@
+import sys
+
+from campaign_analytics.cli import main
+
+sys.exit(main())
@@ -0,0 +1,247 @@
+# campaign_analytics/charts.py
+"""Gráficos Plotly do modern_dashboard.py, com template e cache de figuras.
+
+O tema escuro é registrado uma vez como template do Plotly (`cac_dark`) em vez
+de um dicionário de layout recriado a cada gráfico, e as figuras prontas ficam
+em um cache LRU indexado pelo hash dos dados e pelos parâmetros do gráfico:
+um rerun que não muda os dados de um gráfico não reconstrói a figura.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from campaign_analytics.downsample import DEFAULT_WIDTH_PX, downsample
+
+# ===================================
+# 🎨 TEMPLATE ESCURO
+# ===================================
+TEMPLATE = 'cac_dark'
+
+_axis = {
+    'gridcolor': 'rgba(255,255,255,0.1)',
+    'zerolinecolor': 'rgba(255,255,255,0.1)',
+    'color': '#ffffff'
+}
+pio.templates[TEMPLATE] = go.layout.Template(layout={
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'font': {'color': '#ffffff'},
+    'title': {'font': {'color': '#00FFFF'}},
+    'xaxis': _axis,
+    'yaxis': _axis
+})
+
+
+# ===================================
+# 🗄️ CACHE DE FIGURAS
+# ===================================
+def data_hash(data):
+    """Hash estável do conteúdo de um DataFrame/Series."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        values = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+        if isinstance(data, pd.DataFrame):
+            digest.update(repr(list(data.columns)).encode())
+        return digest.hexdigest()
+    return hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """LRU de figuras prontas, limitado a `maxsize` entradas."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, builder, *data, **params):
+        """Figura de `builder(*data, **params)`, construída só se não estiver no cache."""
+        key = (builder.__qualname__, tuple(data_hash(item) for item in data), tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+        figure = builder(*data, **params)
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+# Cache do processo: sobrevive aos reruns do Streamlit e é compartilhado entre sessões
+figure_cache = FigureCache()
+
+
+# ===================================
+# 📈 GRÁFICOS DO MODERN DASHBOARD
+# ===================================
+def cac_evolution_figure(daily_df, reduction=0.3, days=90, width_px=DEFAULT_WIDTH_PX):
+    """CAC diário atual e otimizado (séries longas são reduzidas e usam WebGL)."""
+    daily_df, webgl = downsample(daily_df, 'date', 'cac', width_px)
+    trace = go.Scattergl if webgl else go.Scatter
+    fig = go.Figure()
+
+    # Linha principal com glow effect
+    fig.add_trace(trace(
+        x=daily_df['date'],
+        y=daily_df['cac'],
+        mode='lines',
+        name='CAC Atual',
+        line=dict(color='#00FFFF', width=3),
+        fill='tonexty'
+    ))
+
+    # Linha otimizada
+    fig.add_trace(trace(
+        x=daily_df['date'],
+        y=daily_df['cac'] * (1 - reduction),
+        mode='lines',
+        name='CAC Otimizado',
+        line=dict(color='#00FF80', width=3, dash='dash'),
+        fill='tonexty'
+    ))
+
+    fig.update_layout(
+        template=TEMPLATE,
+        title={'text': f"📈 CAC Evolution - Last {days} Days", 'x': 0.02, 'font': {'size': 20}},
+        height=400,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def live_cac_figure(series, minutes=60):
+    """CAC de cada minuto da janela ao vivo (minutos sem conversão ficam em branco)."""
+    fig = go.Figure(go.Scatter(
+        x=series['date'],
+        y=series['cac'],
+        mode='lines+markers',
+        name='CAC',
+        line=dict(color='#00FFFF', width=3),
+        marker=dict(size=4),
+    ))
+    fig.update_layout(
+        template=TEMPLATE,
+        title={'text': f"📡 Live CAC - Last {minutes} Minutes", 'x': 0.02, 'font': {'size': 20}},
+        height=400,
+        showlegend=False,
+        uirevision='live',
+    )
+    return fig
+
+
+def spend_donut_figure(channel_df):
+    """Participação de cada canal no investimento."""
+    fig = go.Figure(data=[go.Pie(
+        labels=channel_df['channel'],
+        values=channel_df['spend'],
+        hole=0.6,
+        marker=dict(
+            colors=['#00FFFF', '#0080FF', '#40E0D0', '#00CED1', '#20B2AA'],
+            line=dict(color='#000000', width=2)
+        ),
+        textinfo='label+percent',
+        textfont=dict(color='#ffffff')
+    )])
+
+    fig.update_layout(
+        template=TEMPLATE,
+        title={'text': "💰 Spend by Channel", 'x': 0.5, 'font': {'size': 16}},
+        height=300,
+        showlegend=False,
+        annotations=[dict(text='SPEND', x=0.5, y=0.5, font_size=20, showarrow=False, font_color='#00FFFF')]
+    )
+    return fig
+
+
+def cac_bar_figure(channel_df):
+    """CAC de cada canal."""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=channel_df['channel'],
+            y=channel_df['cac'],
+            marker=dict(color='#00FFFF', line=dict(color='#ffffff', width=1)),
+            text=[f'R$ {x:.1f}' for x in channel_df['cac']],
+            textposition='outside'
+        )
+    ])
+
+    fig.update_layout(
+        template=TEMPLATE,
+        title={'text': "📊 CAC by Channel", 'font': {'size': 16}},
+        height=300,
+        xaxis_tickangle=-45
+    )
+    return fig
+
+
+def cac_ctr_scatter_figure(channel_df):
+    """CAC × CTR por canal, com o tamanho do ponto proporcional ao investimento."""
+    fig = go.Figure(data=[
+        go.Scatter(
+            x=channel_df['cac'],
+            y=channel_df['ctr'],
+            mode='markers+text',
+            marker=dict(
+                size=channel_df['spend'] / 1000,
+                color='#00FFFF',
+                opacity=0.7,
+                line=dict(width=2, color='#ffffff')
+            ),
+            text=channel_df['channel'],
+            textposition="top center",
+            textfont=dict(color='#ffffff')
+        )
+    ])
+
+    fig.update_layout(
+        template=TEMPLATE,
+        title={'text': "🎯 CAC vs CTR", 'font': {'size': 16}},
+        height=300,
+        xaxis_title="CAC (R$)",
+        yaxis_title="CTR (%)"
+    )
+    return fig
+
+
+def quality_gauge_figure(channel_df):
+    """Quality score médio dos canais."""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=channel_df['quality_score'].mean(),
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "⭐ Avg Quality Score", 'font': {'color': '#00FFFF'}},
+        delta={'reference': 8.0, 'increasing': {'color': '#00FF80'}, 'decreasing': {'color': '#FF4444'}},
+        gauge={
+            'axis': {'range': [None, 10], 'tickcolor': '#ffffff'},
+            'bar': {'color': "#00FFFF"},
+            'steps': [
+                {'range': [0, 5], 'color': "rgba(255, 68, 68, 0.3)"},
+                {'range': [5, 7], 'color': "rgba(255, 255, 0, 0.3)"},
+                {'range': [7, 10], 'color': "rgba(0, 255, 128, 0.3)"}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 4},
+                'thickness': 0.75,
+                'value': 8.5
+            }
+        }
+    ))
+
+    fig.update_layout(template=TEMPLATE, height=300)
+    return fig
@@ -0,0 +1,84 @@
+# campaign_analytics/cli.py
+"""Linha de comando das métricas, para jobs sem interface:
+
+    python -m campaign_analytics dados_criativos.csv -o relatorios --format parquet
+    python -m campaign_analytics 'exports/*.csv' --format json -o -
+    python -m campaign_analytics dados_criativos.csv --intervals -r cac_por_criativo
+
+Calcula as tabelas de `reports.py` (CAC por criativo, CTR por tipo, ROAS por
+canal e por país) e grava um arquivo por tabela. pandas e companhia só são
+importados depois dos argumentos lidos, e Streamlit/Plotly nunca.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+FORMATS = ('parquet', 'json')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m campaign_analytics',
+        description="Calcula as tabelas de CAC/CTR/ROAS de um CSV (ou de vários shards).",
+    )
+    parser.add_argument('source', help="CSV, diretório ou padrão glob de CSVs")
+    parser.add_argument('-o', '--output', default='relatorios',
+                        help="diretório de saída ('-' grava um único JSON na saída padrão)")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='parquet')
+    parser.add_argument('-r', '--report', action='append', dest='reports',
+                        help="relatório de reports.REPORTS a calcular (pode repetir; padrão: todos)")
+    parser.add_argument('-i', '--intervals', action='store_true',
+                        help="acrescenta o intervalo de confiança de cada métrica (<métrica>_min/_max)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="processos para vários shards (padrão: núcleos da máquina)")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    return parser
+
+
+def write_tables(tables, output, fmt):
+    """Grava cada tabela em `output/<nome>.<fmt>` e devolve os caminhos."""
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = output / f'{name}.{fmt}'
+        if fmt == 'parquet':
+            table.to_parquet(path, index=False)
+        else:
+            table.to_json(path, orient='records', force_ascii=False, indent=2)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.output == '-' and args.format != 'json':
+        parser.error("a saída padrão ('-o -') só aceita --format json")
+
+    from campaign_analytics.parallel import aggregate_shards
+    from campaign_analytics.reports import REPORTS, compute_reports
+
+    unknown = sorted(set(args.reports or ()) - set(REPORTS))
+    if unknown:
+        parser.error(f"relatórios desconhecidos: {', '.join(unknown)} (opções: {', '.join(REPORTS)})")
+
+    start = time.perf_counter()
+    cube = aggregate_shards(args.source, args.workers)
+    tables = compute_reports(cube, args.reports, args.intervals)
+
+    if args.output == '-':
+        import json
+        payload = {name: json.loads(table.to_json(orient='records', force_ascii=False))
+                   for name, table in tables.items()}
+        json.dump(payload, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    else:
+        paths = write_tables(tables, args.output, args.format)
+        if not args.quiet:
+            for path in paths:
+                print(path)
+    if not args.quiet:
+        print(f"{cube.rows:,} linhas em {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
@@ -0,0 +1,103 @@
+# campaign_analytics/cube.py
+"""Cubo OLAP pré-agregado sobre as dimensões dos criativos.
+
+As medidas aditivas são somadas uma única vez para cada combinação de
+canal × tipo_criativo × imagem_tipo × cta × pais. Qualquer agrupamento (rollup),
+filtro (`filters.filter_cube`) ou razão derivada é então calculado sobre as
+células do cubo, cujo número não depende da quantidade de linhas dos dados.
+
+Os blocos são agrupados pelos códigos estáveis da `CodeTable` (ver
+`schema.py`): as categorias de cada dimensão são as mesmas em todo bloco,
+então o agrupamento é um `np.bincount` sobre inteiros e só as células
+resultantes viram rótulos de texto.
+
+Além das somas, o cubo guarda os segundos momentos das colunas das razões
+(Σx², Σy² e Σxy de cada par numerador/denominador): é o que o bootstrap de
+`uncertainty.py` precisa para a variação dentro de cada célula. Eles não
+aparecem nos rollups, a não ser que sejam pedidos em `columns`.
+"""
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.ingestion import MEASURES, normalize_chunk
+from campaign_analytics.metrics import METRICS, RATIOS, grouped_sums, ratio_metrics
+from campaign_analytics.schema import code_table
+
+CUBE_DIMENSIONS = ['canal', 'tipo_criativo', 'imagem_tipo', 'cta', 'pais']
+
+
+def moment_column(a, b):
+    """Nome da coluna com a soma de `a * b` (ex.: `conversoes*custo_total`)."""
+    a, b = sorted((a, b))
+    return f'{a}*{b}'
+
+
+# Pares (x, y) com Σxy no cubo: quadrados e produto cruzado de cada razão
+MOMENT_PAIRS = sorted({
+    tuple(sorted(pair))
+    for numerator, denominator in RATIOS.values()
+    for pair in ((numerator, numerator), (denominator, denominator), (numerator, denominator))
+})
+MOMENTS = [moment_column(a, b) for a, b in MOMENT_PAIRS]
+
+# Colunas das somas que vão para os rollups; `linhas` é a contagem de criativos por célula
+SUMMARY_MEASURES = MEASURES + ['linhas']
+CUBE_MEASURES = MEASURES + MOMENTS + ['linhas']
+
+
+class Cube:
+    """Células com as somas das medidas, indexadas pelas dimensões."""
+
+    def __init__(self, dimensions=CUBE_DIMENSIONS, table=None):
+        self.dimensions = list(dimensions)
+        self.table = table if table is not None else code_table()
+        self.rows = 0
+        index = pd.MultiIndex.from_arrays([[] for _ in self.dimensions], names=self.dimensions)
+        self.cells = pd.DataFrame(0.0, index=index, columns=CUBE_MEASURES)
+
+    def update(self, chunk):
+        """Incorpora um bloco de linhas ao cubo."""
+        chunk = normalize_chunk(chunk)
+        frame = pd.DataFrame({
+            **{dim: self.table.categorical(dim, chunk[dim]) for dim in self.dimensions},
+            **{col: chunk[col].to_numpy(dtype='float64') for col in MEASURES},
+        })
+        for a, b in MOMENT_PAIRS:
+            frame[moment_column(a, b)] = frame[a].to_numpy() * frame[b].to_numpy()
+        part = grouped_sums(frame, self.dimensions, MEASURES + MOMENTS, count_column='linhas')
+        self._add_cells(part, len(chunk))
+        return self
+
+    def merge(self, other):
+        """Soma as células de outro cubo com as mesmas dimensões."""
+        if other.dimensions != self.dimensions:
+            raise ValueError(f"Dimensões diferentes: {other.dimensions} != {self.dimensions}")
+        self._add_cells(other.cells, other.rows)
+        return self
+
+    def _add_cells(self, cells, rows):
+        if len(self.cells):
+            cells = self.cells.add(cells, fill_value=0)
+        self.cells = cells[CUBE_MEASURES].astype({'linhas': 'int64'})
+        self.rows += rows
+
+    def rollup(self, dims=(), columns=SUMMARY_MEASURES):
+        """Somas de `columns` agregadas pelas dimensões `dims` (ou o total, se vazio)."""
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        cells = self.cells[list(columns)]
+        if not dims:
+            return cells.sum().to_frame('total').T
+        return cells.groupby(level=dims, sort=True).sum()
+
+    def metrics(self, dims=(), metrics=METRICS, zero_division=np.nan):
+        """Rollup com as métricas derivadas (razões de somas, ver `metrics.py`)."""
+        return ratio_metrics(self.rollup(dims), metrics, zero_division)
+
+
+def build_cube(chunks, dimensions=CUBE_DIMENSIONS, table=None):
+    """Acumula uma sequência de blocos (DataFrames) em um `Cube`."""
+    cube = Cube(dimensions, table)
+    for chunk in chunks:
+        cube.update(chunk)
+    return cube
+
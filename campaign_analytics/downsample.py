@@ -0,0 +1,69 @@
+# campaign_analytics/downsample.py
+"""Redução de séries temporais longas antes de enviá-las ao navegador.
+
+Acima de `WEBGL_THRESHOLD` pontos a série é reduzida no servidor com LTTB
+(largest-triangle-three-buckets) para cerca de um ponto por pixel do gráfico
+e desenhada com WebGL (`Scattergl`). Assim o tamanho do payload e o tempo de
+renderização ficam limitados, não importa quantos anos de histórico existam.
+"""
+import numpy as np
+import pandas as pd
+
+WEBGL_THRESHOLD = 2000
+DEFAULT_WIDTH_PX = 1000
+
+
+def _as_float(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype='float64')
+    return values.to_numpy(dtype='float64')
+
+
+def lttb_indices(x, y, n_out):
+    """Índices dos `n_out` pontos que melhor preservam a forma da série.
+
+    O primeiro e o último ponto são mantidos; os demais são divididos em
+    `n_out - 2` baldes e de cada balde fica o ponto que forma o maior
+    triângulo com o ponto escolhido no balde anterior e a média do próximo.
+    """
+    x = _as_float(x)
+    y = _as_float(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Limites dos baldes internos (o primeiro e o último ponto ficam sozinhos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    # Média de cada balde, usada como terceiro vértice do triângulo
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        # Área (dobrada) do triângulo para todos os pontos do balde de uma vez
+        area = np.abs((ax - cx) * (y[start:stop] - ay) - (ax - x[start:stop]) * (cy - ay))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(df, x, y, width_px=DEFAULT_WIDTH_PX, threshold=WEBGL_THRESHOLD):
+    """Recorte de `df` para o gráfico e se ele deve usar WebGL.
+
+    Séries de até `threshold` pontos passam inteiras (SVG); acima disso são
+    reduzidas a `width_px` pontos por LTTB sobre a coluna `y`.
+    """
+    if len(df) <= threshold:
+        return df, False
+    df = df.sort_values(x)
+    return df.iloc[lttb_indices(df[x], df[y], width_px)], True
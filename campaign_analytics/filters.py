@@ -0,0 +1,112 @@
+# campaign_analytics/filters.py
+"""Filtros por bitmaps das dimensões categóricas.
+
+O índice guarda, para cada valor de cada coluna, um bitmap com um bit por
+linha (empacotado em `uint8`, 1/8 do tamanho de uma máscara booleana). Ele é
+montado uma vez por dataset; depois qualquer combinação de filtros é um OR
+dos bitmaps dos valores escolhidos em cada coluna e um AND entre colunas,
+sem reler nem reagrupar os dados:
+
+    index = BitmapIndex.from_frame(df)
+    mask = index.mask(canal=['Meta Ads'], cta=['Comece grátis', 'Saiba mais'])
+
+Nos dashboards as "linhas" são as células do cubo (cada uma já resume todas
+as linhas com aquela combinação de dimensões), então filtrar custa o mesmo
+para 10 mil ou 10 milhões de linhas.
+"""
+import numpy as np
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.metrics import grouped_sums
+from campaign_analytics.schema import code_table
+
+FILTER_COLUMNS = ['canal', 'tipo_criativo', 'imagem_tipo', 'cta']
+
+# Bits ligados de cada byte, para contar linhas sem desempacotar
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+class BitmapIndex:
+    """Bitmaps por valor de cada coluna, indexados pelo código estável do valor."""
+
+    def __init__(self, rows, bitmaps, table=None):
+        self.rows = rows
+        self.table = table if table is not None else code_table()
+        # {coluna: {código: bitmap}}
+        self.bitmaps = bitmaps
+        self._all = np.packbits(np.ones(rows, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df, columns=FILTER_COLUMNS, table=None):
+        """Índice das `columns` de `df` (categóricas ou texto)."""
+        table = table if table is not None else code_table()
+        bitmaps = {}
+        for col in columns:
+            if col not in df:
+                continue
+            codes = table.codes(col, df[col])
+            present = np.flatnonzero(np.bincount(codes[codes >= 0]))
+            bitmaps[col] = {int(code): np.packbits(codes == code) for code in present}
+        return cls(len(df), bitmaps, table)
+
+    @classmethod
+    def from_cube(cls, cube, columns=FILTER_COLUMNS):
+        """Índice sobre as células do cubo (uma "linha" por célula)."""
+        cells = cube.cells.index.to_frame(index=False)
+        return cls.from_frame(cells, [col for col in columns if col in cube.dimensions], cube.table)
+
+    def values(self, column):
+        """Valores de `column` presentes nos dados, na ordem dos códigos."""
+        labels = self.table.values(column)
+        return [labels[code] for code in self.bitmaps.get(column, {})]
+
+    # ===================================
+    # 🔎 SELEÇÃO
+    # ===================================
+    def select(self, **selections):
+        """Bitmap das linhas que passam em todos os filtros (lista vazia = sem filtro)."""
+        result = self._all
+        for col, values in selections.items():
+            if not values:
+                continue
+            if col not in self.bitmaps:
+                raise KeyError(f"Coluna sem índice: {col}")
+            union = np.zeros_like(self._all)
+            for code in self.table.find(col, values):
+                bitmap = self.bitmaps[col].get(int(code))
+                if bitmap is not None:
+                    union |= bitmap
+            result = result & union
+        return result
+
+    def mask(self, **selections):
+        """Máscara booleana (uma posição por linha) de `select`."""
+        return np.unpackbits(self.select(**selections), count=self.rows).view(bool)
+
+    def count(self, **selections):
+        """Número de linhas selecionadas, contado direto nos bytes do bitmap."""
+        return int(_POPCOUNT[self.select(**selections)].sum())
+
+    def aggregate(self, df, columns, by=None, **selections):
+        """Somas de `columns` (por `by`, se dado) só nas linhas selecionadas de `df`."""
+        selected = df[self.mask(**selections)] if any(selections.values()) else df
+        if by:
+            return grouped_sums(selected, by, columns)
+        return selected[columns].sum().astype('float64')
+
+
+def filter_cube(cube, index=None, **selections):
+    """Novo cubo só com as células selecionadas por `index` (montado com `from_cube`).
+
+    Sem `index`, o índice das células é montado na hora (para um filtro
+    avulso; quem filtra várias vezes o mesmo cubo deve guardar o índice).
+    Exemplo: ``filter_cube(cube, canal=['Meta Ads'], cta=['Comece grátis'])``.
+    """
+    if not any(selections.values()):
+        return cube
+    if index is None:
+        index = BitmapIndex.from_cube(cube, [col for col in selections if col in cube.dimensions])
+    filtered = Cube(cube.dimensions, cube.table)
+    filtered.cells = cube.cells[index.mask(**selections)]
+    filtered.rows = int(filtered.cells['linhas'].sum())
+    return filtered
@@ -0,0 +1,148 @@
+# campaign_analytics/generator.py
+"""Geração vetorizada de dados sintéticos de campanhas.
+
+Todas as colunas são sorteadas de uma vez a partir de um único `Generator`,
+então milhões de linhas saem em segundos (útil para testes de carga).
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.schema import DTYPES
+
+TIPOS = ["imagem única", "carrossel", "vídeo curto"]
+IMAGENS = ["pessoa sorrindo", "produto", "antes/depois"]
+CTAS = ["Compre agora", "Saiba mais", "Comece grátis", "Experimente"]
+CANAIS = ["Meta Ads", "Google Ads", "TikTok Ads"]
+PAISES = ["Brasil", "Estados Unidos", "Portugal", "México", "Argentina", "Alemanha", "Reino Unido", "Canadá"]
+PESOS_PAISES = [0.4, 0.15, 0.1, 0.1, 0.08, 0.07, 0.05, 0.05]
+
+DASHBOARD_CHANNELS = ['Google Ads', 'Facebook', 'Instagram', 'LinkedIn', 'TikTok']
+
+
+def generate_campaigns(n_rows=300, seed=42):
+    """DataFrame de criativos sintéticos no esquema de `dados_criativos.csv`."""
+    rng = np.random.default_rng(seed)
+
+    tipo = rng.choice(len(TIPOS), n_rows)
+    imagem = rng.choice(len(IMAGENS), n_rows)
+    cta = rng.choice(len(CTAS), n_rows)
+    canal = rng.choice(len(CANAIS), n_rows)
+    impressoes = rng.integers(1000, 50000, n_rows)
+    cliques = rng.binomial(impressoes, 0.02)
+    leads = rng.binomial(cliques, 0.1)
+    conversoes = rng.binomial(leads, 0.05)
+    custo = rng.uniform(500, 5000, n_rows)
+
+    # Combinações que convertem mais (mesmo efeito do gerador original)
+    sorriso_gratis = (imagem == IMAGENS.index("pessoa sorrindo")) & (cta == CTAS.index("Comece grátis"))
+    conversoes[sorriso_gratis] = (conversoes[sorriso_gratis] * 1.8).astype(conversoes.dtype)
+    video_tiktok = (tipo == TIPOS.index("vídeo curto")) & (canal == CANAIS.index("TikTok Ads"))
+    conversoes[video_tiktok] = (conversoes[video_tiktok] * 2.0).astype(conversoes.dtype)
+
+    # Receita e país sorteados por último para não alterar as colunas acima
+    receita = conversoes * rng.uniform(300, 1500, n_rows)
+    pais = rng.choice(len(PAISES), n_rows, p=PESOS_PAISES)
+
+    df = pd.DataFrame({
+        'canal': pd.Categorical.from_codes(canal, CANAIS),
+        'tipo_criativo': pd.Categorical.from_codes(tipo, TIPOS),
+        'imagem_tipo': pd.Categorical.from_codes(imagem, IMAGENS),
+        'cta': pd.Categorical.from_codes(cta, CTAS),
+        'pais': pd.Categorical.from_codes(pais, PAISES),
+        'impressoes': impressoes,
+        'cliques': cliques,
+        'leads': leads,
+        'conversoes': conversoes,
+        'custo_total': custo,
+        'receita': receita,
+    })
+    return df.astype({col: dtype for col, dtype in DTYPES.items() if col in df and dtype != 'category'})
+
+
+def generate_dashboard_data(seed=42, days=90):
+    """Métricas, desempenho por canal e série diária do modern_dashboard.py."""
+    rng = np.random.default_rng(seed)
+    n_channels = len(DASHBOARD_CHANNELS)
+
+    metrics = {
+        'total_campaigns': 1247,
+        'total_spend': 2847593,
+        'total_conversions': 48392,
+        'avg_cac': 58.84,
+        'optimized_cac': 41.19,
+        'savings': 853477,
+        'roi_improvement': 29.8
+    }
+
+    channel_df = pd.DataFrame({
+        'channel': DASHBOARD_CHANNELS,
+        'spend': rng.integers(300000, 800000, n_channels),
+        'conversions': rng.integers(5000, 15000, n_channels),
+        'cac': rng.uniform(35, 85, n_channels),
+        'ctr': rng.uniform(0.015, 0.045, n_channels),
+        'quality_score': rng.uniform(6.5, 9.2, n_channels)
+    })
+
+    # Últimos `days` dias, do mais antigo para o mais recente
+    dates = pd.Timestamp.now() - pd.to_timedelta(np.arange(days)[::-1], unit='D')
+    daily_df = pd.DataFrame({
+        'date': dates,
+        'spend': rng.integers(15000, 35000, days),
+        'conversions': rng.integers(250, 600, days),
+        'cac': rng.uniform(45, 75, days),
+        'impressions': rng.integers(800000, 1500000, days)
+    })
+
+    return metrics, channel_df, daily_df
+
+
+def generate_daily_series(days=90, channels=DASHBOARD_CHANNELS, seed=42, end=None):
+    """Série diária por canal (investimento, conversões, receita, impressões, cliques).
+
+    Uma linha por dia e canal, terminando em `end` (padrão: hoje), com
+    sazonalidade semanal e anual e retornos decrescentes do investimento.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end).normalize()
+    dates = pd.date_range(end=end, periods=days, freq='D')
+    n_channels = len(channels)
+
+    day = np.arange(days)[:, None]
+    weekly = 1 + 0.15 * np.sin(2 * np.pi * dates.dayofweek.to_numpy()[:, None] / 7)
+    yearly = 1 + 0.25 * np.sin(2 * np.pi * (dates.dayofyear.to_numpy()[:, None] - 80) / 365.25)
+    base_spend = rng.uniform(3000, 7000, n_channels)
+    spend = base_spend * weekly * yearly * rng.lognormal(0, 0.1, (days, n_channels))
+    # Eficiência de cada canal, com uma leve melhora ao longo do tempo
+    efficiency = rng.uniform(0.45, 0.9, n_channels) * (1 + 0.1 * day / max(days, 1))
+    conversions = rng.poisson(efficiency * spend ** 0.6)
+    impressions = rng.poisson(spend * rng.uniform(30, 60, n_channels))
+    clicks = rng.binomial(impressions, rng.uniform(0.015, 0.045, n_channels))
+    revenue = conversions * rng.uniform(90, 200, (days, n_channels))
+
+    return pd.DataFrame({
+        'date': np.repeat(dates, n_channels),
+        'channel': np.tile(channels, days),
+        'spend': spend.ravel(),
+        'conversions': conversions.ravel(),
+        'revenue': revenue.ravel(),
+        'impressions': impressions.ravel(),
+        'clicks': clicks.ravel(),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético de criativos para testes de carga.")
+    parser.add_argument('rows', type=int, help="número de linhas")
+    parser.add_argument('-o', '--output', default='criativos_sinteticos.csv')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    df = generate_campaigns(args.rows, seed=args.seed)
+    df.to_csv(args.output, index_label='id')
+    print(f"{len(df):,} linhas gravadas em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# campaign_analytics/geo.py
+"""Resolução de nomes de país para códigos ISO-3 e métricas por país.
+
+Os nomes vêm dos exports como texto livre ("Brasil", "EUA", "United
+States"...). Cada nome distinto é resolvido uma única vez por uma tabela
+local (português, inglês e o próprio código ISO-3), sem acento nem caixa, e
+o mapa recebe só o rollup por país já com o código: o Plotly não precisa
+casar nomes no navegador, não importa quantas linhas tenha a fonte.
+"""
+import unicodedata
+from functools import lru_cache
+
+from campaign_analytics.reports import report
+
+# Código ISO-3 e os nomes aceitos para cada país
+COUNTRIES = {
+    'ARG': ['Argentina'],
+    'AUS': ['Austrália', 'Australia'],
+    'AUT': ['Áustria', 'Austria'],
+    'AGO': ['Angola'],
+    'ARE': ['Emirados Árabes Unidos', 'Emirados Árabes', 'United Arab Emirates', 'UAE'],
+    'BEL': ['Bélgica', 'Belgium'],
+    'BOL': ['Bolívia', 'Bolivia'],
+    'BRA': ['Brasil', 'Brazil'],
+    'CAN': ['Canadá', 'Canada'],
+    'CHE': ['Suíça', 'Switzerland'],
+    'CHL': ['Chile'],
+    'CHN': ['China'],
+    'COL': ['Colômbia', 'Colombia'],
+    'CPV': ['Cabo Verde', 'Cape Verde'],
+    'CRI': ['Costa Rica'],
+    'CZE': ['República Tcheca', 'Tchéquia', 'Czech Republic', 'Czechia'],
+    'DEU': ['Alemanha', 'Germany', 'Deutschland'],
+    'DNK': ['Dinamarca', 'Denmark'],
+    'DOM': ['República Dominicana', 'Dominican Republic'],
+    'ECU': ['Equador', 'Ecuador'],
+    'EGY': ['Egito', 'Egypt'],
+    'ESP': ['Espanha', 'Spain', 'España'],
+    'FIN': ['Finlândia', 'Finland'],
+    'FRA': ['França', 'France'],
+    'GBR': ['Reino Unido', 'Inglaterra', 'Grã-Bretanha', 'United Kingdom', 'UK', 'England', 'Great Britain'],
+    'GRC': ['Grécia', 'Greece'],
+    'GTM': ['Guatemala'],
+    'HUN': ['Hungria', 'Hungary'],
+    'IDN': ['Indonésia', 'Indonesia'],
+    'IND': ['Índia', 'India'],
+    'IRL': ['Irlanda', 'Ireland'],
+    'ISR': ['Israel'],
+    'ITA': ['Itália', 'Italy'],
+    'JPN': ['Japão', 'Japan'],
+    'KOR': ['Coreia do Sul', 'Coréia do Sul', 'South Korea', 'Korea'],
+    'MAR': ['Marrocos', 'Morocco'],
+    'MEX': ['México', 'Mexico'],
+    'MOZ': ['Moçambique', 'Mozambique'],
+    'NGA': ['Nigéria', 'Nigeria'],
+    'NLD': ['Países Baixos', 'Holanda', 'Netherlands', 'Holland'],
+    'NOR': ['Noruega', 'Norway'],
+    'NZL': ['Nova Zelândia', 'New Zealand'],
+    'PAN': ['Panamá', 'Panama'],
+    'PER': ['Peru'],
+    'PHL': ['Filipinas', 'Philippines'],
+    'POL': ['Polônia', 'Polónia', 'Poland'],
+    'PRT': ['Portugal'],
+    'PRY': ['Paraguai', 'Paraguay'],
+    'ROU': ['Romênia', 'Roménia', 'Romania'],
+    'RUS': ['Rússia', 'Russia'],
+    'SAU': ['Arábia Saudita', 'Saudi Arabia'],
+    'SGP': ['Singapura', 'Singapore'],
+    'SWE': ['Suécia', 'Sweden'],
+    'THA': ['Tailândia', 'Thailand'],
+    'TUR': ['Turquia', 'Turkey', 'Türkiye'],
+    'UKR': ['Ucrânia', 'Ukraine'],
+    'URY': ['Uruguai', 'Uruguay'],
+    'USA': ['Estados Unidos', 'EUA', 'Estados Unidos da América', 'United States',
+            'United States of America', 'US'],
+    'VEN': ['Venezuela'],
+    'VNM': ['Vietnã', 'Vietname', 'Vietnam'],
+    'ZAF': ['África do Sul', 'South Africa'],
+}
+
+
+def normalize_name(name):
+    """Nome sem acentos, sem caixa e com espaços simples."""
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    plain = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(plain.casefold().replace('.', ' ').split())
+
+
+_LOOKUP = {
+    normalize_name(name): iso3
+    for iso3, names in COUNTRIES.items()
+    for name in [iso3, *names]
+}
+
+
+@lru_cache(maxsize=4096)
+def to_iso3(name):
+    """Código ISO-3 de `name`, ou None se o país não for reconhecido."""
+    return _LOOKUP.get(normalize_name(name))
+
+
+def country_metrics(cube):
+    """Relatório `roas_por_pais` com o código ISO-3 de cada país (ausente se desconhecido)."""
+    table = report(cube, 'roas_por_pais')
+    table['iso3'] = [to_iso3(name) for name in table['pais']]
+    return table
@@ -0,0 +1,189 @@
+# campaign_analytics/incremental.py
+"""Modo incremental: acrescenta exports diários ao histórico já agregado.
+
+O histórico fica em disco como o cubo acumulado (`cubo-*.arrow`) e os `id`s
+já vistos, gravados em segmentos ordenados (`ids-00001.npy`, ...). Um novo
+arquivo só tem suas linhas inéditas somadas ao cubo, então o custo de
+atualizar é proporcional ao delta e não ao histórico:
+
+    python -m campaign_analytics.incremental export_do_dia.csv
+
+Arquivos nunca são sobrescritos: cada `append` grava um cubo e segmentos
+com nomes novos e só então troca o manifesto (`manifesto.json`) de uma vez.
+Se o processo cair no meio, o manifesto anterior continua valendo e os
+arquivos que ele não cita são apagados na próxima gravação. Cada `append`
+trava o histórico (entre threads e processos) e relê o manifesto antes de
+deduplicar, então duas sessões acrescentando ao mesmo tempo não se perdem.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.cube import CUBE_MEASURES, Cube
+from campaign_analytics.ingestion import CHUNK_SIZE, ID_COLUMN, read_csv_chunks
+from campaign_analytics.schema import _file_lock, _write_atomic
+
+STORE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'historico'
+
+# Um segmento é fundido ao anterior enquanto o anterior não for mais que
+# MERGE_RATIO vezes maior: os tamanhos crescem em progressão geométrica, há
+# O(log n) segmentos e cada id é regravado O(log n) vezes ao todo
+MERGE_RATIO = 2
+
+
+class IncrementalStore:
+    """Cubo e ids persistidos em `directory`, atualizados por `append`."""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def _manifest_path(self):
+        return self.directory / 'manifesto.json'
+
+    def _load(self):
+        """Estado (versão, segmentos e cubo) do manifesto atual."""
+        manifest = self._read_manifest()
+        self._version = manifest['version']
+        self._segments = [self.directory / name for name in manifest['segments']]
+        self.cube = self._load_cube(manifest)
+
+    def _read_manifest(self):
+        if self._manifest_path.exists():
+            return json.loads(self._manifest_path.read_text())
+        return {'version': 0, 'cube': None, 'rows': 0, 'segments': []}
+
+    def _load_cube(self, manifest):
+        cube = Cube()
+        if manifest['cube']:
+            cells = pd.read_feather(self.directory / manifest['cube'])
+            cube.cells = cells.set_index(cube.dimensions)[CUBE_MEASURES].astype({'linhas': 'int64'})
+            cube.rows = manifest['rows']
+        return cube
+
+    # ===================================
+    # 🔎 DEDUPLICAÇÃO
+    # ===================================
+    def _seen(self, ids):
+        """Máscara dos `ids` (ordenados, únicos) que já estão no histórico."""
+        seen = np.zeros(len(ids), dtype=bool)
+        for segment_path in self._segments:
+            segment = np.load(segment_path, mmap_mode='r')
+            if not len(segment):
+                continue
+            position = np.searchsorted(segment, ids).clip(max=len(segment) - 1)
+            seen |= segment[position] == ids
+        return seen
+
+    def _new_segment_path(self, segments):
+        # Número maior que o de qualquer segmento em uso: nada é sobrescrito
+        number = max((int(path.stem.split('-')[1]) for path in segments), default=0) + 1
+        return self.directory / f'ids-{number:05d}.npy'
+
+    def _write_segment(self, ids, segments):
+        """Grava `ids` (ordenados) em um segmento novo e devolve a lista com ele, já compactada."""
+        path = self._new_segment_path(segments)
+        np.save(path, ids)
+        return self._compact(segments + [path])
+
+    def _compact(self, segments):
+        """Funde os segmentos mais novos enquanto o anterior não for bem maior que o último.
+
+        Só são lidos os segmentos de tamanho comparável ao recém-gravado, então
+        o custo acompanha o delta e não o histórico inteiro.
+        """
+        sizes = [np.load(path, mmap_mode='r').shape[0] for path in segments]
+        while len(segments) > 1 and sizes[-2] <= MERGE_RATIO * sizes[-1]:
+            merged = np.concatenate([np.load(segments[-2]), np.load(segments[-1])])
+            # Duas sequências ordenadas: a ordenação estável (timsort) só intercala
+            merged.sort(kind='stable')
+            # Os segmentos fundidos saem do disco com o próximo manifesto
+            path = self._new_segment_path(segments)
+            np.save(path, merged)
+            segments = segments[:-2] + [path]
+            sizes = sizes[:-2] + [len(merged)]
+        return segments
+
+    # ===================================
+    # ➕ APPEND
+    # ===================================
+    def append(self, source, chunksize=CHUNK_SIZE):
+        """Soma ao histórico só as linhas de `source` com `id` inédito.
+
+        Devolve o número de linhas novas.
+        """
+        # Outro processo pode ter acrescentado desde a leitura do manifesto:
+        # relê o estado com o histórico travado e só solta depois da troca
+        with _file_lock(self._manifest_path):
+            self._load()
+            return self._append(source, chunksize)
+
+    def _append(self, source, chunksize):
+        delta = Cube(self.cube.dimensions)
+        new_ids = []
+        pending = np.empty(0, dtype=np.int64)
+        for chunk in read_csv_chunks(source, chunksize):
+            if ID_COLUMN not in chunk:
+                raise ValueError(f"O modo incremental exige a coluna '{ID_COLUMN}'")
+            ids = chunk[ID_COLUMN].to_numpy(dtype=np.int64)
+            unique, first = np.unique(ids, return_index=True)
+            fresh = ~self._seen(unique) & ~np.isin(unique, pending, assume_unique=True)
+            if fresh.any():
+                delta.update(chunk.iloc[np.sort(first[fresh])])
+                new_ids.append(unique[fresh])
+                pending = np.union1d(pending, unique[fresh])
+
+        if not new_ids:
+            return 0
+        segments = self._write_segment(np.sort(np.concatenate(new_ids)), self._segments)
+        cube = Cube(self.cube.dimensions, self.cube.table)
+        cube.merge(self.cube).merge(delta)
+        self._commit(cube, segments)
+        return delta.rows
+
+    # ===================================
+    # 💾 GRAVAÇÃO ATÔMICA
+    # ===================================
+    def _commit(self, cube, segments):
+        """Grava o cubo e troca o manifesto; só depois o novo estado passa a valer."""
+        version = self._version + 1
+        cube_name = f'cubo-{version:05d}.arrow'
+        cube.cells.reset_index().to_feather(self.directory / cube_name)
+        manifest = {
+            'version': version,
+            'cube': cube_name,
+            'rows': cube.rows,
+            'segments': [path.name for path in segments],
+        }
+        _write_atomic(self._manifest_path, json.dumps(manifest))
+        self.cube, self._segments, self._version = cube, segments, version
+        self._remove_unreferenced(manifest)
+
+    def _remove_unreferenced(self, manifest):
+        """Apaga cubos, segmentos e temporários que o manifesto não cita."""
+        keep = {manifest['cube'], *manifest['segments']}
+        for pattern in ('cubo-*.arrow', 'ids-*.npy', '*.tmp'):
+            for path in self.directory.glob(pattern):
+                if path.name not in keep:
+                    path.unlink(missing_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Acrescenta exports ao histórico agregado.")
+    parser.add_argument('files', nargs='+', help="CSVs com as linhas novas (coluna 'id' obrigatória)")
+    parser.add_argument('--store', default=STORE_DIR, help="diretório do histórico")
+    args = parser.parse_args(argv)
+
+    store = IncrementalStore(args.store)
+    for path in args.files:
+        added = store.append(path)
+        print(f"{path}: {added:,} linhas novas ({store.cube.rows:,} no histórico)")
+
+
+if __name__ == '__main__':
+    main()
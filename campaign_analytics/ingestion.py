@@ -0,0 +1,70 @@
+# campaign_analytics/ingestion.py
+"""Leitura de CSVs de criativos em blocos, no esquema do projeto.
+
+O arquivo nunca é carregado inteiro: cada bloco é lido com tipos explícitos,
+reduzido aos agregados aditivos (ver `cube.py`) e descartado, então o pico de
+memória depende do tamanho do bloco e não do tamanho do arquivo.
+"""
+import pandas as pd
+
+# O esquema (colunas, tipos, tabela de códigos) fica em schema.py
+from campaign_analytics.schema import (  # noqa: F401
+    CATEGORICAL_COLUMNS,
+    COUNT_COLUMNS,
+    DTYPES,
+    ID_COLUMN,
+    MEASURES,
+    MISSING_CATEGORY,
+    READ_DTYPES,
+)
+
+CHUNK_SIZE = 250_000
+
+
+def normalize_chunk(chunk):
+    """Garante todas as colunas do esquema, com os tipos esperados.
+
+    Dimensões ausentes ou em branco viram `MISSING_CATEGORY`, para que nenhuma
+    linha fique fora dos agrupamentos; medidas em branco viram 0 e contagens
+    decimais são arredondadas antes da conversão para inteiro.
+    """
+    missing = {}
+    for col in CATEGORICAL_COLUMNS:
+        if col not in chunk:
+            missing[col] = pd.Categorical([MISSING_CATEGORY] * len(chunk))
+    for col in MEASURES:
+        if col not in chunk:
+            missing[col] = 0
+    if missing:
+        chunk = chunk.assign(**missing)
+    filled = {}
+    for col in MEASURES:
+        values = chunk[col]
+        if values.hasnans or (col in COUNT_COLUMNS and values.dtype.kind == 'f'):
+            values = values.fillna(0)
+            filled[col] = values.round() if col in COUNT_COLUMNS else values
+    if filled:
+        chunk = chunk.assign(**filled)
+    chunk = chunk.astype({col: dtype for col, dtype in DTYPES.items() if col in chunk and chunk[col].dtype != dtype})
+    blank = {}
+    for col in CATEGORICAL_COLUMNS:
+        if chunk[col].isna().any():
+            values = chunk[col]
+            if MISSING_CATEGORY not in values.cat.categories:
+                values = values.cat.add_categories(MISSING_CATEGORY)
+            blank[col] = values.fillna(MISSING_CATEGORY)
+    return chunk.assign(**blank) if blank else chunk
+
+
+def read_csv_chunks(source, chunksize=CHUNK_SIZE):
+    """Lê o CSV em blocos de `chunksize` linhas já no esquema do projeto."""
+    reader = pd.read_csv(
+        source,
+        dtype=READ_DTYPES,
+        usecols=lambda col: col in READ_DTYPES,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            yield normalize_chunk(chunk)
+
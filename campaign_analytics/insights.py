@@ -0,0 +1,132 @@
+# campaign_analytics/insights.py
+"""Mineração de insights: segmentos que convertem acima ou abaixo da média.
+
+Todas as combinações de 1 e 2 dimensões do cubo (canal, tipo_criativo,
+imagem_tipo, cta, pais) são comparadas com o restante dos dados por um teste
+z de duas proporções, com correção de Benjamini-Hochberg para as múltiplas
+comparações. Dimensões com um só valor e pares que repetem as linhas de um
+segmento de uma dimensão ficam de fora, para não inflar a correção. Os
+totais vêm de um tensor de contingência montado a partir do cubo, então o
+custo depende do número de células e não do de linhas.
+"""
+import math
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.metrics import RATIOS
+
+ALPHA = 0.05
+# Segmentos com denominador menor que isso são ignorados
+MIN_DENOMINATOR = 30
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def contingency_tensor(cube, columns):
+    """Tensor (uma dimensão por eixo do cubo) com as somas de cada coluna em `columns`.
+
+    Cada eixo tem só os valores presentes nas células, não o dicionário
+    inteiro de códigos da coluna.
+    """
+    cells = cube.cells
+    index = cells.index.remove_unused_levels()
+    levels = [list(level) for level in index.levels]
+    shape = tuple(len(level) for level in levels)
+    codes = tuple(np.asarray(code) for code in index.codes)
+    tensors = {}
+    for col in columns:
+        tensor = np.zeros(shape)
+        np.add.at(tensor, codes, cells[col].to_numpy(dtype='float64'))
+        tensors[col] = tensor
+    return tensors, levels
+
+
+def benjamini_hochberg(p_values):
+    """q-valores de Benjamini-Hochberg (controle da taxa de falsas descobertas)."""
+    p_values = np.asarray(p_values, dtype='float64')
+    n = len(p_values)
+    if not n:
+        return p_values
+    order = np.argsort(p_values)
+    ranked = p_values[order] * n / np.arange(1, n + 1)
+    q_sorted = np.minimum.accumulate(ranked[::-1])[::-1].clip(max=1.0)
+    q_values = np.empty(n)
+    q_values[order] = q_sorted
+    return q_values
+
+
+def mine_insights(cube, metric='cvr', alpha=ALPHA, max_order=2, min_denominator=MIN_DENOMINATOR):
+    """Segmentos de 1 a `max_order` dimensões com a taxa `metric` diferente da média.
+
+    Devolve um DataFrame ordenado por relevância com `segmento`, `dimensoes`,
+    `taxa`, `base` (taxa geral), `lift` (taxa / base - 1), `z`, `p`, `q` e
+    `significativo` (q < alpha).
+    """
+    numerator, denominator = RATIOS[metric]
+    tensors, levels = contingency_tensor(cube, [numerator, denominator, 'linhas'])
+    num, den, rows = tensors[numerator], tensors[denominator], tensors['linhas']
+    total_num, total_den = num.sum(), den.sum()
+    if total_den <= 0:
+        return pd.DataFrame()
+    baseline = total_num / total_den
+
+    dims = cube.dimensions
+    all_axes = tuple(range(len(dims)))
+    # Dimensões com um único valor não separam nenhum segmento do restante
+    axes = [axis for axis in all_axes if len(levels[axis]) >= 2]
+    records = []
+    for order in range(1, max_order + 1):
+        for kept in combinations(axes, order):
+            dropped = tuple(axis for axis in all_axes if axis not in kept)
+            seg_rows = rows.sum(axis=dropped)
+            # Segmento com as mesmas linhas de um de ordem menor (ex.: o único
+            # CTA de um canal) repete aquele teste
+            redundant = np.zeros(seg_rows.shape, dtype=bool)
+            if order > 1:
+                for position, axis in enumerate(kept):
+                    parent = rows.sum(axis=tuple(sorted(dropped + (axis,))))
+                    redundant |= seg_rows == np.expand_dims(parent, position)
+            labels = pd.MultiIndex.from_product([levels[axis] for axis in kept]).to_flat_index()
+            records.append(pd.DataFrame({
+                'dimensoes': [' × '.join(dims[axis] for axis in kept)] * seg_rows.size,
+                'segmento': [' + '.join(label) for label in labels],
+                'num': num.sum(axis=dropped).ravel(),
+                'den': den.sum(axis=dropped).ravel(),
+            })[~redundant.ravel()])
+    segments = pd.concat(records, ignore_index=True)
+    segments = segments[(segments['den'] >= min_denominator) & (segments['den'] < total_den)]
+
+    # Teste z de duas proporções: segmento contra o restante
+    seg_num = segments['num'].to_numpy()
+    seg_den = segments['den'].to_numpy()
+    rate = seg_num / seg_den
+    rest = (total_num - seg_num) / (total_den - seg_den)
+    pooled = baseline * (1 - baseline)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (rate - rest) / np.sqrt(pooled * (1 / seg_den + 1 / (total_den - seg_den)))
+    z = np.nan_to_num(z)
+    p = _erfc(np.abs(z) / math.sqrt(2)).astype('float64')
+
+    segments = segments.assign(
+        taxa=rate,
+        base=baseline,
+        lift=rate / baseline - 1 if baseline > 0 else np.nan,
+        z=z,
+        p=p,
+        q=benjamini_hochberg(p),
+    )
+    segments['significativo'] = segments['q'] < alpha
+    segments = segments.drop(columns=['num', 'den'])
+    return segments.sort_values(['significativo', 'q', 'lift'], ascending=[False, True, False], ignore_index=True)
+
+
+def top_findings(findings, k=3, direction='positive'):
+    """Os `k` achados significativos de maior lift (`positive`) ou menor (`negative`)."""
+    if findings.empty:
+        return findings
+    significant = findings[findings['significativo']]
+    if direction == 'positive':
+        return significant[significant['lift'] > 0].nlargest(k, 'lift')
+    return significant[significant['lift'] < 0].nsmallest(k, 'lift')
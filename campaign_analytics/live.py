@@ -0,0 +1,334 @@
+# campaign_analytics/live.py
+"""Modo ao vivo do modern_dashboard.py: eventos lidos de um arquivo que só cresce.
+
+Cada evento (impressão, clique ou conversão) é um registro binário de
+tamanho fixo (`EVENT_DTYPE`) acrescentado ao fim de `.cache/live/events.bin`.
+O leitor (`EventTail`) guarda a posição já lida e, a cada consulta, converte
+só os bytes novos com `np.frombuffer`, sem parsing. Os eventos vão para uma
+janela de contadores por minuto e canal (`MinuteWindow`, buffers circulares
+somados com `np.bincount`), então o custo por consulta depende do número de
+eventos novos e não do histórico. Uma sessão nova começa a ler no início da
+janela (busca binária pelo horário dos registros), cada consulta lê no
+máximo `MAX_POLL_EVENTS` e a janela anda com o relógio, não com o último
+evento: sem eventos novos, os minutos antigos saem dos totais.
+
+Para testar sem uma fonte real há um produtor de demonstração:
+
+    python -m campaign_analytics.live produce --rate 50000
+    python -m campaign_analytics.live bench
+"""
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.generator import DASHBOARD_CHANNELS
+
+EVENTS_PATH = Path(__file__).resolve().parent.parent / '.cache' / 'live' / 'events.bin'
+
+EVENT_DTYPE = np.dtype([
+    ('ts', '<f8'),        # segundos desde a época (UTC)
+    ('cost', '<f4'),      # custo atribuído ao evento (impressões)
+    ('revenue', '<f4'),   # receita (conversões)
+    ('channel', '<u2'),   # posição em DASHBOARD_CHANNELS
+    ('kind', 'u1'),       # IMPRESSION, CLICK ou CONVERSION
+    ('_pad', 'u1'),
+])
+IMPRESSION, CLICK, CONVERSION = 0, 1, 2
+
+WINDOW_MINUTES = 60
+# Eventos lidos por consulta (~24 MB); um atraso maior é lido nas seguintes
+MAX_POLL_EVENTS = 1_000_000
+# Segundos completos usados na taxa de eventos por segundo
+RATE_SECONDS = 5
+COUNTERS = ['impressions', 'clicks', 'conversions', 'spend', 'revenue']
+
+# Acima disso o produtor de demonstração recomeça o arquivo (o leitor percebe e volta ao início)
+MAX_FILE_BYTES = 256 * 1024 * 1024
+
+
+def append_events(events, path=EVENTS_PATH):
+    """Acrescenta um array de `EVENT_DTYPE` ao fim do arquivo de eventos."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(np.ascontiguousarray(events, dtype=EVENT_DTYPE).tobytes())
+
+
+class EventTail:
+    """Lê só os registros completos acrescentados desde a última leitura."""
+
+    def __init__(self, path=EVENTS_PATH):
+        self.path = Path(path)
+        self.offset = 0
+        # Primeiro registro do arquivo na última leitura: se mudar, o arquivo foi recomeçado
+        self._head = b''
+
+    def seek_time(self, since):
+        """Posiciona a leitura no primeiro registro com `ts >= since`.
+
+        Os registros são acrescentados em ordem de tempo: a busca binária lê
+        só O(log n) registros, não o arquivo.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            self.offset, self._head = 0, b''
+            return
+        count = size // EVENT_DTYPE.itemsize
+        if not count:
+            self.offset, self._head = 0, b''
+            return
+        records = np.memmap(self.path, dtype=EVENT_DTYPE, mode='r', shape=(count,))
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if records[mid]['ts'] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        self._head = records[:1].tobytes()
+        self.offset = lo * EVENT_DTYPE.itemsize
+
+    def read(self, max_events=None):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return np.empty(0, dtype=EVENT_DTYPE)
+        with f:
+            head = f.read(EVENT_DTYPE.itemsize)
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset or (self._head and head != self._head):
+                # Arquivo recomeçado (truncado ou trocado): lê de novo desde o início
+                self.offset = 0
+            self._head = head if len(head) == EVENT_DTYPE.itemsize else b''
+            available = (size - self.offset) // EVENT_DTYPE.itemsize * EVENT_DTYPE.itemsize
+            if max_events is not None:
+                available = min(available, max_events * EVENT_DTYPE.itemsize)
+            if not available:
+                return np.empty(0, dtype=EVENT_DTYPE)
+            f.seek(self.offset)
+            data = f.read(available)
+        # Um registro ainda sendo escrito fica para a próxima leitura
+        available = len(data) // EVENT_DTYPE.itemsize * EVENT_DTYPE.itemsize
+        self.offset += available
+        return np.frombuffer(data, dtype=EVENT_DTYPE, count=available // EVENT_DTYPE.itemsize)
+
+
+class MinuteWindow:
+    """Contadores dos últimos `minutes` minutos por canal, em buffers circulares."""
+
+    def __init__(self, channels=DASHBOARD_CHANNELS, minutes=WINDOW_MINUTES):
+        self.channels = list(channels)
+        self.minutes = minutes
+        # Minuto (desde a época) guardado em cada posição do buffer; -1 = vazio
+        self.slot_minute = np.full(minutes, -1, dtype=np.int64)
+        self.counters = {name: np.zeros((minutes, len(self.channels))) for name in COUNTERS}
+        self.latest = -1
+        self.events = 0
+
+    def add(self, events):
+        """Soma um lote de eventos; eventos mais velhos que a janela são ignorados."""
+        if not len(events):
+            return
+        minute = (events['ts'] // 60).astype(np.int64)
+        self.latest = max(self.latest, int(minute.max()))
+        keep = (minute > self.latest - self.minutes) & (events['channel'] < len(self.channels))
+        events, minute = events[keep], minute[keep]
+
+        # Posições que passam a um minuto novo são zeradas antes da soma
+        present = np.unique(minute)
+        slots = present % self.minutes
+        stale = self.slot_minute[slots] < present
+        for counter in self.counters.values():
+            counter[slots[stale]] = 0.0
+        self.slot_minute[slots[stale]] = present[stale]
+        # Eventos de um minuto que o buffer já reciclou
+        valid = self.slot_minute[minute % self.minutes] == minute
+        events, minute = events[valid], minute[valid]
+
+        shape = (self.minutes, len(self.channels))
+        cell = (minute % self.minutes) * len(self.channels) + events['channel']
+        kind = events['kind']
+        for name, mask in (('impressions', kind == IMPRESSION), ('clicks', kind == CLICK),
+                           ('conversions', kind == CONVERSION)):
+            self.counters[name] += np.bincount(cell[mask], minlength=shape[0] * shape[1]).reshape(shape)
+        for name, column in (('spend', 'cost'), ('revenue', 'revenue')):
+            self.counters[name] += np.bincount(cell, weights=events[column], minlength=shape[0] * shape[1]).reshape(shape)
+        self.events += len(events)
+
+    def advance(self, now):
+        """Leva a janela até o minuto de `now` (segundos desde a época), mesmo sem eventos."""
+        self.latest = max(self.latest, int(now // 60))
+
+    def _live_slots(self):
+        """Posições com minutos dentro da janela, em ordem cronológica."""
+        live = np.flatnonzero(self.slot_minute > self.latest - self.minutes)
+        return live[np.argsort(self.slot_minute[live])]
+
+    def series(self):
+        """Uma linha por minuto com os contadores de todos os canais e o CAC."""
+        slots = self._live_slots()
+        df = pd.DataFrame({name: self.counters[name][slots].sum(axis=1) for name in COUNTERS})
+        df.insert(0, 'date', pd.to_datetime(self.slot_minute[slots] * 60, unit='s'))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['cac'] = np.where(df['conversions'] > 0, df['spend'] / df['conversions'], np.nan)
+        return df
+
+    def totals(self):
+        """Somas da janela inteira, com CAC, CTR e ROAS."""
+        slots = self._live_slots()
+        totals = {name: float(self.counters[name][slots].sum()) for name in COUNTERS}
+        totals['cac'] = totals['spend'] / totals['conversions'] if totals['conversions'] else np.nan
+        totals['ctr'] = totals['clicks'] / totals['impressions'] if totals['impressions'] else np.nan
+        totals['roas'] = totals['revenue'] / totals['spend'] if totals['spend'] else np.nan
+        return totals
+
+
+class LiveFeed:
+    """Leitor + janela: o estado que cada sessão do dashboard mantém entre atualizações."""
+
+    def __init__(self, path=EVENTS_PATH, channels=DASHBOARD_CHANNELS, minutes=WINDOW_MINUTES, now=None):
+        now = time.time() if now is None else now
+        self.tail = EventTail(path)
+        # Só o que ainda cabe na janela (do minuto atual e dos anteriores) é lido
+        self.tail.seek_time((int(now // 60) - minutes + 1) * 60)
+        self.window = MinuteWindow(channels, minutes)
+        self.window.advance(now)
+        self.rate = 0.0
+        # Eventos por segundo (pelo horário dos eventos) dos últimos segundos
+        self._second = np.full(RATE_SECONDS + 1, -1, dtype=np.int64)
+        self._second_events = np.zeros(RATE_SECONDS + 1)
+
+    def poll(self, max_events=MAX_POLL_EVENTS, now=None):
+        """Incorpora até `max_events` eventos novos e devolve quantos foram lidos."""
+        now = time.time() if now is None else now
+        events = self.tail.read(max_events)
+        self.window.add(events)
+        self.window.advance(now)
+        self._update_rate(events['ts'], int(now))
+        return len(events)
+
+    def _update_rate(self, ts, current):
+        """Taxa média nos `RATE_SECONDS` segundos completos antes de `current`."""
+        seconds = ts.astype(np.int64)
+        seconds = seconds[(seconds >= current - RATE_SECONDS) & (seconds <= current)]
+        present, counts = np.unique(seconds, return_counts=True)
+        slots = present % len(self._second)
+        stale = self._second[slots] != present
+        self._second_events[slots[stale]] = 0.0
+        self._second[slots] = present
+        self._second_events[slots] += counts
+        complete = (self._second >= current - RATE_SECONDS) & (self._second < current)
+        self.rate = self._second_events[complete].sum() / RATE_SECONDS
+
+
+# ===================================
+# 🏭 PRODUTOR DE DEMONSTRAÇÃO
+# ===================================
+# Probabilidades de cada tipo de evento e custo por mil impressões de cada canal
+KIND_WEIGHTS = [0.97, 0.02975, 0.00025]
+CPM_RANGE = (8.0, 16.0)
+
+
+def synthetic_events(n, rng, start, duration, channels=DASHBOARD_CHANNELS):
+    """`n` eventos sintéticos espalhados em `duration` segundos a partir de `start`."""
+    events = np.zeros(n, dtype=EVENT_DTYPE)
+    events['ts'] = start + np.sort(rng.uniform(0, duration, n))
+    events['channel'] = rng.integers(0, len(channels), n)
+    events['kind'] = rng.choice(3, n, p=KIND_WEIGHTS)
+    impressions = events['kind'] == IMPRESSION
+    cpm = np.linspace(*CPM_RANGE, len(channels))
+    events['cost'][impressions] = cpm[events['channel'][impressions]] / 1000
+    conversions = events['kind'] == CONVERSION
+    events['revenue'][conversions] = rng.uniform(90, 200, conversions.sum())
+    return events
+
+
+def produce(path=EVENTS_PATH, rate=50_000, duration=None, tick=0.1, seed=None, stop=None):
+    """Acrescenta ~`rate` eventos por segundo em `path` até `duration` segundos ou `stop`."""
+    path = Path(path)
+    rng = np.random.default_rng(seed)
+    started = time.time()
+    next_tick = started
+    while (duration is None or time.time() - started < duration) and not (stop and stop.is_set()):
+        if path.exists() and path.stat().st_size > MAX_FILE_BYTES:
+            path.write_bytes(b'')
+        append_events(synthetic_events(int(rate * tick), rng, next_tick, tick), path)
+        next_tick += tick
+        time.sleep(max(0.0, next_tick - time.time()))
+
+
+_producer = None
+_producer_lock = threading.Lock()
+
+
+def start_producer(path=EVENTS_PATH, rate=50_000):
+    """Inicia (uma vez por processo) o produtor de demonstração em uma thread."""
+    global _producer
+    with _producer_lock:
+        if _producer is None or not _producer[0].is_alive():
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=produce, kwargs={'path': path, 'rate': rate, 'stop': stop},
+                name='live-producer', daemon=True,
+            )
+            thread.start()
+            _producer = (thread, stop)
+
+
+def stop_producer():
+    global _producer
+    with _producer_lock:
+        if _producer is not None:
+            _producer[1].set()
+            _producer = None
+
+
+def producer_running():
+    return _producer is not None and _producer[0].is_alive()
+
+
+def bench(events=5_000_000, batch=50_000):
+    """Eventos por segundo do caminho leitura + janela (arquivo temporário)."""
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'events.bin'
+        append_events(synthetic_events(events, rng, time.time() - 30 * 60, 30 * 60), path)
+        feed = LiveFeed(path)
+        start = time.perf_counter()
+        # Lê em lotes, como um painel que consulta o arquivo enquanto ele cresce
+        while len(chunk := feed.tail.read(batch)):
+            feed.window.add(chunk)
+        return events / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Produtor de eventos de demonstração e benchmark do modo ao vivo.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    produce_parser = sub.add_parser('produce', help="acrescenta eventos sintéticos ao arquivo")
+    produce_parser.add_argument('--rate', type=int, default=50_000, help="eventos por segundo")
+    produce_parser.add_argument('--duration', type=float, default=None, help="segundos (padrão: sem fim)")
+    produce_parser.add_argument('-o', '--output', default=EVENTS_PATH)
+    bench_parser = sub.add_parser('bench', help="mede eventos/s da leitura + janela")
+    bench_parser.add_argument('--events', type=int, default=5_000_000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'produce':
+        print(f"Produzindo ~{args.rate:,} eventos/s em {args.output} (Ctrl+C para parar)")
+        try:
+            produce(args.output, args.rate, args.duration)
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(f"{bench(args.events):,.0f} eventos/s")
+
+
+if __name__ == '__main__':
+    main()
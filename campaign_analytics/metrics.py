@@ -0,0 +1,114 @@
+# campaign_analytics/metrics.py
+"""Kernel das métricas de custo e conversão (CTR, CVR, CPA, CAC, ROAS).
+
+Toda métrica é razão de somas (soma do numerador / soma do denominador do
+grupo), nunca média de razões por linha: a média do CAC de cada criativo dá
+o mesmo peso a um criativo com 1 conversão e a um com 1.000, e a troca de
+0 por 1 conversão inventa um CAC para quem não converteu. Grupos sem
+denominador recebem `zero_division` (NaN por padrão).
+"""
+import numpy as np
+import pandas as pd
+
+# métrica -> (numerador, denominador)
+RATIOS = {
+    'ctr': ('cliques', 'impressoes'),
+    'cvr': ('conversoes', 'cliques'),
+    'cpa': ('custo_total', 'leads'),
+    'cac': ('custo_total', 'conversoes'),
+    'roas': ('receita', 'custo_total'),
+}
+METRICS = list(RATIOS)
+SUM_COLUMNS = ['impressoes', 'cliques', 'leads', 'conversoes', 'custo_total', 'receita']
+
+
+def ratio_metrics(sums, metrics=METRICS, zero_division=np.nan):
+    """Acrescenta as métricas a uma tabela de somas por grupo."""
+    table = sums.copy()
+    for metric in metrics:
+        numerator, denominator = RATIOS[metric]
+        if numerator not in table or denominator not in table:
+            table[metric] = np.nan
+            continue
+        den = table[denominator].to_numpy(dtype='float64')
+        num = table[numerator].to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table[metric] = np.where(den != 0, num / den, zero_division)
+    return table
+
+
+def grouped_sums(df, by, columns=None, count_column=None):
+    """Somas de `columns` por `by` em uma única passada sobre as linhas.
+
+    Caminho rápido: com `by` categórico, os códigos das categorias são
+    combinados em um código de grupo e somados com `np.bincount`, sem
+    hashing de texto nem colunas intermediárias no DataFrame. O espaço de
+    grupos é limitado pelo número de linhas, não pelo produto das categorias. Com
+    `count_column`, o número de linhas de cada grupo vai nessa coluna.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if columns is None:
+        columns = [col for col in SUM_COLUMNS if col in df]
+
+    if not all(isinstance(df[col].dtype, pd.CategoricalDtype) for col in by):
+        grouped = df.groupby(by, observed=True, sort=True)
+        sums = grouped[columns].sum().astype('float64')
+        if count_column:
+            sums[count_column] = grouped.size()
+        return sums
+
+    categories = [df[col].cat.categories for col in by]
+    codes = [df[col].cat.codes.to_numpy() for col in by]
+    valid = None
+    for col_codes in codes:
+        if (col_codes < 0).any():
+            valid = col_codes >= 0 if valid is None else valid & (col_codes >= 0)
+    if valid is not None:
+        codes = [col_codes[valid] for col_codes in codes]
+
+    # Código de grupo em um espaço compacto: em cada coluna só os valores
+    # presentes contam e, se o produto passar do número de linhas, os códigos
+    # combinados são renumerados (ordem preservada). Assim o bincount não
+    # depende do tamanho do dicionário de códigos nem do número de colunas.
+    group = np.zeros(len(codes[0]), dtype=np.intp)
+    n_groups = 1
+    for col_codes, cats in zip(codes, categories):
+        seen = np.bincount(col_codes, minlength=len(cats)) > 0
+        compact = np.cumsum(seen) - 1
+        n_values = int(seen.sum())
+        group = group * n_values + compact[col_codes]
+        n_groups *= n_values
+        if n_groups > len(group):
+            group, uniques = pd.factorize(group, sort=True)
+            n_groups = len(uniques)
+
+    counts = np.bincount(group, minlength=n_groups)
+    present = np.flatnonzero(counts)
+    sums = {}
+    for col in columns:
+        weights = df[col].to_numpy()
+        if valid is not None:
+            weights = weights[valid]
+        sums[col] = np.bincount(group, weights=weights, minlength=n_groups)[present]
+    if count_column:
+        sums[count_column] = counts[present]
+
+    # Códigos de categoria de cada grupo, tirados da primeira linha do grupo
+    first = np.zeros(n_groups, dtype=np.intp)
+    first[group[::-1]] = np.arange(len(group))[::-1]
+    rows = first[present]
+    if len(by) == 1:
+        index = pd.Index(categories[0], name=by[0])[codes[0][rows]]
+    else:
+        index = pd.MultiIndex(levels=categories, codes=[col_codes[rows] for col_codes in codes], names=by)
+    return pd.DataFrame(sums, index=index)
+
+
+def grouped_metrics(df, by, metrics=METRICS, zero_division=np.nan):
+    """Somas e métricas por grupo direto das linhas.
+
+    Só as colunas usadas pelas métricas pedidas são somadas.
+    """
+    needed = {col for metric in metrics for col in RATIOS[metric]}
+    columns = [col for col in SUM_COLUMNS if col in needed and col in df]
+    return ratio_metrics(grouped_sums(df, by, columns), metrics, zero_division)
@@ -0,0 +1,184 @@
+# campaign_analytics/optimizer.py
+"""Alocação de orçamento entre canais/campanhas com retornos decrescentes.
+
+Cada unidade (canal ou campanha) tem uma curva de resposta
+``conversões = a * spend ** b`` com 0 < b < 1. A elasticidade `b` vem de uma
+regressão log-log nos dados diários e `a` ancora a curva no ponto atual da
+unidade. A alocação ótima iguala o retorno marginal ``a * b * s ** (b - 1)``
+entre as unidades, dentro de limites de variação definidos pelo modo de
+risco, e o orçamento é reduzido até o CAC projetado caber no alvo.
+Unidades sem investimento ou sem conversões não têm curva (`a` seria 0 ou
+infinito): ficam fora da alocação, com o investimento atual.
+
+Tudo é vetorizado: a bissecção do multiplicador de Lagrange roda para todas
+as unidades e para uma grade de orçamentos ao mesmo tempo.
+"""
+import numpy as np
+import pandas as pd
+
+# Variação máxima do investimento de cada unidade e ajuste da elasticidade
+# (elasticidade menor = retornos caem mais rápido = postura mais cautelosa)
+RISK_PROFILES = {
+    'Conservative': {'max_shift': 0.15, 'elasticity_factor': 0.85},
+    'Balanced': {'max_shift': 0.35, 'elasticity_factor': 1.0},
+    'Aggressive': {'max_shift': 0.75, 'elasticity_factor': 1.1},
+}
+
+DEFAULT_ELASTICITY = 0.6
+ELASTICITY_BOUNDS = (0.2, 0.95)
+
+BISECTION_STEPS = 60
+BUDGET_GRID = 64
+MIN_BUDGET_FRACTION = 0.1
+
+
+# ===================================
+# 📐 CURVAS DE RESPOSTA
+# ===================================
+def _loglog_slope(log_x, log_y, groups, n_groups):
+    """Inclinação da regressão de log_y em log_x para cada grupo (somas vetorizadas)."""
+    n = np.bincount(groups, minlength=n_groups).astype('float64')
+    sx = np.bincount(groups, log_x, n_groups)
+    sy = np.bincount(groups, log_y, n_groups)
+    sxx = np.bincount(groups, log_x * log_x, n_groups)
+    sxy = np.bincount(groups, log_x * log_y, n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    return np.where((n >= 3) & np.isfinite(slope), slope, np.nan)
+
+
+def fit_response_curves(channel_df, daily_df=None, key='channel'):
+    """Parâmetros `a` e `b` da curva de resposta de cada unidade de `channel_df`.
+
+    Se `daily_df` tiver a coluna `key`, cada unidade ganha sua própria
+    elasticidade; senão todas compartilham a elasticidade do total diário.
+    """
+    units = channel_df[key].to_numpy()
+    elasticity = np.full(len(units), DEFAULT_ELASTICITY)
+
+    if daily_df is not None and len(daily_df):
+        valid = daily_df[(daily_df['spend'] > 0) & (daily_df['conversions'] > 0)]
+        log_x = np.log(valid['spend'].to_numpy(dtype='float64'))
+        log_y = np.log(valid['conversions'].to_numpy(dtype='float64'))
+        if key in valid:
+            groups = pd.Categorical(valid[key], categories=units).codes
+            known = groups >= 0
+            slopes = _loglog_slope(log_x[known], log_y[known], groups[known], len(units))
+        else:
+            slopes = np.repeat(_loglog_slope(log_x, log_y, np.zeros(len(log_x), dtype=np.intp), 1), len(units))
+        elasticity = np.where(np.isnan(slopes), elasticity, slopes)
+
+    elasticity = np.clip(elasticity, *ELASTICITY_BOUNDS)
+    spend = channel_df['spend'].to_numpy(dtype='float64')
+    conversions = channel_df['conversions'].to_numpy(dtype='float64')
+    # Sem investimento ou sem conversões não há curva: `a` fica NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where((spend > 0) & (conversions > 0), conversions / spend ** elasticity, np.nan)
+    return pd.DataFrame({key: units, 'a': scale, 'b': elasticity})
+
+
+# ===================================
+# 🧮 ALOCAÇÃO
+# ===================================
+def _allocate(a, b, budgets, lower, upper):
+    """Alocação ótima para cada orçamento de `budgets` (uma linha por orçamento).
+
+    `lower`/`upper` têm forma (orçamentos, unidades). Bissecção em log λ:
+    ``s(λ) = clip((a b / λ) ** (1 / (1 - b)), lower, upper)`` decresce com λ.
+    """
+    exponent = 1.0 / (1.0 - b)
+    log_ab = np.log(a * b)
+    # Intervalo de λ que cobre os limites de todas as unidades
+    marginal_low = log_ab + (b - 1.0) * np.log(upper)
+    marginal_high = log_ab + (b - 1.0) * np.log(np.maximum(lower, 1e-9))
+    lo = marginal_low.min(axis=1) - 1.0
+    hi = marginal_high.max(axis=1) + 1.0
+    for _ in range(BISECTION_STEPS):
+        mid = (lo + hi) / 2
+        spend = np.clip(np.exp((log_ab - mid[:, None]) * exponent), lower, upper)
+        over = spend.sum(axis=1) > budgets
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+    return np.clip(np.exp((log_ab - hi[:, None]) * exponent), lower, upper)
+
+
+def optimize_budget(channel_df, daily_df=None, budget_multiplier=1.0, target_cac=None,
+                    mode='Balanced', key='channel'):
+    """Realoca o investimento de `channel_df` e projeta o CAC resultante.
+
+    Devolve um dicionário com a tabela `allocation` (investimento e conversões
+    atuais e projetados por unidade), o CAC atual e projetado, a redução
+    percentual, o orçamento usado e se o `target_cac` foi atingido.
+    """
+    profile = RISK_PROFILES[mode]
+    curves = fit_response_curves(channel_df, daily_df, key)
+    current_spend = channel_df['spend'].to_numpy(dtype='float64')
+    current_conversions = channel_df['conversions'].to_numpy(dtype='float64')
+    current_total = current_spend.sum()
+    requested = current_total * budget_multiplier
+
+    # Só as unidades com curva entram na alocação; as demais mantêm o
+    # investimento e as conversões atuais
+    active = curves['a'].notna().to_numpy()
+    fixed_spend = current_spend[~active].sum()
+    fixed_conversions = current_conversions[~active].sum()
+    if not active.any() or requested <= fixed_spend:
+        raise ValueError("Nenhum orçamento para realocar: faltam unidades com investimento e conversões")
+    b = np.clip(curves['b'].to_numpy()[active] * profile['elasticity_factor'], *ELASTICITY_BOUNDS)
+    # `a` reancorado no ponto atual com a elasticidade ajustada
+    a = current_conversions[active] / current_spend[active] ** b
+
+    # Grade a partir de um piso fixo (fração do investimento atual): um
+    # orçamento viável continua na grade quando o multiplicador aumenta
+    active_total = current_spend[active].sum()
+    active_requested = requested - fixed_spend
+    floor = min(active_total * MIN_BUDGET_FRACTION, active_requested)
+    shares = current_spend[active] / active_total
+
+    def project(budgets):
+        lower = budgets[:, None] * shares * (1 - profile['max_shift'])
+        upper = budgets[:, None] * shares * (1 + profile['max_shift'])
+        spend = _allocate(a, b, budgets, lower, upper)
+        conversions = (a * spend ** b).sum(axis=1) + fixed_conversions
+        return spend, (budgets + fixed_spend) / conversions
+
+    budgets = np.linspace(floor, active_requested, BUDGET_GRID)
+    spend, cac = project(budgets)
+
+    # Maior orçamento cujo CAC projetado cabe no alvo (o CAC cresce com o orçamento);
+    # sem nenhum viável, o de menor CAC projetado
+    feasible = np.ones(len(budgets), dtype=bool) if target_cac is None else cac <= target_cac
+    target_met = bool(feasible.any())
+    choice = np.flatnonzero(feasible)[-1] if target_met else int(np.argmin(cac))
+    if target_met and choice < len(budgets) - 1:
+        # Refina entre o último viável e o primeiro inviável, para o resultado
+        # não depender do espaçamento da grade (e do multiplicador)
+        budgets = np.linspace(budgets[choice], budgets[choice + 1], BUDGET_GRID)
+        spend, cac = project(budgets)
+        choice = np.flatnonzero(cac <= target_cac)[-1]
+
+    optimized = current_spend.copy()
+    optimized[active] = spend[choice]
+    projected = current_conversions.copy()
+    projected[active] = a * spend[choice] ** b
+    elasticity = np.full(len(current_spend), np.nan)
+    elasticity[active] = b
+    current_cac = current_total / current_conversions.sum()
+    projected_cac = cac[choice]
+
+    allocation = pd.DataFrame({
+        key: curves[key],
+        'current_spend': current_spend,
+        'optimized_spend': optimized,
+        'current_conversions': current_conversions,
+        'projected_conversions': projected,
+        'elasticity': elasticity,
+    })
+    return {
+        'allocation': allocation,
+        'current_cac': current_cac,
+        'projected_cac': projected_cac,
+        'cac_reduction': (current_cac - projected_cac) / current_cac * 100,
+        'budget': budgets[choice] + fixed_spend,
+        'target_met': target_met,
+    }
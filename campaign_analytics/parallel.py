@@ -0,0 +1,97 @@
+# campaign_analytics/parallel.py
+"""Agregação paralela de exports divididos em vários CSVs (shards).
+
+Cada shard (tipicamente um CSV por canal e dia) é lido e agregado em um
+processo do pool. O worker devolve só as células do seu cubo parcial (chaves
+e uma matriz de somas, alguns KB), nunca as linhas, e o processo principal
+soma tudo em um único `Cube`. Como os shards são independentes, o tempo cai
+quase linearmente com o número de processos.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.cube import CUBE_DIMENSIONS, CUBE_MEASURES, Cube, build_cube
+from campaign_analytics.ingestion import CHUNK_SIZE, read_csv_chunks
+from campaign_analytics.schema import CodeTable
+
+SHARD_PATTERN = '*.csv'
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def resolve_shards(source):
+    """Lista ordenada de CSVs de um diretório, padrão glob ou lista de caminhos."""
+    if isinstance(source, (list, tuple)):
+        return sorted(str(path) for path in source)
+    source = str(source)
+    if os.path.isdir(source):
+        source = os.path.join(source, SHARD_PATTERN)
+    return sorted(glob.glob(source, recursive=True))
+
+
+def _aggregate_shard(path, dimensions, chunksize):
+    """Cubo parcial de um shard, no formato compacto (linhas, chaves, somas)."""
+    # Tabela de códigos própria do worker: os rótulos voltam como texto e só o
+    # processo principal grava a tabela compartilhada
+    cube = build_cube(read_csv_chunks(path, chunksize), dimensions, CodeTable())
+    cells = cube.cells
+    return cube.rows, cells.index.tolist(), cells[CUBE_MEASURES].to_numpy(dtype='float64')
+
+
+def aggregate_shards(source, workers=None, dimensions=CUBE_DIMENSIONS, chunksize=CHUNK_SIZE):
+    """Cubo de todos os shards de `source`, agregados em `workers` processos."""
+    shards = resolve_shards(source)
+    if not shards:
+        raise FileNotFoundError(f"Nenhum CSV encontrado em {source}")
+    workers = max(1, min(workers or default_workers(), len(shards)))
+    dimensions = list(dimensions)
+    args = ([dimensions] * len(shards), [chunksize] * len(shards))
+
+    if workers == 1:
+        parts = list(map(_aggregate_shard, shards, *args))
+    else:
+        # spawn: um fork do servidor do Streamlit (cheio de threads e locks) pode travar
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            # Lotes de shards por tarefa: exports diários geram milhares de arquivos pequenos
+            batch = max(1, len(shards) // (workers * 4))
+            parts = list(executor.map(_aggregate_shard, shards, *args, chunksize=batch))
+
+    rows = sum(part[0] for part in parts)
+    keys = [key for part in parts for key in part[1]]
+    cube = Cube(dimensions)
+    if keys:
+        values = np.concatenate([part[2] for part in parts if len(part[1])])
+        index = pd.MultiIndex.from_tuples(keys, names=dimensions)
+        cells = pd.DataFrame(values, index=index, columns=CUBE_MEASURES)
+        # Uma única soma no fim, em vez de mesclar cubo a cubo
+        cube.cells = cells.groupby(level=dimensions, sort=False).sum().astype({'linhas': 'int64'})
+    cube.rows = rows
+    return cube
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrega em paralelo um diretório (ou glob) de CSVs.")
+    parser.add_argument('source', help="diretório ou padrão glob dos shards (ex.: 'exports/*.csv')")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    cube = aggregate_shards(args.source, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{len(resolve_shards(args.source))} shards, {cube.rows:,} linhas em {elapsed:.2f}s")
+    metrics = ['ctr', 'cac', 'roas']
+    print(cube.metrics('canal', metrics=metrics)[metrics].to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# campaign_analytics/precompute.py
+"""Pré-cálculo em segundo plano do conteúdo das abas.
+
+Assim que o dataset é carregado, cada aba agenda seus agregados e figuras em
+um pool de threads; os resultados vão para o `shared_cache` à medida que
+ficam prontos. O script principal não espera por nenhum deles: cada aba
+desenha o que já está pronto ou um aviso de "calculando", então a primeira
+tela não depende da aba mais cara.
+
+    precomputer.submit(('aba', 'cac', dataset_key), lambda: ...)
+    resultado = precomputer.result(('aba', 'cac', dataset_key))  # None se pendente
+
+As tarefas rodam fora do contexto do Streamlit: não podem chamar `st.*`.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from campaign_analytics.shared_cache import shared_cache
+
+PRECOMPUTE_WORKERS = 4
+
+
+class Precomputer:
+    """Fila de cálculos por chave do cache, cada chave agendada uma única vez."""
+
+    def __init__(self, cache=shared_cache, workers=PRECOMPUTE_WORKERS):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='precompute')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, compute):
+        """Agenda `compute()` para `key`, a menos que já esteja no cache ou na fila."""
+        with self._lock:
+            if key in self._futures or key in self.cache:
+                return
+            self._futures[key] = self._executor.submit(self.cache.get, key, compute)
+
+    def result(self, key, default=None):
+        """Valor de `key` se já calculado, senão `default`.
+
+        O erro de um cálculo é relançado uma vez e a chave sai da fila, então
+        o próximo `submit` da mesma chave calcula de novo.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                if not future.done():
+                    return default
+                # Com sucesso, o valor passa a ser servido (e despejado) pelo cache
+                del self._futures[key]
+                return future.result()
+        return self.cache.peek(key, default)
+
+    def pending(self, keys):
+        """Chaves de `keys` ainda em cálculo."""
+        with self._lock:
+            return [key for key in keys if key in self._futures and not self._futures[key].done()]
+
+
+# Instância do processo, compartilhada pelas sessões como o `shared_cache`
+precomputer = Precomputer()
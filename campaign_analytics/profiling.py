@@ -0,0 +1,159 @@
+# campaign_analytics/profiling.py
+"""Instrumentação das etapas de cada execução dos dashboards.
+
+Cada etapa nomeada (carga, agregações, construção e serialização de cada
+gráfico) registra tempo de parede, pico de memória (tracemalloc) e número de
+linhas:
+
+    profiler = Profiler(enabled=True)
+    with profiler.stage('load') as etapa:
+        cube = ...
+        etapa.rows = cube.rows
+
+Desligado, `stage()` devolve sempre o mesmo contexto vazio: o custo é uma
+chamada de método por etapa. O tracemalloc é global ao processo, então o
+pico inclui o que outras sessões alocarem ao mesmo tempo.
+"""
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+PERF_LOG = Path(__file__).resolve().parent.parent / '.cache' / 'perf.jsonl'
+
+# Profilers abertos que medem memória: o tracemalloc ligado por eles só é
+# desligado quando o último fecha (sessões simultâneas dividem o mesmo)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        if not _tracing_users and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if not _tracing_users and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class _NullStage:
+    """Etapa de um profiler desligado: não mede nada."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        if self.profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # O pico até aqui pertence à etapa de fora, que vai perder o reset
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            self.base = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        peak_mb = None
+        if self.profiler.trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            peak_mb = max(peak - self.base, 0) / 1024 ** 2
+        self.profiler.records.append({
+            'stage': self.name,
+            'seconds': seconds,
+            'peak_mb': peak_mb,
+            'rows': self.rows,
+            'depth': len(stack),
+        })
+        return False
+
+
+class Profiler:
+    """Coleta as etapas de uma execução (um rerun do Streamlit, um job...)."""
+
+    def __init__(self, enabled=False, trace_memory=True):
+        self.enabled = enabled
+        self.records = []
+        self._stack = []
+        self.trace_memory = enabled and trace_memory
+        if self.trace_memory:
+            _acquire_tracing()
+
+    def stage(self, name, rows=None):
+        """Contexto que mede a etapa `name`; `rows` pode ser definido dentro do bloco."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def close(self):
+        """Encerra a coleta; o tracemalloc ligado pelos profilers para com o último a fechar.
+
+        Pode ser chamado mais de uma vez. Se o tracemalloc já estava ligado
+        por outro código, ele nunca é desligado aqui.
+        """
+        self.enabled = False
+        if self.trace_memory:
+            self.trace_memory = False
+            _release_tracing()
+
+    def summary(self):
+        """Etapas desta execução, na ordem em que terminaram."""
+        columns = ['etapa', 'ms', 'pico_mb', 'linhas']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(self.records)
+        return pd.DataFrame({
+            'etapa': ['  ' * depth + stage for stage, depth in zip(df['stage'], df['depth'])],
+            'ms': df['seconds'] * 1000,
+            'pico_mb': df['peak_mb'],
+            'linhas': df['rows'],
+        })
+
+    def export_jsonl(self, path=PERF_LOG, **context):
+        """Acrescenta uma linha por etapa em `path`, com `context` (ex.: script=...)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps({'timestamp': timestamp, **context, **record}, ensure_ascii=False) + '\n')
+        return path
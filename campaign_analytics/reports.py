@@ -0,0 +1,35 @@
+# campaign_analytics/reports.py
+"""Tabelas de métricas dos dashboards, sem nenhuma dependência de interface.
+
+Cada relatório é um rollup do cubo com as razões pedidas; o app.py e a linha
+de comando (`python -m campaign_analytics`) usam as mesmas definições. Com
+`intervals`, cada métrica ganha as colunas `<métrica>_min`/`<métrica>_max`
+(ver `uncertainty.py`).
+"""
+import numpy as np
+
+from campaign_analytics.uncertainty import metric_intervals
+
+# Nome do relatório -> (dimensões do rollup, métricas)
+REPORTS = {
+    'cac_por_criativo': (['tipo_criativo', 'cta'], ['cac']),
+    'ctr_por_tipo': (['tipo_criativo'], ['ctr']),
+    'roas_por_canal': (['canal'], ['roas', 'cac', 'ctr']),
+    'roas_por_pais': (['pais'], ['roas', 'cac', 'ctr']),
+}
+
+
+def report(cube, name, zero_division=np.nan, intervals=False):
+    """Tabela `name` (ver `REPORTS`): dimensões como colunas e só as métricas."""
+    dims, metrics = REPORTS[name]
+    table = cube.metrics(dims, metrics=metrics, zero_division=zero_division)[metrics]
+    if intervals:
+        for metric in metrics:
+            bounds = metric_intervals(cube, dims, metric)[[f'{metric}_min', f'{metric}_max']]
+            table = table.join(bounds)
+    return table.reset_index()
+
+
+def compute_reports(cube, names=None, intervals=False):
+    """Dicionário nome -> tabela para os relatórios `names` (todos, por padrão)."""
+    return {name: report(cube, name, intervals=intervals) for name in (names or REPORTS)}
@@ -0,0 +1,222 @@
+# campaign_analytics/schema.py
+"""Esquema dos dados de criativos e a tabela de códigos das dimensões.
+
+As colunas categóricas (canal, tipo_criativo, ...) têm poucos valores
+distintos. A `CodeTable` dá a cada valor um código inteiro pequeno e estável:
+os códigos só são acrescentados, nunca renumerados, e a tabela é gravada ao
+lado dos dados (`.cache/colunar/codigos.json`). O cubo guarda as dimensões
+como categorias na ordem dos códigos e os filtros indexam os bitmaps pelo
+código, então o mesmo código significa o mesmo valor em qualquer arquivo ou
+execução. Os códigos só existem nessa tabela (cubos e caches gravam os
+valores): apagar o arquivo com os dashboards parados recomeça a numeração.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+# ===================================
+# 🧾 ESQUEMA DOS DADOS
+# ===================================
+ID_COLUMN = 'id'  # opcional; obrigatório só no modo incremental
+CATEGORICAL_COLUMNS = ['canal', 'tipo_criativo', 'imagem_tipo', 'texto_criativo', 'cta', 'pais']
+COUNT_COLUMNS = ['impressoes', 'cliques', 'leads', 'conversoes']
+MEASURES = COUNT_COLUMNS + ['custo_total', 'receita']
+
+DTYPES = {
+    ID_COLUMN: 'int64',
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'int32' for col in COUNT_COLUMNS},
+    'custo_total': 'float32',
+    'receita': 'float32',
+}
+# Tipos da leitura do CSV: contagens como float, então células em branco
+# (NaN) e decimais ("3.0") passam; `normalize_chunk` zera as brancas e
+# converte para os tipos de `DTYPES`
+READ_DTYPES = {**DTYPES, **{col: 'float64' for col in COUNT_COLUMNS}}
+
+# Valor usado quando o CSV não traz uma das dimensões
+MISSING_CATEGORY = 'n/d'
+
+# ===================================
+# 🔢 TABELA DE CÓDIGOS
+# ===================================
+CODE_DTYPE = np.int32
+CODES_PATH = Path(__file__).resolve().parent.parent / '.cache' / 'colunar' / 'codigos.json'
+
+
+@contextmanager
+def _file_lock(path):
+    """Trava exclusiva entre processos, mantida em um arquivo `.lock` ao lado de `path`."""
+    lock_path = Path(path).with_suffix('.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(path, text):
+    """Grava `text` em um temporário único e troca `path` de uma vez.
+
+    O temporário nasce com permissão 0600; o arquivo final recebe a
+    permissão padrão (0666 menos a umask), como um `open(path, 'w')`.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, prefix=f'{path.stem}-',
+                                     suffix='.tmp', delete=False) as f:
+        f.write(text)
+    try:
+        os.chmod(f.name, 0o666 & ~_UMASK)
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+# Lida uma vez (os.umask só lê trocando o valor)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class CodeTable:
+    """Valor <-> código inteiro de cada coluna categórica, só com acréscimos.
+
+    Com `path`, a tabela é carregada de lá e regravada sempre que ganha
+    valores novos. Cada acréscimo acontece com o arquivo travado (entre
+    threads e entre processos): a tabela relê o arquivo, incorpora os valores
+    criados por outros processos e só então numera os que ainda faltam, então
+    dois processos nunca dão o mesmo código a valores diferentes.
+    """
+
+    def __init__(self, values=None, path=None):
+        self.path = Path(path) if path is not None else None
+        self._values = {col: list(vals) for col, vals in (values or {}).items()}
+        self._index = {col: {v: i for i, v in enumerate(vals)} for col, vals in self._values.items()}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=CODES_PATH):
+        path = Path(path)
+        return cls(cls._read(path), path)
+
+    @staticmethod
+    def _read(path):
+        return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+    def save(self, path=None):
+        """Grava a tabela (junto com os valores que outros processos já gravaram em `path`)."""
+        path = Path(path or self.path)
+        with self._lock, _file_lock(path):
+            self._merge(self._read(path))
+            self._write(path)
+        return path
+
+    def _merge(self, stored):
+        """Acrescenta os valores de `stored` que a tabela ainda não tem (chamar com o lock)."""
+        for column, values in stored.items():
+            index = self._index.setdefault(column, {})
+            known = self._values.setdefault(column, [])
+            for value in values:
+                if value not in index:
+                    index[value] = len(known)
+                    known.append(value)
+
+    def _write(self, path):
+        """Grava a tabela em `path` de uma vez (chamar com o lock)."""
+        _write_atomic(path, json.dumps(self._values, ensure_ascii=False, indent=1))
+
+    def values(self, column):
+        """Valores de `column` na ordem dos códigos."""
+        with self._lock:
+            return list(self._values.get(column, []))
+
+    # ===================================
+    # ↔️ CODIFICAÇÃO
+    # ===================================
+    def _lookup(self, column, values):
+        """Código de cada valor de `values` (distintos), criando os que faltam."""
+        with self._lock:
+            index = self._index.setdefault(column, {})
+            if any(value not in index for value in values) and self.path is not None:
+                with _file_lock(self.path):
+                    self._merge(self._read(self.path))
+                    size = len(self._values.get(column, []))
+                    codes = self._assign(column, values)
+                    if len(self._values[column]) > size:
+                        self._write(self.path)
+                return codes
+            return self._assign(column, values)
+
+    def _assign(self, column, values):
+        """Códigos de `values`, numerando os valores novos (chamar com o lock)."""
+        index = self._index.setdefault(column, {})
+        known = self._values.setdefault(column, [])
+        codes = []
+        for value in values:
+            code = index.get(value)
+            if code is None:
+                if len(known) >= np.iinfo(CODE_DTYPE).max:
+                    raise ValueError(f"A coluna {column} passou de {np.iinfo(CODE_DTYPE).max} valores distintos")
+                code = index[value] = len(known)
+                known.append(value)
+            codes.append(code)
+        return codes
+
+    def codes(self, column, values):
+        """Array de `CODE_DTYPE` com o código de cada linha (-1 para valores ausentes)."""
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            raw, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            raw, uniques = pd.factorize(values)
+        # Posição extra para o código -1 (valor ausente)
+        mapping = np.array(self._lookup(column, list(uniques)) + [-1], dtype=CODE_DTYPE)
+        return mapping[raw]
+
+    def find(self, column, values):
+        """Códigos de `values` sem criar valores novos (-1 para desconhecidos)."""
+        with self._lock:
+            index = self._index.get(column, {})
+            return np.array([index.get(value, -1) for value in values], dtype=CODE_DTYPE)
+
+    def categorical(self, column, values):
+        """`values` como Categorical cujas categorias são a tabela inteira, na ordem dos códigos."""
+        codes = self.codes(column, values)
+        return pd.Categorical.from_codes(codes, self.values(column))
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def code_table(path=CODES_PATH):
+    """Tabela de códigos do processo, carregada na primeira chamada."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = CodeTable.load(path)
+    return _table
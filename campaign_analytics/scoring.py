@@ -0,0 +1,187 @@
+# campaign_analytics/scoring.py
+"""Modelo de probabilidade de sucesso dos criativos (`probabilidade_sucesso`).
+
+Regressão logística sobre o one-hot de canal, tipo_criativo, imagem_tipo,
+texto_criativo e cta. Como todas as variáveis são categóricas, o treino é
+feito sobre as combinações distintas (com contagens) e a pontuação de cada
+linha é só uma soma de pesos indexados pelos códigos das categorias, o que
+permite pontuar milhões de linhas por segundo.
+
+O modelo é salvo em disco e carregado sob demanda por `get_model()`.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.ingestion import CHUNK_SIZE, ID_COLUMN, read_csv_chunks
+from campaign_analytics.metrics import grouped_sums
+
+FEATURES = ['canal', 'tipo_criativo', 'imagem_tipo', 'texto_criativo', 'cta']
+LABEL = 'bom_desempenho'
+
+# Sem rótulo no arquivo, "bom desempenho" é ter pelo menos 3 conversões
+# (mesma regra que gerou previsoes_criativos.csv)
+GOOD_CONVERSIONS = 3
+
+ROOT = Path(__file__).resolve().parent.parent
+MODEL_PATH = ROOT / '.cache' / 'modelo' / 'scoring.npz'
+TRAINING_DATA = ROOT / 'dados_criativos.csv'
+
+NEWTON_STEPS = 25
+L2_PENALTY = 1.0
+
+
+def labels(df):
+    """Rótulo de treino: `bom_desempenho` se existir, senão a regra de conversões."""
+    if LABEL in df:
+        return df[LABEL].to_numpy(dtype='float64')
+    return (df['conversoes'].to_numpy() >= GOOD_CONVERSIONS).astype('float64')
+
+
+class ScoringModel:
+    """Intercepto e um vetor de pesos por variável, indexado pelo código da categoria."""
+
+    def __init__(self, categories, weights, intercept):
+        self.categories = {col: list(values) for col, values in categories.items()}
+        # Posição extra com peso 0: código -1 (categoria desconhecida) cai nela
+        self.weights = {col: np.append(np.asarray(weights[col], dtype='float64'), 0.0) for col in FEATURES}
+        self.intercept = float(intercept)
+
+    # ===================================
+    # 🏋️ TREINO
+    # ===================================
+    @classmethod
+    def fit(cls, df):
+        """Ajusta o modelo com Newton-Raphson (com penalidade L2) nas combinações distintas."""
+        frame = df[FEATURES].astype('category').assign(amostras=1.0, positivos=labels(df))
+        combos = grouped_sums(frame, FEATURES, ['amostras', 'positivos'])
+        categories = {col: list(frame[col].cat.categories) for col in FEATURES}
+
+        # Matriz one-hot das combinações: intercepto + um bloco por variável
+        sizes = [len(categories[col]) for col in FEATURES]
+        offsets = np.cumsum([1] + sizes[:-1])
+        design = np.zeros((len(combos), 1 + sum(sizes)))
+        design[:, 0] = 1.0
+        for col, offset in zip(FEATURES, offsets):
+            codes = combos.index.get_level_values(col).map({v: i for i, v in enumerate(categories[col])})
+            design[np.arange(len(combos)), offset + np.asarray(codes)] = 1.0
+
+        n = combos['amostras'].to_numpy()
+        positives = combos['positivos'].to_numpy()
+        penalty = np.full(design.shape[1], L2_PENALTY)
+        penalty[0] = 0.0
+        beta = np.zeros(design.shape[1])
+        for _ in range(NEWTON_STEPS):
+            p = 1.0 / (1.0 + np.exp(-design @ beta))
+            gradient = design.T @ (positives - n * p) - penalty * beta
+            hessian = (design * (n * p * (1 - p))[:, None]).T @ design + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            beta += step
+            if np.abs(step).max() < 1e-8:
+                break
+
+        weights = {col: beta[offset:offset + size] for col, offset, size in zip(FEATURES, offsets, sizes)}
+        return cls(categories, weights, beta[0])
+
+    # ===================================
+    # 🎯 PONTUAÇÃO
+    # ===================================
+    def _codes(self, column, col):
+        # Recodifica só as categorias (poucas) e aplica o mapa aos códigos
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            categories, codes = column.cat.categories, column.cat.codes.to_numpy()
+        else:
+            # Valores fora do modelo ficam com -1 (peso 0)
+            return pd.Index(self.categories[col]).get_indexer(column)
+        lookup = {value: i for i, value in enumerate(self.categories[col])}
+        mapping = np.array([lookup.get(value, -1) for value in categories] + [-1])
+        return mapping[codes]
+
+    def predict_proba(self, df):
+        """Probabilidade de sucesso de cada linha de `df`."""
+        logit = np.full(len(df), self.intercept)
+        for col in FEATURES:
+            if col in df:
+                logit += self.weights[col][self._codes(df[col], col)]
+        return 1.0 / (1.0 + np.exp(-logit))
+
+    def score(self, df):
+        """`df` com as colunas `probabilidade_sucesso` e `bom_desempenho` previstas."""
+        proba = self.predict_proba(df)
+        return df.assign(probabilidade_sucesso=proba, bom_desempenho=(proba >= 0.5).astype('int8'))
+
+    def score_chunks(self, chunks):
+        """Pontua uma sequência de blocos (DataFrames), um por vez."""
+        for chunk in chunks:
+            yield self.score(chunk)
+
+    def top_combinations(self, k=5):
+        """As `k` combinações de variáveis com maior probabilidade prevista."""
+        grid = pd.MultiIndex.from_product([self.categories[col] for col in FEATURES], names=FEATURES)
+        frame = grid.to_frame(index=False).astype('category')
+        return self.score(frame).nlargest(k, 'probabilidade_sucesso').reset_index(drop=True)
+
+    # ===================================
+    # 💾 PERSISTÊNCIA
+    # ===================================
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(
+            tmp_path,
+            intercept=self.intercept,
+            categories=json.dumps(self.categories),
+            **{f'w_{col}': self.weights[col][:-1] for col in FEATURES}
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as data:
+            categories = json.loads(str(data['categories']))
+            weights = {col: data[f'w_{col}'] for col in FEATURES}
+            return cls(categories, weights, data['intercept'])
+
+
+def train(source=TRAINING_DATA, path=MODEL_PATH):
+    """Treina com um CSV no formato de `dados_criativos.csv` e salva o modelo."""
+    columns = FEATURES + ['conversoes', LABEL]
+    df = pd.read_csv(source, usecols=lambda col: col in columns)
+    model = ScoringModel.fit(df)
+    model.save(path)
+    return model
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model(path=MODEL_PATH):
+    """Modelo carregado na primeira chamada (treinado antes, se ainda não existir)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = ScoringModel.load(path) if Path(path).exists() else train(path=path)
+    return _model
+
+
+def score_csv(source, output, chunksize=CHUNK_SIZE, model=None):
+    """Pontua um CSV em blocos e grava o resultado em `output`; devolve o número de linhas."""
+    model = model if model is not None else get_model()
+    header = True
+    rows = 0
+    for scored in model.score_chunks(read_csv_chunks(source, chunksize)):
+        columns = [col for col in [ID_COLUMN] + FEATURES if col in scored]
+        scored[columns + ['probabilidade_sucesso', 'bom_desempenho']].to_csv(
+            output, mode='w' if header else 'a', header=header, index=False
+        )
+        header = False
+        rows += len(scored)
+    return rows
@@ -0,0 +1,136 @@
+# campaign_analytics/shared_cache.py
+"""Cache do processo para datasets e agregados, compartilhado entre sessões.
+
+O Streamlit roda o script de novo para cada sessão, e `st.cache_data` devolve
+uma cópia por chamada. Aqui cada valor é guardado uma vez por processo,
+indexado pelo hash do conteúdo (mais o que mais definir o resultado), e todas
+as sessões recebem o mesmo objeto: a memória cresce com o número de datasets
+distintos e não com o de usuários simultâneos. Os valores são somente
+leitura por convenção (e, para arrays NumPy, de fato).
+
+O tamanho é limitado em bytes, com despejo LRU.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def sizeof(value):
+    """Estimativa do tamanho de `value` em memória, em bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if hasattr(value, 'to_plotly_json'):
+        # Figuras do Plotly: o objeto tem referências circulares; conta só os dados
+        return sizeof(value.to_plotly_json())
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return sys.getsizeof(value) + sizeof(vars(value))
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class SharedCache:
+    """LRU limitado a `max_bytes`, com contadores de acertos, faltas e despejos."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Valor de `key`, calculado com `compute()` só se ainda não estiver no cache.
+
+        Sessões que pedem a mesma chave ao mesmo tempo esperam o primeiro
+        cálculo em vez de repeti-lo.
+        """
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key)
+            key_lock = self._pending.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    return self._hit(key)
+            try:
+                value = _freeze(compute())
+                size = sizeof(value)
+            except BaseException:
+                with self._lock:
+                    self._pending.pop(key, None)
+                raise
+            # Sai da fila e entra no cache de uma vez: quem chegar depois já encontra o valor
+            with self._lock:
+                self._pending.pop(key, None)
+                self.misses += 1
+                if size <= self.max_bytes:
+                    self._entries[key] = (value, size)
+                    self.nbytes += size
+                    self._evict()
+        return value
+
+    def _hit(self, key):
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key][0]
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def peek(self, key, default=None):
+        """Valor de `key` se já estiver no cache, sem calcular nem esperar."""
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key)
+        return default
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Instância do processo: sobrevive aos reruns e é compartilhada entre sessões
+shared_cache = SharedCache()
@@ -0,0 +1,251 @@
+# campaign_analytics/storage.py
+"""Cache colunar (Arrow IPC/Feather) dos CSVs de criativos.
+
+Cada CSV é convertido uma única vez para um arquivo `.arrow` identificado
+pelo hash do conteúdo; se o CSV muda, o hash muda e o cache antigo do mesmo
+caminho é descartado. Uploads (sem caminho) não têm versão anterior: ficam
+em arquivos `upload-*` limitados a `UPLOAD_CACHE_BYTES`, e os usados há mais
+tempo saem primeiro. A leitura usa memory-map e projeção de colunas, então
+cada aba só toca as colunas de que precisa.
+"""
+import glob
+import hashlib
+import io
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.ipc as ipc
+
+from campaign_analytics.ingestion import normalize_chunk
+from campaign_analytics.schema import CATEGORICAL_COLUMNS, COUNT_COLUMNS, DTYPES, READ_DTYPES
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'colunar'
+
+# Tipos da leitura do CSV (contagens como float, ver `schema.READ_DTYPES`) e
+# os gravados no cache (contagens já inteiras)
+ARROW_TYPES = {
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    **{col: pa.from_numpy_dtype(np.dtype(dtype)) for col, dtype in READ_DTYPES.items() if dtype != 'category'},
+}
+COUNT_TYPE = pa.from_numpy_dtype(np.dtype(DTYPES[COUNT_COLUMNS[0]]))
+
+HASH_BLOCK = 8 * 1024 * 1024
+CSV_BLOCK = 16 * 1024 * 1024
+# Espaço máximo dos caches de uploads; os usados há mais tempo são apagados
+UPLOAD_CACHE_BYTES = 2 * 1024 ** 3
+UPLOAD_PREFIX = 'upload-'
+
+# (caminho, tamanho, mtime) -> hash, para não reler arquivos inalterados
+_path_hashes = {}
+
+
+# ===================================
+# 🔑 HASH DO CONTEÚDO
+# ===================================
+def content_hash(source):
+    """Hash (blake2b) do conteúdo de um caminho, bytes ou arquivo aberto."""
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        key = (os.fspath(source), stat.st_size, stat.st_mtime_ns)
+        if key not in _path_hashes:
+            with open(source, 'rb') as f:
+                _path_hashes[key] = _hash_stream(f)
+        return _path_hashes[key]
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(source, digest_size=16).hexdigest()
+    position = source.tell()
+    source.seek(0)
+    try:
+        return _hash_stream(source)
+    finally:
+        source.seek(position)
+
+
+def _hash_stream(f):
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: f.read(HASH_BLOCK), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+# ===================================
+# 💾 CONVERSÃO CSV -> ARROW
+# ===================================
+def _unify_dictionaries(batch, dictionaries):
+    """Reescreve as colunas categóricas contra um dicionário que só cresce.
+
+    Cada bloco do leitor CSV traz seu próprio dicionário; o formato de arquivo
+    IPC só aceita dicionários que estendem o anterior (deltas).
+    """
+    columns = []
+    for field, column in zip(batch.schema, batch.columns):
+        if pa.types.is_dictionary(field.type):
+            values = dictionaries.setdefault(field.name, {})
+            mapping = pa.array(
+                [values.setdefault(value, len(values)) for value in column.dictionary.to_pylist()],
+                type=pa.int32(),
+            )
+            column = pa.DictionaryArray.from_arrays(
+                pc.take(mapping, column.indices), pa.array(list(values), type=pa.string())
+            )
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, schema=batch.schema)
+
+
+def _cache_schema(schema):
+    """Esquema gravado no cache: o da leitura com as contagens inteiras."""
+    return pa.schema([
+        field.with_type(COUNT_TYPE) if field.name in COUNT_COLUMNS else field
+        for field in schema
+    ])
+
+
+def _fill_counts(batch, schema):
+    """Contagens em branco viram 0 e as decimais são arredondadas para inteiro."""
+    columns = [
+        pc.cast(pc.round(pc.fill_null(column, 0)), COUNT_TYPE) if field.name in COUNT_COLUMNS else column
+        for field, column in zip(batch.schema, batch.columns)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _source_prefix(source, name=None):
+    """Parte fixa do nome do cache de `source` (tudo menos o hash do conteúdo).
+
+    Caminhos levam o hash do caminho absoluto, então só versões do mesmo
+    arquivo compartilham o prefixo; uploads levam `UPLOAD_PREFIX`.
+    """
+    if name is None:
+        name = source if _is_path(source) else getattr(source, 'name', None) or 'upload.csv'
+    stem = Path(os.fspath(name)).stem
+    if not _is_path(source):
+        return f"{UPLOAD_PREFIX}{stem}"
+    location = hashlib.blake2b(os.fsencode(Path(source).resolve()), digest_size=4).hexdigest()
+    return f"{stem}-{location}"
+
+
+def _entries(cache_dir, prefix):
+    """Caches com exatamente `prefix` + hash do conteúdo."""
+    pattern = re.compile(re.escape(prefix) + r'-[0-9a-f]{32}\.arrow')
+    return [path for path in Path(cache_dir).glob(f"{glob.escape(prefix)}-*.arrow") if pattern.fullmatch(path.name)]
+
+
+def cache_path(source, name=None, cache_dir=CACHE_DIR, digest=None):
+    """Caminho do cache de `source`, mesmo que ainda não exista.
+
+    `digest` é o `content_hash(source)` já calculado (ex.: guardado por quem
+    recebe o mesmo upload várias vezes), para não reler o conteúdo.
+    """
+    digest = digest if digest is not None else content_hash(source)
+    return Path(cache_dir) / f"{_source_prefix(source, name)}-{digest}.arrow"
+
+
+def _evict_uploads(cache_dir, keep, max_bytes=None):
+    """Apaga os caches de upload menos usados até caberem em `max_bytes`."""
+    max_bytes = UPLOAD_CACHE_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for path in Path(cache_dir).glob(f"{UPLOAD_PREFIX}*.arrow"):
+        if path == keep:
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = keep.stat().st_size + sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink(missing_ok=True)
+        except PermissionError:
+            # Ainda mapeado por outra sessão (Windows): fica para a próxima
+            continue
+        total -= size
+
+
+def cache_csv(source, name=None, cache_dir=CACHE_DIR, digest=None):
+    """Converte o CSV para o cache colunar (se preciso) e devolve o caminho."""
+    path = cache_path(source, name, cache_dir, digest)
+    if path.exists():
+        if not _is_path(source):
+            # Marca o upload como usado agora (ordem de despejo)
+            os.utime(path)
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    stream = open(source, 'rb') if _is_path(source) else source
+    if isinstance(stream, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(stream)
+    else:
+        stream.seek(0)
+    # Temporário único: duas sessões convertendo o mesmo CSV não se atropelam
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.stem}-", suffix='.tmp')
+    os.close(fd)
+    try:
+        # Colunas do esquema ausentes no CSV são ignoradas pelo leitor
+        reader = pcsv.open_csv(
+            stream,
+            read_options=pcsv.ReadOptions(block_size=CSV_BLOCK),
+            convert_options=pcsv.ConvertOptions(column_types=ARROW_TYPES),
+        )
+        dictionaries = {}
+        options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        schema = _cache_schema(reader.schema)
+        with ipc.new_file(tmp_path, schema, options=options) as writer:
+            for batch in reader:
+                writer.write_batch(_fill_counts(_unify_dictionaries(batch, dictionaries), schema))
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    finally:
+        if stream is not source:
+            stream.close()
+
+    if _is_path(source):
+        # Versões anteriores do mesmo arquivo ficam obsoletas
+        for stale in _entries(cache_dir, _source_prefix(source, name)):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    else:
+        _evict_uploads(cache_dir, keep=path)
+    return path
+
+
+# ===================================
+# 📂 LEITURA COM MEMORY-MAP
+# ===================================
+def _open_table(path, columns=None):
+    with pa.memory_map(os.fspath(path)) as source:
+        table = ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.schema.names])
+    return table
+
+
+def load_columns(path, columns=None):
+    """DataFrame só com `columns`, lido do cache via memory-map."""
+    return _open_table(path, columns).to_pandas()
+
+
+def iter_chunks(path, columns=None):
+    """Percorre o cache em blocos (um por record batch), no esquema do projeto."""
+    for batch in _open_table(path, columns).to_batches():
+        yield normalize_chunk(batch.to_pandas())
+
+
+if __name__ == '__main__':
+    for csv_path in sys.argv[1:]:
+        print(f"{csv_path} -> {cache_csv(csv_path)}")
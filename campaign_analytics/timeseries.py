@@ -0,0 +1,248 @@
+# campaign_analytics/timeseries.py
+"""Série temporal de investimento, conversões e receita por dia e canal.
+
+Os dados ficam em um arquivo SQLite local com uma linha por período, canal e
+granularidade. As agregações semanais e mensais são materializadas na
+escrita: cada `write` recalcula só as semanas e meses tocados pelas linhas
+novas. Uma consulta de três anos por mês lê ~36 linhas por canal, então
+qualquer janela renderiza tão rápido quanto 90 dias.
+
+As razões (CAC, ROAS, CTR) são calculadas depois da soma, nunca somadas.
+
+Dados reais entram pela linha de comando, a partir de um CSV diário (ou de
+eventos com data) com as colunas da série ou do esquema dos criativos:
+
+    python -m campaign_analytics.timeseries ingest gastos_diarios.csv
+
+Enquanto nada foi ingerido, os dashboards mostram a série sintética de
+demonstração, gravada em um arquivo separado.
+"""
+import argparse
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache'
+DB_PATH = CACHE_DIR / 'timeseries.sqlite'
+DEMO_PATH = CACHE_DIR / 'series.sqlite'
+
+SERIES_MEASURES = ['spend', 'conversions', 'revenue', 'impressions', 'clicks']
+
+# Início do período de uma data (texto ISO) em SQL e o fim do período coberto
+GRANULARITIES = {
+    'day': ("date({})", "date({})"),
+    'week': ("date({}, '-6 days', 'weekday 1')", "date({}, 'weekday 0')"),
+    'month': ("date({}, 'start of month')", "date({}, 'start of month', '+1 month', '-1 day')"),
+}
+
+DEMO_DAYS = 3 * 365
+
+# Colunas do esquema dos criativos aceitas na ingestão, com o nome na série
+COLUMN_ALIASES = {
+    'data': 'date',
+    'canal': 'channel',
+    'custo_total': 'spend',
+    'conversoes': 'conversions',
+    'receita': 'revenue',
+    'impressoes': 'impressions',
+    'cliques': 'clicks',
+}
+INGEST_CHUNK = 250_000
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS series (
+    granularity TEXT NOT NULL,
+    period TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    {', '.join(f'{col} REAL NOT NULL DEFAULT 0' for col in SERIES_MEASURES)},
+    PRIMARY KEY (granularity, period, channel)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS series_channel ON series (granularity, channel, period);
+"""
+
+
+def with_ratios(df):
+    """`df` com CAC, ROAS e CTR calculados a partir das somas."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return df.assign(
+            cac=df['spend'] / df['conversions'].where(df['conversions'] > 0),
+            roas=df['revenue'] / df['spend'].where(df['spend'] > 0),
+            ctr=df['clicks'] / df['impressions'].where(df['impressions'] > 0),
+        )
+
+
+class TimeSeriesStore:
+    """Série diária por canal com rollups semanais e mensais, em SQLite."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # Uma conexão por operação: o Streamlit roda cada sessão em uma thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    # ===================================
+    # ✍️ ESCRITA
+    # ===================================
+    def write(self, df):
+        """Grava (ou substitui) linhas diárias de `df` e atualiza os rollups afetados.
+
+        `df` precisa de `date`, `channel` e das medidas de `SERIES_MEASURES`
+        (as ausentes valem 0). Devolve o número de linhas diárias gravadas.
+        """
+        if df.empty:
+            return 0
+        dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        rows = pd.DataFrame({'period': dates, 'channel': df['channel'].astype(str)})
+        for col in SERIES_MEASURES:
+            rows[col] = df[col].to_numpy(dtype='float64') if col in df else 0.0
+        # Linhas repetidas para o mesmo dia e canal são somadas
+        rows = rows.groupby(['period', 'channel'], as_index=False, sort=False).sum()
+
+        columns = ', '.join(SERIES_MEASURES)
+        placeholders = ', '.join('?' * len(SERIES_MEASURES))
+        first, last = rows['period'].min(), rows['period'].max()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO series (granularity, period, channel, {columns}) "
+                f"VALUES ('day', ?, ?, {placeholders})",
+                rows.itertuples(index=False, name=None),
+            )
+            for granularity, (start_sql, end_sql) in GRANULARITIES.items():
+                if granularity == 'day':
+                    continue
+                sums = ', '.join(f'SUM({col})' for col in SERIES_MEASURES)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO series (granularity, period, channel, {columns}) "
+                    f"SELECT '{granularity}', {start_sql.format('period')}, channel, {sums} "
+                    f"FROM series WHERE granularity = 'day' "
+                    f"AND period BETWEEN {start_sql.format('?')} AND {end_sql.format('?')} "
+                    f"GROUP BY 2, 3",
+                    (first, last),
+                )
+        return len(rows)
+
+    # ===================================
+    # 🔎 CONSULTA
+    # ===================================
+    def query(self, start=None, end=None, granularity='day', channels=None, by_channel=False):
+        """Série entre `start` e `end` (inclusive) na granularidade pedida.
+
+        Sem `by_channel` os canais são somados em uma linha por período. O
+        resultado tem `date`, (`channel`), as medidas e `cac`, `roas` e `ctr`.
+        """
+        start_sql, _ = GRANULARITIES[granularity]
+        conditions = ['granularity = ?']
+        params = [granularity]
+        if start is not None:
+            # O período que contém `start` entra inteiro
+            conditions.append(f"period >= {start_sql.format('?')}")
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end is not None:
+            conditions.append('period <= ?')
+            params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+        if channels:
+            conditions.append(f"channel IN ({', '.join('?' * len(channels))})")
+            params.extend(channels)
+
+        keys = 'period, channel' if by_channel else 'period'
+        sums = ', '.join(f'SUM({col}) AS {col}' for col in SERIES_MEASURES)
+        sql = (
+            f"SELECT {keys}, {sums} FROM series WHERE {' AND '.join(conditions)} "
+            f"GROUP BY {keys} ORDER BY {keys}"
+        )
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        df = df.rename(columns={'period': 'date'})
+        df['date'] = pd.to_datetime(df['date'])
+        return with_ratios(df)
+
+    def last(self, days, granularity='day', **kwargs):
+        """Os últimos `days` dias da série (a partir do dia mais recente gravado)."""
+        _, end = self.date_range()
+        if end is None:
+            return self.query(granularity=granularity, **kwargs)
+        return self.query(end - pd.Timedelta(days=days - 1), end, granularity, **kwargs)
+
+    def date_range(self):
+        with closing(self._connect()) as conn:
+            first, last = conn.execute(
+                "SELECT MIN(period), MAX(period) FROM series WHERE granularity = 'day'"
+            ).fetchone()
+        return (pd.Timestamp(first) if first else None, pd.Timestamp(last) if last else None)
+
+
+_demo_lock = threading.Lock()
+
+
+def demo_store(path=DEMO_PATH, days=DEMO_DAYS, seed=42):
+    """Store com a série sintética do dashboard (gravada na primeira vez)."""
+    from campaign_analytics.generator import generate_daily_series
+
+    store = TimeSeriesStore(path)
+    with _demo_lock:
+        if store.date_range()[1] is None:
+            store.write(generate_daily_series(days, seed=seed))
+    return store
+
+
+def series_store(path=DB_PATH):
+    """Store com os dados ingeridos ou, se ainda não houver nenhum, o de demonstração."""
+    store = TimeSeriesStore(path)
+    return store if store.date_range()[1] is not None else demo_store()
+
+
+# ===================================
+# 📥 INGESTÃO
+# ===================================
+def ingest_csv(source, store=None, chunksize=INGEST_CHUNK):
+    """Soma o CSV por dia e canal, em blocos, e grava no store. Devolve o número de linhas diárias.
+
+    Aceita `date`/`data`, `channel`/`canal` e as medidas com o nome da série
+    ou do esquema dos criativos (ver `COLUMN_ALIASES`); medidas ausentes
+    valem 0. Vários registros do mesmo dia e canal, em qualquer ponto do
+    arquivo, são somados antes da gravação, que substitui os dias já gravados.
+    """
+    store = store if store is not None else TimeSeriesStore()
+    known = set(COLUMN_ALIASES) | set(COLUMN_ALIASES.values())
+    parts = []
+    with pd.read_csv(source, usecols=lambda col: col in known, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk.rename(columns=COLUMN_ALIASES)
+            missing = {'date', 'channel'} - set(chunk)
+            if missing:
+                raise ValueError(f"O CSV precisa das colunas de data e canal (faltam: {', '.join(sorted(missing))})")
+            measures = [col for col in SERIES_MEASURES if col in chunk]
+            chunk = chunk.assign(date=pd.to_datetime(chunk['date'], format='ISO8601').dt.normalize())
+            parts.append(chunk.groupby(['date', 'channel'], sort=False)[measures].sum())
+    if not parts:
+        return 0
+    # Uma linha por dia e canal: o total fica pequeno mesmo para arquivos enormes
+    daily = pd.concat(parts).groupby(level=['date', 'channel']).sum().reset_index()
+    return store.write(daily)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Série temporal por dia e canal (SQLite local).")
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest_parser = sub.add_parser('ingest', help="grava um CSV diário no store")
+    ingest_parser.add_argument('source', help="CSV com data, canal e as medidas")
+    ingest_parser.add_argument('--db', default=DB_PATH, help="arquivo SQLite do store")
+    args = parser.parse_args(argv)
+
+    store = TimeSeriesStore(args.db)
+    rows = ingest_csv(args.source, store)
+    first, last = store.date_range()
+    print(f"{rows:,} linhas diárias gravadas em {args.db} (série de {first:%Y-%m-%d} a {last:%Y-%m-%d})")
+
+
+if __name__ == '__main__':
+    main()
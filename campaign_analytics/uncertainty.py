@@ -0,0 +1,107 @@
+# campaign_analytics/uncertainty.py
+"""Intervalos de confiança das métricas por grupo.
+
+Grupos pequenos têm métricas instáveis: um CAC de R$ 20 com 2 conversões não
+vale o mesmo que um com 2.000. Cada métrica ganha as colunas `<métrica>_min`
+e `<métrica>_max`:
+
+- CTR e CVR são proporções (cliques de impressões, conversões de cliques):
+  intervalo de Wilson, analítico.
+- CAC, CPA e ROAS são razões de somas sem distribuição fechada: bootstrap
+  sobre as células do cubo, sem voltar às linhas. Em cada réplica, a célula
+  com `n` linhas recebe `K ~ Poisson(n)` linhas (equivale a pesos de
+  Poisson por linha) e suas somas viram `K` vezes a média da célula mais um
+  desvio normal com a covariância de `K` linhas, tirada dos segundos
+  momentos do cubo (Σx², Σy², Σxy). Assim a variância de cada soma é Σx²,
+  a mesma do bootstrap linha a linha, inclusive a variação entre as linhas
+  de uma mesma célula. Todas as réplicas saem de uma única matriz
+  réplicas × células, somada por grupo com um produto de matrizes.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+from campaign_analytics.cube import moment_column
+from campaign_analytics.metrics import RATIOS
+
+CONFIDENCE = 0.95
+BOOTSTRAP_REPLICATES = 1000
+# Métricas que são proporções (numerador contido no denominador)
+BINOMIAL_METRICS = ['ctr', 'cvr']
+
+
+def wilson_interval(successes, trials, confidence=CONFIDENCE):
+    """Limites (inferior, superior) de Wilson; NaN onde não há tentativas."""
+    successes = np.asarray(successes, dtype='float64')
+    trials = np.asarray(trials, dtype='float64')
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.minimum(successes, trials) / trials
+        center = (p + z * z / (2 * trials)) / (1 + z * z / trials)
+        half = z / (1 + z * z / trials) * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+    valid = trials > 0
+    return np.where(valid, center - half, np.nan), np.where(valid, center + half, np.nan)
+
+
+def rate_intervals(cube, dims, metric='ctr', confidence=CONFIDENCE):
+    """`metric` (CTR ou CVR) por `dims`, com o intervalo de Wilson."""
+    numerator, denominator = RATIOS[metric]
+    table = cube.metrics(dims, [metric])
+    low, high = wilson_interval(table[numerator], table[denominator], confidence)
+    return table[[metric]].assign(**{f'{metric}_min': low, f'{metric}_max': high})
+
+
+def bootstrap_intervals(cube, dims, metric='cac', replicates=BOOTSTRAP_REPLICATES,
+                        confidence=CONFIDENCE, seed=0):
+    """`metric` por `dims`, com o intervalo percentil do bootstrap de Poisson."""
+    numerator, denominator = RATIOS[metric]
+    dims = [dims] if isinstance(dims, str) else list(dims)
+    table = cube.metrics(dims, [metric])[[metric]]
+    cells = cube.cells
+    if not len(cells):
+        return table.assign(**{f'{metric}_min': np.nan, f'{metric}_max': np.nan})
+
+    # Pertinência célula -> grupo, na ordem das linhas de `table`
+    group = cells.groupby(level=dims, sort=True).ngroup().to_numpy()
+    membership = np.zeros((len(cells), len(table)))
+    membership[np.arange(len(cells)), group] = 1.0
+
+    rng = np.random.default_rng(seed)
+    rows = cells['linhas'].to_numpy(dtype='float64')
+    draws = rng.poisson(rows, size=(replicates, len(cells))).astype('float64')
+
+    # Médias e (co)variâncias por linha dentro de cada célula
+    def moment(a, b):
+        return cells[moment_column(a, b)].to_numpy(dtype='float64') / rows
+
+    mean_x = cells[numerator].to_numpy(dtype='float64') / rows
+    mean_y = cells[denominator].to_numpy(dtype='float64') / rows
+    sd_x = np.sqrt(np.clip(moment(numerator, numerator) - mean_x ** 2, 0, None))
+    sd_y = np.sqrt(np.clip(moment(denominator, denominator) - mean_y ** 2, 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = np.clip((moment(numerator, denominator) - mean_x * mean_y) / (sd_x * sd_y), -1, 1)
+    rho = np.nan_to_num(rho)
+
+    # Desvio normal bivariado das somas de K linhas (correlação `rho`)
+    spread = np.sqrt(draws)
+    z_x = rng.standard_normal(draws.shape)
+    z_y = rho * z_x + np.sqrt(1 - rho ** 2) * rng.standard_normal(draws.shape)
+    num = (draws * mean_x + spread * sd_x * z_x) @ membership
+    den = (draws * mean_y + spread * sd_y * z_y) @ membership
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(den > 0, num / den, np.nan)
+    alpha = (1 - confidence) / 2
+    # Grupos sem denominador não têm métrica; nos demais, réplicas sem
+    # denominador (ex.: nenhuma conversão sorteada) ficam de fora
+    point = table[metric].notna().to_numpy()
+    low, high = np.full(len(table), np.nan), np.full(len(table), np.nan)
+    if point.any():
+        low[point], high[point] = np.nanquantile(ratios[:, point], [alpha, 1 - alpha], axis=0)
+    return table.assign(**{f'{metric}_min': low, f'{metric}_max': high})
+
+
+def metric_intervals(cube, dims, metric, confidence=CONFIDENCE):
+    """Intervalo de `metric` por `dims`: Wilson para proporções, bootstrap para o resto."""
+    if metric in BINOMIAL_METRICS:
+        return rate_intervals(cube, dims, metric, confidence)
+    return bootstrap_intervals(cube, dims, metric, confidence=confidence)
@@ -1,12 +1,21 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import datetime
-from datetime import datetime, timedelta
-import random
+
+from campaign_analytics.charts import (
+    cac_bar_figure,
+    cac_ctr_scatter_figure,
+    cac_evolution_figure,
+    figure_cache,
+    live_cac_figure,
+    quality_gauge_figure,
+    spend_donut_figure,
+)
+from campaign_analytics.attribution import Paths, apply_credits, attribute, generate_paths
+from campaign_analytics.generator import DASHBOARD_CHANNELS, generate_dashboard_data
+from campaign_analytics.live import WINDOW_MINUTES, LiveFeed, producer_running, start_producer, stop_producer
+from campaign_analytics.optimizer import optimize_budget
+from campaign_analytics.profiling import Profiler
+from campaign_analytics.shared_cache import shared_cache
+from campaign_analytics.timeseries import series_store
 
 # Configuração da página
 st.set_page_config(
@@ -24,342 +33,261 @@ def load_css():
 # Chame no início do app
 load_css()
 
+# Painel de depuração antes do `try`: os toggles aparecem mesmo quando a
+# execução para no meio (st.stop()); as etapas só são medidas com ele ligado
+debug = st.sidebar.toggle("🛠️ Debug panel", key='debug_panel')
+st.sidebar.checkbox("Log stages to .cache/perf.jsonl", key='perf_log', disabled=not debug)
+profiler = Profiler(enabled=debug)
+
+def show_figure(name, builder, *data, **params):
+    """Figura do cache (etapa chart.*) enviada ao navegador (etapa render.*)"""
+    with profiler.stage(f'chart.{name}'):
+        fig = figure_cache.get(builder, *data, **params)
+    with profiler.stage(f'render.{name}'):
+        st.plotly_chart(fig, use_container_width=True, theme=None)
+
+def kpi_cards(cards):
+    """Linha de cartões (valor, rótulo) no layout de 4 colunas"""
+    for col, (value, label) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-value">{value}</div>
+                <div class="metric-label">{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
 # Função para gerar dados sintéticos para demo
-@st.cache_data
 def generate_demo_data():
-    np.random.seed(42)
-    
-    # Dados de performance por canal
-    channels = ['Google Ads', 'Facebook', 'Instagram', 'LinkedIn', 'TikTok']
-    
-    # Dados mensais
-    months = pd.date_range(start='2024-01-01', end='2024-12-31', freq='M')
-    
-    # Métricas principais
-    metrics = {
-        'total_campaigns': 1247,
-        'total_spend': 2847593,
-        'total_conversions': 48392,
-        'avg_cac': 58.84,
-        'optimized_cac': 41.19,
-        'savings': 853477,
-        'roi_improvement': 29.8
-    }
-    
-    # Performance por canal
-    channel_data = []
-    for channel in channels:
-        data = {
-            'channel': channel,
-            'spend': np.random.randint(300000, 800000),
-            'conversions': np.random.randint(5000, 15000),
-            'cac': np.random.uniform(35, 85),
-            'ctr': np.random.uniform(0.015, 0.045),
-            'quality_score': np.random.uniform(6.5, 9.2)
-        }
-        channel_data.append(data)
-    
-    channel_df = pd.DataFrame(channel_data)
-    
-    # Dados temporais
-    daily_data = []
-    for i in range(90):  # últimos 90 dias
-        date = datetime.now() - timedelta(days=i)
-        daily_data.append({
-            'date': date,
-            'spend': np.random.randint(15000, 35000),
-            'conversions': np.random.randint(250, 600),
-            'cac': np.random.uniform(45, 75),
-            'impressions': np.random.randint(800000, 1500000)
-        })
-    
-    daily_df = pd.DataFrame(daily_data).sort_values('date')
-    
-    return metrics, channel_df, daily_df
-
-# Função para criar gráfico com tema escuro
-def create_dark_theme_chart():
-    layout = {
-        'plot_bgcolor': 'rgba(0,0,0,0)',
-        'paper_bgcolor': 'rgba(0,0,0,0)',
-        'font': {'color': '#ffffff'},
-        'xaxis': {
-            'gridcolor': 'rgba(255,255,255,0.1)',
-            'zerolinecolor': 'rgba(255,255,255,0.1)',
-            'color': '#ffffff'
-        },
-        'yaxis': {
-            'gridcolor': 'rgba(255,255,255,0.1)',
-            'zerolinecolor': 'rgba(255,255,255,0.1)',
-            'color': '#ffffff'
-        }
-    }
-    return layout
-
-# Header principal
-st.markdown("""
-<div style="text-align: center; padding: 2rem 0;">
-    <h1 style="font-size: 3rem; margin-bottom: 0;">🚀 CAC OPTIMIZATION AI</h1>
-    <p style="font-size: 1.2rem; color: #B0B0B0;">Real-time Marketing Performance Dashboard</p>
-</div>
-""", unsafe_allow_html=True)
-
-# Carregar dados
-metrics, channel_df, daily_df = generate_demo_data()
-
-# KPIs principais - Layout em 4 colunas
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{metrics['total_campaigns']:,}</div>
-        <div class="metric-label">TOTAL CAMPAIGNS</div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Uma cópia por processo, compartilhada por todas as sessões
+    return shared_cache.get(('dashboard_demo', 42), lambda: generate_dashboard_data(seed=42))
 
-with col2:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">R$ {metrics['avg_cac']:.2f}</div>
-        <div class="metric-label">CURRENT CAC</div>
-    </div>
-    """, unsafe_allow_html=True)
+def attribution_demo():
+    # Atribuição (Markov/Shapley) de caminhos sintéticos pelos canais do dashboard
+    def compute():
+        touches, conversions = generate_paths(200_000, channels=DASHBOARD_CHANNELS, seed=42)
+        return attribute(Paths.from_log(touches, conversions))
+    return shared_cache.get(('attribution_demo', 42), compute)
 
-with col3:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">R$ {metrics['optimized_cac']:.2f}</div>
-        <div class="metric-label">OPTIMIZED CAC</div>
-    </div>
-    """, unsafe_allow_html=True)
+ATTRIBUTION_MODELS = {'Reported': None, 'Last touch': 'ultimo_toque', 'Markov': 'markov', 'Shapley': 'shapley'}
 
-with col4:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">{metrics['roi_improvement']:.1f}%</div>
-        <div class="metric-label">ROI IMPROVEMENT</div>
+try:
+    # Header principal
+    st.markdown("""
+    <div style="text-align: center; padding: 2rem 0;">
+        <h1 style="font-size: 3rem; margin-bottom: 0;">🚀 CAC OPTIMIZATION AI</h1>
+        <p style="font-size: 1.2rem; color: #B0B0B0;">Real-time Marketing Performance Dashboard</p>
     </div>
     """, unsafe_allow_html=True)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    # Carregar dados
+    with profiler.stage('load.demo'):
+        metrics, channel_df, _ = generate_demo_data()
 
-# Layout principal em 2 colunas
-left_col, right_col = st.columns([2, 1])
+    # Série diária por canal do store local (rollups semanais/mensais prontos)
+    with profiler.stage('load.timeseries') as stage:
+        timeseries = series_store()
+        daily_df = timeseries.last(90, by_channel=True)
+        stage.rows = len(daily_df)
 
-with left_col:
-    # Gráfico principal - CAC Evolution
-    fig_main = go.Figure()
-    
-    # Linha principal com glow effect
-    fig_main.add_trace(go.Scatter(
-        x=daily_df['date'],
-        y=daily_df['cac'],
-        mode='lines',
-        name='CAC Atual',
-        line=dict(color='#00FFFF', width=3),
-        fill='tonexty'
-    ))
-    
-    # Linha otimizada
-    optimized_cac = daily_df['cac'] * 0.7  # 30% de redução
-    fig_main.add_trace(go.Scatter(
-        x=daily_df['date'],
-        y=optimized_cac,
-        mode='lines',
-        name='CAC Otimizado',
-        line=dict(color='#00FF80', width=3, dash='dash'),
-        fill='tonexty'
-    ))
-    
-    fig_main.update_layout(
-        title={
-            'text': "📈 CAC Evolution - Last 90 Days",
-            'x': 0.02,
-            'font': {'size': 20, 'color': '#00FFFF'}
-        },
-        **create_dark_theme_chart(),
-        height=400,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(color='#ffffff')
-        )
-    )
-    
-    st.plotly_chart(fig_main, use_container_width=True)
-
-with right_col:
-    # Performance por canal - Donut chart
-    fig_donut = go.Figure(data=[go.Pie(
-        labels=channel_df['channel'],
-        values=channel_df['spend'],
-        hole=0.6,
-        marker=dict(
-            colors=['#00FFFF', '#0080FF', '#40E0D0', '#00CED1', '#20B2AA'],
-            line=dict(color='#000000', width=2)
-        ),
-        textinfo='label+percent',
-        textfont=dict(color='#ffffff')
-    )])
-    
-    fig_donut.update_layout(
-        title={
-            'text': "💰 Spend by Channel",
-            'x': 0.5,
-            'font': {'size': 16, 'color': '#00FFFF'}
-        },
-        **create_dark_theme_chart(),
-        height=300,
-        showlegend=False,
-        annotations=[dict(text='SPEND', x=0.5, y=0.5, font_size=20, showarrow=False, font_color='#00FFFF')]
-    )
-    
-    st.plotly_chart(fig_donut, use_container_width=True)
+    WINDOWS = {'Last 90 days': 90, 'Last year': 365, 'Last 3 years': 3 * 365}
+    GRANULARITIES = {'Daily': 'day', 'Weekly': 'week', 'Monthly': 'month'}
+
+    # ===================================
+    # 📡 MODO AO VIVO
+    # ===================================
+    # Eventos lidos de .cache/live/events.bin; só os cartões e o gráfico de CAC
+    # são fragmentos que se atualizam sozinhos, o resto da página não reroda
+    LIVE_REFRESH_SECONDS = 1.0
+
+    live_mode = st.sidebar.toggle("📡 Live mode", key='live_mode')
+    if live_mode:
+        # Posição de leitura e janela por sessão: cada atualização só lê os eventos novos
+        feed = st.session_state.setdefault('live_feed', LiveFeed())
+        if producer_running():
+            st.sidebar.caption("Demo producer running (~50K events/s)")
+            if st.sidebar.button("⏹️ Stop demo producer"):
+                stop_producer()
+                st.rerun()
+        elif st.sidebar.button("▶️ Start demo producer"):
+            start_producer()
+            st.rerun()
+
+        @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+        def live_kpis():
+            feed.poll()
+            totals = feed.window.totals()
+            kpi_cards([
+                (f"{feed.rate:,.0f}", "EVENTS / S"),
+                (f"R$ {totals['cac']:.2f}" if totals['conversions'] else "—", "CURRENT CAC"),
+                (f"{totals['conversions']:,.0f}", f"CONVERSIONS ({WINDOW_MINUTES} MIN)"),
+                (f"R$ {totals['spend']:,.0f}", f"SPEND ({WINDOW_MINUTES} MIN)"),
+            ])
+
+        @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+        def live_cac_chart():
+            feed.poll()
+            series = feed.window.series()
+            if series.empty:
+                st.info("📡 Waiting for events in .cache/live/events.bin (start the demo producer in the sidebar)")
+            else:
+                st.plotly_chart(live_cac_figure(series, WINDOW_MINUTES), use_container_width=True, theme=None)
+
+    # KPIs principais - Layout em 4 colunas
+    if live_mode:
+        live_kpis()
+    else:
+        kpi_cards([
+            (f"{metrics['total_campaigns']:,}", "TOTAL CAMPAIGNS"),
+            (f"R$ {metrics['avg_cac']:.2f}", "CURRENT CAC"),
+            (f"R$ {metrics['optimized_cac']:.2f}", "OPTIMIZED CAC"),
+            (f"{metrics['roi_improvement']:.1f}%", "ROI IMPROVEMENT"),
+        ])
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Layout principal em 2 colunas
+    left_col, right_col = st.columns([2, 1])
+
+    with left_col:
+        # Gráfico principal - CAC Evolution (fragmento: trocar a janela não reroda o resto)
+        @st.fragment
+        def cac_evolution_chart():
+            window_col, granularity_col = st.columns(2)
+            with window_col:
+                window = st.selectbox("Window", list(WINDOWS))
+            with granularity_col:
+                granularity = st.selectbox("Granularity", list(GRANULARITIES))
+            days = WINDOWS[window]
+            series = timeseries.last(days, GRANULARITIES[granularity])
+            show_figure('cac_evolution', cac_evolution_figure, series, days=days)
+
+        if live_mode:
+            live_cac_chart()
+        else:
+            cac_evolution_chart()
+
+    with right_col:
+        # Performance por canal - Donut chart
+        show_figure('spend_donut', spend_donut_figure, channel_df)
     
-    # Mini métricas
-    st.markdown(f"""
-    <div style="background: rgba(255,255,255,0.05); padding: 1rem; border-radius: 10px; margin-top: 1rem;">
-        <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-            <span style="color: #B0B0B0;">Total Spend:</span>
-            <span style="color: #00FFFF; font-weight: bold;">R$ {metrics['total_spend']:,}</span>
+        # Mini métricas
+        st.markdown(f"""
+        <div style="background: rgba(255,255,255,0.05); padding: 1rem; border-radius: 10px; margin-top: 1rem;">
+            <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+                <span style="color: #B0B0B0;">Total Spend:</span>
+                <span style="color: #00FFFF; font-weight: bold;">R$ {metrics['total_spend']:,}</span>
+            </div>
+            <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+                <span style="color: #B0B0B0;">Conversions:</span>
+                <span style="color: #00FFFF; font-weight: bold;">{metrics['total_conversions']:,}</span>
+            </div>
+            <div style="display: flex; justify-content: space-between;">
+                <span style="color: #B0B0B0;">Savings:</span>
+                <span style="color: #00FF80; font-weight: bold;">R$ {metrics['savings']:,}</span>
+            </div>
         </div>
-        <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-            <span style="color: #B0B0B0;">Conversions:</span>
-            <span style="color: #00FFFF; font-weight: bold;">{metrics['total_conversions']:,}</span>
-        </div>
-        <div style="display: flex; justify-content: space-between;">
-            <span style="color: #B0B0B0;">Savings:</span>
-            <span style="color: #00FF80; font-weight: bold;">R$ {metrics['savings']:,}</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
 
-# Segunda linha de gráficos
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    # Bar chart - CAC por canal
-    fig_bar = go.Figure(data=[
-        go.Bar(
-            x=channel_df['channel'],
-            y=channel_df['cac'],
-            marker=dict(
-                color='#00FFFF',
-                line=dict(color='#ffffff', width=1)
-            ),
-            text=[f'R$ {x:.1f}' for x in channel_df['cac']],
-            textposition='outside'
-        )
-    ])
-    
-    fig_bar.update_layout(
-        title={
-            'text': "📊 CAC by Channel",
-            'font': {'size': 16, 'color': '#00FFFF'}
-        },
-        **create_dark_theme_chart(),
-        height=300,
-        xaxis_tickangle=-45
-    )
-    
-    st.plotly_chart(fig_bar, use_container_width=True)
-
-with col2:
-    # Conversion rate scatter
-    fig_scatter = go.Figure(data=[
-        go.Scatter(
-            x=channel_df['cac'],
-            y=channel_df['ctr'],
-            mode='markers+text',
-            marker=dict(
-                size=[x/1000 for x in channel_df['spend']],
-                color='#00FFFF',
-                opacity=0.7,
-                line=dict(width=2, color='#ffffff')
-            ),
-            text=channel_df['channel'],
-            textposition="top center",
-            textfont=dict(color='#ffffff')
-        )
-    ])
-    
-    fig_scatter.update_layout(
-        title={
-            'text': "🎯 CAC vs CTR",
-            'font': {'size': 16, 'color': '#00FFFF'}
-        },
-        **create_dark_theme_chart(),
-        height=300,
-        xaxis_title="CAC (R$)",
-        yaxis_title="CTR (%)"
-    )
-    
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    # Segunda linha de gráficos
+    col1, col2, col3 = st.columns(3)
 
-with col3:
-    # Quality Score gauge
-    avg_quality = channel_df['quality_score'].mean()
-    
-    fig_gauge = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=avg_quality,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': "⭐ Avg Quality Score", 'font': {'color': '#00FFFF'}},
-        delta={'reference': 8.0, 'increasing': {'color': '#00FF80'}, 'decreasing': {'color': '#FF4444'}},
-        gauge={
-            'axis': {'range': [None, 10], 'tickcolor': '#ffffff'},
-            'bar': {'color': "#00FFFF"},
-            'steps': [
-                {'range': [0, 5], 'color': "rgba(255, 68, 68, 0.3)"},
-                {'range': [5, 7], 'color': "rgba(255, 255, 0, 0.3)"},
-                {'range': [7, 10], 'color': "rgba(0, 255, 128, 0.3)"}
-            ],
-            'threshold': {
-                'line': {'color': "white", 'width': 4},
-                'thickness': 0.75,
-                'value': 8.5
-            }
-        }
-    ))
-    
-    fig_gauge.update_layout(
-        **create_dark_theme_chart(),
-        height=300,
-        font={'color': '#ffffff'}
-    )
-    
-    st.plotly_chart(fig_gauge, use_container_width=True)
+    with col1:
+        # Bar chart - CAC por canal, com as conversões do modelo de atribuição escolhido
+        @st.fragment
+        def cac_by_channel_chart():
+            model = ATTRIBUTION_MODELS[st.selectbox("Attribution", list(ATTRIBUTION_MODELS), key='attribution_model')]
+            if model is None:
+                data = channel_df
+            else:
+                with profiler.stage('attribution') as stage:
+                    data = apply_credits(channel_df, attribution_demo(), model)
+                    stage.rows = len(data)
+            show_figure('cac_bar', cac_bar_figure, data)
+
+        cac_by_channel_chart()
+
+    with col2:
+        # Conversion rate scatter
+        show_figure('cac_ctr_scatter', cac_ctr_scatter_figure, channel_df)
 
-# Footer com controles
-st.markdown("<br><br>", unsafe_allow_html=True)
+    with col3:
+        # Quality Score gauge
+        show_figure('quality_gauge', quality_gauge_figure, channel_df)
+
+    # Footer com controles
+    st.markdown("<br><br>", unsafe_allow_html=True)
 
-# Controles interativos
-with st.container():
-    st.markdown("### 🎛️ Optimization Controls")
+    # Controles interativos
+    # Fragmento: mexer nos controles reroda só este bloco, sem tocar nos gráficos acima
+    @st.fragment
+    def optimization_controls(channel_df, daily_df):
+        st.markdown("### 🎛️ Optimization Controls")
     
-    col1, col2, col3, col4 = st.columns(4)
+        col1, col2, col3, col4 = st.columns(4)
     
-    with col1:
-        budget_multiplier = st.slider("Budget Allocation", 0.5, 2.0, 1.0, 0.1)
+        with col1:
+            budget_multiplier = st.slider("Budget Allocation", 0.5, 2.0, 1.0, 0.1)
     
-    with col2:
-        target_cac = st.number_input("Target CAC (R$)", min_value=20.0, max_value=100.0, value=45.0, step=5.0)
+        with col2:
+            target_cac = st.number_input("Target CAC (R$)", min_value=20.0, max_value=100.0, value=45.0, step=5.0)
     
-    with col3:
-        optimization_mode = st.selectbox("Optimization Mode", ["Conservative", "Balanced", "Aggressive"])
+        with col3:
+            optimization_mode = st.selectbox("Optimization Mode", ["Conservative", "Balanced", "Aggressive"])
+    
+        with col4:
+            run = st.button("🚀 Run Optimization", type="primary")
     
-    with col4:
-        if st.button("🚀 Run Optimization", type="primary"):
-            st.success(f"✅ Optimization completed! Projected CAC reduction: {np.random.uniform(15, 35):.1f}%")
-
-# Rodapé
-st.markdown("""
-<div style="text-align: center; padding: 2rem; color: #666666; font-size: 0.9rem;">
-    CAC Optimization Dashboard | Powered by AI & Machine Learning
-</div>
-""", unsafe_allow_html=True)
+        if run:
+            try:
+                with profiler.stage('optimize'):
+                    result = optimize_budget(channel_df, daily_df, budget_multiplier, target_cac, optimization_mode)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
+            if result['target_met']:
+                st.success(
+                    f"✅ Optimization completed! Projected CAC reduction: {result['cac_reduction']:.1f}% "
+                    f"(R$ {result['current_cac']:.2f} → R$ {result['projected_cac']:.2f}, "
+                    f"budget R$ {result['budget']:,.0f})"
+                )
+            else:
+                st.warning(
+                    f"⚠️ Target CAC of R$ {target_cac:.2f} is not reachable. "
+                    f"Best projected CAC: R$ {result['projected_cac']:.2f} "
+                    f"(budget R$ {result['budget']:,.0f})"
+                )
+            st.dataframe(
+                result['allocation'].style.format({
+                    'current_spend': "R$ {:,.0f}",
+                    'optimized_spend': "R$ {:,.0f}",
+                    'current_conversions': "{:,.0f}",
+                    'projected_conversions': "{:,.0f}",
+                    'elasticity': "{:.2f}"
+                }),
+                hide_index=True
+            )
+
+    with st.container():
+        optimization_controls(channel_df, daily_df)
+
+    # Rodapé
+    st.markdown("""
+    <div style="text-align: center; padding: 2rem; color: #666666; font-size: 0.9rem;">
+        CAC Optimization Dashboard | Powered by AI & Machine Learning
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Painel de depuração: etapas desta execução (reruns só de fragmentos não são medidos)
+    if profiler.enabled:
+        with st.sidebar.expander("🛠️ Run stages", expanded=True):
+            st.dataframe(
+                profiler.summary().style.format({'ms': '{:.1f}', 'pico_mb': '{:.1f}', 'linhas': '{:,.0f}'}, na_rep='—'),
+                hide_index=True
+            )
+            st.caption(f"Figure cache: {figure_cache.hits} hits / {figure_cache.misses} misses")
+        if st.session_state.get('perf_log'):
+            profiler.export_jsonl(script='modern_dashboard.py')
+finally:
+    # Também quando a execução para antes do fim (st.stop(), exceção, novo rerun)
+    profiler.close()
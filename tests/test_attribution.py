@@ -0,0 +1,92 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.attribution import (
+    CONVERSION, N_SPECIAL, NULL, START, Paths, attribute, coalition_values, generate_paths,
+    markov_credits, removal_probabilities, shapley_credits, transition_matrix,
+)
+
+
+def _paths(sequences, converted, n_states):
+    offsets = np.cumsum([0] + [len(seq) for seq in sequences])
+    return Paths(offsets, np.concatenate(sequences), converted, [f'c{i}' for i in range(n_states)])
+
+
+@pytest.fixture
+def small_paths():
+    rng = np.random.default_rng(7)
+    sequences = [rng.integers(0, 4, rng.integers(1, 5)) for _ in range(60)]
+    return _paths(sequences, rng.random(60) < 0.4, 4)
+
+
+def _shapley_reference(paths):
+    # Shapley por todas as permutações, com v(S) = conversões dos caminhos contidos em S
+    sets = [frozenset(paths.states[start:stop].tolist()) for start, stop in zip(paths.offsets[:-1], paths.offsets[1:])]
+
+    def value(coalition):
+        return sum(converted for path_set, converted in zip(sets, paths.converted) if path_set <= coalition)
+
+    credits = np.zeros(paths.n_states)
+    for order in itertools.permutations(range(paths.n_states)):
+        coalition = frozenset()
+        for state in order:
+            credits[state] += value(coalition | {state}) - value(coalition)
+            coalition = coalition | {state}
+    return credits / math.factorial(paths.n_states)
+
+
+def _removal_reference(paths):
+    # Cadeia absorvente densa resolvida com np.linalg.solve, uma remoção por vez
+    n = paths.n_states + N_SPECIAL
+    indptr, columns, probabilities = transition_matrix(paths)
+    full = np.zeros((n, n))
+    for row in range(n):
+        full[row, columns[indptr[row]:indptr[row + 1]]] = probabilities[indptr[row]:indptr[row + 1]]
+
+    results = []
+    for removed in [None] + list(range(N_SPECIAL, n)):
+        matrix = full.copy()
+        if removed is not None:
+            matrix[removed] = 0.0
+        system = np.eye(n) - matrix
+        target = np.zeros(n)
+        for absorbing in (CONVERSION, NULL):
+            system[absorbing] = 0.0
+            system[absorbing, absorbing] = 1.0
+        target[CONVERSION] = 1.0
+        results.append(np.linalg.solve(system, target)[START])
+    return np.array(results)
+
+
+def test_shapley_matches_permutations(small_paths):
+    np.testing.assert_allclose(shapley_credits(small_paths), _shapley_reference(small_paths))
+
+
+def test_markov_matches_dense_solve(small_paths):
+    expected = _removal_reference(small_paths)
+    np.testing.assert_allclose(removal_probabilities(small_paths), expected, atol=1e-8)
+    effects = 1 - expected[1:] / expected[0]
+    credits = small_paths.converted.sum() * effects / effects.sum()
+    np.testing.assert_allclose(markov_credits(small_paths), credits, atol=1e-6)
+
+
+def test_masks_beyond_64_states():
+    # Estados acima de 64 caem na segunda palavra das máscaras
+    paths = _paths([np.array([0, 70]), np.array([70]), np.array([3, 69, 0])], [True, True, False], 71)
+    masks, conversions = coalition_values(paths)
+    assert len(masks) == 3 and conversions.sum() == 2
+    credits = shapley_credits(paths)
+    assert credits[70] == pytest.approx(1.5) and credits[0] == pytest.approx(0.5)
+
+
+def test_credits_add_up_to_conversions():
+    touches, conversions = generate_paths(5_000, seed=1)
+    paths = Paths.from_log(touches, conversions, by=['canal', 'tipo_criativo'])
+    credits = attribute(paths)
+    assert isinstance(credits.index, pd.MultiIndex)
+    for model in ('ultimo_toque', 'markov', 'shapley'):
+        assert credits[model].sum() == pytest.approx(len(conversions))
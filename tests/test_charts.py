@@ -0,0 +1,68 @@
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+from campaign_analytics.charts import TEMPLATE, FigureCache, cac_bar_figure, data_hash
+
+
+@pytest.fixture
+def channels():
+    return pd.DataFrame({'channel': ['A', 'B'], 'spend': [100.0, 200.0], 'conversions': [10, 5],
+                         'cac': [10.0, 40.0], 'ctr': [0.02, 0.03], 'quality_score': [7.0, 8.0]})
+
+
+def test_data_hash_follows_content():
+    frame = pd.DataFrame({'a': [1, 2], 'b': [3.0, 4.0]})
+    assert data_hash(frame) == data_hash(frame.copy())
+    assert data_hash(frame) != data_hash(frame.assign(b=[3.0, 5.0]))
+    assert data_hash(frame) != data_hash(frame.rename(columns={'b': 'c'}))
+    assert data_hash(frame) != data_hash(frame.set_axis([1, 2]))
+    assert data_hash(frame['a']) != data_hash(frame['a'].to_frame())
+
+
+def test_hits_reuse_the_figure(channels):
+    cache = FigureCache()
+    figure = cache.get(cac_bar_figure, channels)
+    assert len(figure.data) == 1
+    assert cache.get(cac_bar_figure, channels.copy()) is figure
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_covers_builder_data_and_params(channels):
+    calls = []
+
+    def builder(frame, scale=1):
+        calls.append(scale)
+        return object()
+
+    cache = FigureCache()
+    first = cache.get(builder, channels, scale=1)
+    assert cache.get(builder, channels, scale=2) is not first
+    assert cache.get(builder, channels.assign(cac=[11.0, 40.0]), scale=1) is not first
+    assert cache.get(cac_bar_figure, channels) is not first
+    assert cache.get(builder, channels, scale=1) is first
+    assert calls == [1, 2, 1]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_lru_keeps_maxsize_most_recent(channels):
+    def build(frame, n):
+        return object()
+
+    cache = FigureCache(maxsize=2)
+    first = cache.get(build, channels, n=1)
+    cache.get(build, channels, n=2)
+    cache.get(build, channels, n=1)  # 1 volta a ser o mais recente
+    cache.get(build, channels, n=3)  # descarta 2
+    assert cache.get(build, channels, n=1) is first
+    assert cache.misses == 3
+    cache.get(build, channels, n=2)
+    assert cache.misses == 4
+
+    cache.clear()
+    assert cache.get(build, channels, n=1) is not first
+
+
+def test_template_is_registered(channels):
+    assert TEMPLATE in pio.templates
+    assert cac_bar_figure(channels).layout.template.layout.plot_bgcolor == 'rgba(0,0,0,0)'
@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.cli import main
+from campaign_analytics.cube import Cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.reports import REPORTS, compute_reports
+from campaign_analytics.schema import CodeTable
+
+
+@pytest.fixture(scope='module')
+def campaigns():
+    return generate_campaigns(2_000, seed=9)
+
+
+@pytest.fixture
+def csv(tmp_path, campaigns):
+    path = tmp_path / 'criativos.csv'
+    campaigns.to_csv(path, index_label='id')
+    return path
+
+
+@pytest.fixture(scope='module')
+def expected(campaigns):
+    return compute_reports(Cube(table=CodeTable()).update(campaigns))
+
+
+def test_json_to_stdout(csv, expected, capsys):
+    assert main([str(csv), '-f', 'json', '-o', '-', '-w', '1', '-r', 'roas_por_canal', '-r', 'ctr_por_tipo']) == 0
+    out, err = capsys.readouterr()
+    payload = json.loads(out)
+    assert list(payload) == ['roas_por_canal', 'ctr_por_tipo']
+    for name, records in payload.items():
+        pd.testing.assert_frame_equal(pd.DataFrame(records), expected[name].astype({REPORTS[name][0][0]: str}),
+                                      check_dtype=False)
+    assert '2,000 linhas' in err
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'json'])
+def test_one_file_per_report(tmp_path, csv, expected, capsys, fmt):
+    output = tmp_path / 'relatorios'
+    main([str(csv), '-f', fmt, '-o', str(output), '-w', '1'])
+    assert sorted(path.name for path in output.iterdir()) == sorted(f'{name}.{fmt}' for name in REPORTS)
+    assert capsys.readouterr().out.split() == [str(output / f'{name}.{fmt}') for name in REPORTS]
+    read = pd.read_parquet if fmt == 'parquet' else pd.read_json
+    table = read(output / f'cac_por_criativo.{fmt}')
+    np.testing.assert_allclose(table['cac'], expected['cac_por_criativo']['cac'])
+
+
+def test_intervals_and_quiet(tmp_path, csv, capsys):
+    output = tmp_path / 'relatorios'
+    main([str(csv), '-o', str(output), '-w', '1', '-q', '-i', '-r', 'ctr_por_tipo'])
+    assert capsys.readouterr() == ('', '')
+    table = pd.read_parquet(output / 'ctr_por_tipo.parquet')
+    assert list(table.columns) == ['tipo_criativo', 'ctr', 'ctr_min', 'ctr_max']
+    assert (table['ctr_min'] <= table['ctr']).all() and (table['ctr'] <= table['ctr_max']).all()
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['-r', 'roas_por_bairro'], 'relatórios desconhecidos: roas_por_bairro'),
+    (['-o', '-'], "só aceita --format json"),
+])
+def test_invalid_arguments(csv, capsys, argv, message):
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(csv), *argv])
+    assert exit_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        main([str(tmp_path / 'nada' / '*.csv'), '-w', '1'])
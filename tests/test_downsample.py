@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.downsample import downsample, lttb_indices
+
+
+def _lttb_reference(x, y, n_out):
+    # LTTB ponto a ponto, com os mesmos baldes (n - 2 pontos internos em n_out - 2 baldes)
+    n = len(x)
+    edges = [int(e) for e in np.linspace(1, n - 1, n_out - 1)]
+    selected = [0]
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            following = range(edges[bucket + 1], edges[bucket + 2])
+            cx = sum(x[i] for i in following) / len(following)
+            cy = sum(y[i] for i in following) / len(following)
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        ax, ay = x[selected[-1]], y[selected[-1]]
+        best, best_area = start, -1.0
+        for i in range(start, stop):
+            area = abs((ax - cx) * (y[i] - ay) - (ax - x[i]) * (cy - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize('n, n_out', [(100, 10), (1_000, 37), (5_003, 200)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1_000, n))
+    y = rng.normal(0, 1, n).cumsum()
+    np.testing.assert_array_equal(lttb_indices(x, y, n_out), _lttb_reference(x, y, n_out))
+
+
+def test_lttb_keeps_spikes_and_endpoints():
+    y = np.zeros(10_000)
+    y[4_321] = 50.0
+    indices = lttb_indices(np.arange(10_000), y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert 4_321 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_downsample_only_above_threshold():
+    df = pd.DataFrame({'date': pd.date_range('2020-01-01', periods=3_000, freq='h'), 'cac': np.arange(3_000.0)})
+    small, webgl = downsample(df.head(500), 'date', 'cac', threshold=2_000)
+    assert not webgl and len(small) == 500
+    reduced, webgl = downsample(df.sample(frac=1, random_state=0), 'date', 'cac', width_px=300, threshold=2_000)
+    assert webgl and len(reduced) == 300
+    assert reduced['date'].is_monotonic_increasing
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.filters import BitmapIndex, filter_cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.ingestion import MEASURES
+from campaign_analytics.schema import CodeTable
+
+SELECTIONS = [
+    {},
+    {'canal': ['Meta Ads']},
+    {'canal': ['Meta Ads', 'TikTok Ads'], 'cta': ['Comece grátis']},
+    {'canal': ['Meta Ads'], 'imagem_tipo': ['valor que não existe']},
+]
+
+
+@pytest.fixture(scope='module')
+def data():
+    df = generate_campaigns(5_000, seed=0)
+    table = CodeTable()
+    return df, table, BitmapIndex.from_frame(df, table=table)
+
+
+def _reference(df, selections):
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in selections.items():
+        if values:
+            mask &= df[col].isin(values).to_numpy()
+    return mask
+
+
+@pytest.mark.parametrize('selections', SELECTIONS)
+def test_bitmap_mask_matches_isin(data, selections):
+    df, _, index = data
+    expected = _reference(df, selections)
+    np.testing.assert_array_equal(index.mask(**selections), expected)
+    assert index.count(**selections) == expected.sum()
+    np.testing.assert_allclose(index.aggregate(df, MEASURES, **selections), df[expected][MEASURES].sum())
+
+
+@pytest.mark.parametrize('selections', SELECTIONS)
+def test_filter_cube_matches_filtered_rows(data, selections):
+    df, table, _ = data
+    cube = Cube(table=table).update(df)
+    filtered = filter_cube(cube, **selections)
+    selected = df[_reference(df, selections)]
+    assert filtered.rows == len(selected)
+    if len(selected):
+        expected = Cube(table=table).update(selected)
+        np.testing.assert_allclose(filtered.rollup('canal'), expected.rollup('canal'))
+    # O índice das células, guardado, dá o mesmo resultado
+    again = filter_cube(cube, BitmapIndex.from_cube(cube), **selections)
+    assert again.rows == filtered.rows
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.generator import (CANAIS, CTAS, DASHBOARD_CHANNELS, IMAGENS, PAISES, PESOS_PAISES, TIPOS,
+                                          generate_campaigns, generate_daily_series, main)
+from campaign_analytics.schema import DTYPES
+
+
+@pytest.fixture(scope='module')
+def campaigns():
+    return generate_campaigns(200_000, seed=7)
+
+
+def test_campaigns_follow_the_schema(campaigns):
+    assert len(campaigns) == 200_000
+    for col, dtype in DTYPES.items():
+        if col in campaigns:
+            assert campaigns[col].dtype == dtype, col
+    for col, values in [('canal', CANAIS), ('tipo_criativo', TIPOS), ('imagem_tipo', IMAGENS),
+                        ('cta', CTAS), ('pais', PAISES)]:
+        assert list(campaigns[col].cat.categories) == values
+    pd.testing.assert_frame_equal(generate_campaigns(1000, seed=7), generate_campaigns(1000, seed=7))
+
+
+def test_campaign_funnel_and_distributions(campaigns):
+    # Funil: cada etapa limitada pela anterior
+    assert campaigns['impressoes'].between(1000, 49_999).all()
+    assert (campaigns['cliques'] <= campaigns['impressoes']).all()
+    assert (campaigns['leads'] <= campaigns['cliques']).all()
+    assert campaigns['custo_total'].between(500, 5000).all()
+
+    ctr = campaigns['cliques'].sum() / campaigns['impressoes'].sum()
+    assert ctr == pytest.approx(0.02, rel=0.01)
+    assert campaigns['leads'].sum() / campaigns['cliques'].sum() == pytest.approx(0.1, rel=0.02)
+    shares = campaigns['pais'].value_counts(normalize=True).reindex(PAISES)
+    np.testing.assert_allclose(shares, PESOS_PAISES, atol=0.005)
+
+    # Sem conversão, sem receita; com conversão, receita entre 300 e 1500 por unidade
+    per_conversion = campaigns['receita'] / campaigns['conversoes']
+    assert (campaigns.loc[campaigns['conversoes'] == 0, 'receita'] == 0).all()
+    assert per_conversion.dropna().between(299.9, 1500.1).all()
+
+
+def test_winning_combinations_convert_more(campaigns):
+    rate = campaigns['conversoes'] / campaigns['leads'].clip(lower=1)
+    sorriso_gratis = (campaigns['imagem_tipo'] == 'pessoa sorrindo') & (campaigns['cta'] == 'Comece grátis')
+    video_tiktok = (campaigns['tipo_criativo'] == 'vídeo curto') & (campaigns['canal'] == 'TikTok Ads')
+    rest = ~(sorriso_gratis | video_tiktok)
+    assert rate[sorriso_gratis].mean() > 1.5 * rate[rest].mean()
+    assert rate[video_tiktok].mean() > 1.7 * rate[rest].mean()
+
+
+def test_daily_series_shape():
+    series = generate_daily_series(days=30, end='2024-03-31')
+    assert len(series) == 30 * len(DASHBOARD_CHANNELS)
+    assert series['date'].min() == pd.Timestamp('2024-03-02')
+    assert series['date'].max() == pd.Timestamp('2024-03-31')
+    assert (series.groupby('date')['channel'].apply(list) == [DASHBOARD_CHANNELS] * 30).all()
+    assert (series[['spend', 'conversions', 'revenue', 'impressions', 'clicks']] >= 0).all().all()
+    assert (series['clicks'] <= series['impressions']).all()
+
+
+def test_main_writes_csv(tmp_path, capsys):
+    output = tmp_path / 'criativos.csv'
+    main(['50', '-o', str(output), '--seed', '3'])
+    written = pd.read_csv(output)
+    assert len(written) == 50 and written.columns[0] == 'id'
+    assert '50 linhas' in capsys.readouterr().out
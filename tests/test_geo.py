@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.geo import COUNTRIES, country_metrics, to_iso3
+from campaign_analytics.ingestion import normalize_chunk
+from campaign_analytics.reports import report
+from campaign_analytics.schema import MISSING_CATEGORY, CodeTable
+
+
+@pytest.mark.parametrize('name, iso3', [
+    ('Brasil', 'BRA'), ('brazil', 'BRA'), ('  BRASIL ', 'BRA'), ('bra', 'BRA'),
+    ('México', 'MEX'), ('Mexico', 'MEX'), ('Reino  Unido', 'GBR'), ('estados unidos da america', 'USA'),
+    ('EUA', 'USA'), ('Türkiye', 'TUR'), ('Côte', None), ('', None), (MISSING_CATEGORY, None),
+])
+def test_to_iso3(name, iso3):
+    assert to_iso3(name) == iso3
+
+
+def test_every_listed_name_resolves_to_its_code():
+    for iso3, names in COUNTRIES.items():
+        assert {to_iso3(name) for name in [iso3, *names]} == {iso3}
+
+
+def test_country_metrics_adds_iso3_to_the_report():
+    frame = generate_campaigns(2_000, seed=5)
+    frame['pais'] = frame['pais'].cat.rename_categories({'Brasil': 'Brazil', 'Alemanha': 'Atlântida'})
+    cube = Cube(table=CodeTable()).update(normalize_chunk(frame))
+
+    table = country_metrics(cube)
+    pd.testing.assert_frame_equal(table.drop(columns='iso3'), report(cube, 'roas_por_pais'))
+    iso3 = dict(zip(table['pais'], table['iso3']))
+    assert iso3['Brazil'] == 'BRA' and iso3['Estados Unidos'] == 'USA'
+    assert pd.isna(iso3['Atlântida'])
@@ -0,0 +1,114 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics import incremental
+from campaign_analytics.incremental import IncrementalStore
+
+
+def _export(path, ids, custo=10.0):
+    pd.DataFrame({
+        'id': ids,
+        'canal': 'Meta Ads',
+        'impressoes': 100,
+        'cliques': 5,
+        'conversoes': 1,
+        'custo_total': custo,
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def private_code_table(monkeypatch):
+    # O cubo do histórico não deve gravar na tabela de códigos do usuário
+    from campaign_analytics import cube, schema
+    table = schema.CodeTable()
+    monkeypatch.setattr(cube, 'code_table', lambda: table)
+
+
+def test_only_new_ids_are_added_and_state_survives_reopen(tmp_path):
+    store = IncrementalStore(tmp_path / 'hist')
+    assert store.append(_export(tmp_path / 'd1.csv', [1, 2, 3])) == 3
+    assert store.append(_export(tmp_path / 'd2.csv', [3, 4, 4, 5])) == 2
+
+    reopened = IncrementalStore(tmp_path / 'hist')
+    assert reopened.cube.rows == 5
+    assert reopened.cube.rollup().iloc[0]['custo_total'] == 50.0
+    assert reopened.append(_export(tmp_path / 'd3.csv', [1, 5])) == 0
+
+
+def test_failed_commit_keeps_previous_state(tmp_path, monkeypatch):
+    store = IncrementalStore(tmp_path / 'hist')
+    store.append(_export(tmp_path / 'd1.csv', [1, 2]))
+
+    def crash(*args, **kwargs):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_feather', crash)
+    with pytest.raises(OSError):
+        store.append(_export(tmp_path / 'd2.csv', [3, 4]))
+    monkeypatch.undo()
+
+    # Os ids 3 e 4 não ficaram marcados como vistos sem estar no cubo
+    reopened = IncrementalStore(tmp_path / 'hist')
+    assert reopened.cube.rows == 2
+    assert reopened.append(_export(tmp_path / 'd2.csv', [3, 4])) == 2
+    assert reopened.cube.rollup().iloc[0]['linhas'] == 4
+
+
+def test_compaction_keeps_few_segments_and_reads_only_recent_ones(tmp_path, monkeypatch):
+    store = IncrementalStore(tmp_path / 'hist')
+    store.append(_export(tmp_path / 'grande.csv', np.arange(10_000)))
+    loaded = []
+    original_load = np.load
+
+    def counting_load(path, *args, **kwargs):
+        if not kwargs.get('mmap_mode'):
+            loaded.append(path)
+        return original_load(path, *args, **kwargs)
+
+    monkeypatch.setattr(incremental.np, 'load', counting_load)
+    for day in range(30):
+        start = 10_000 + day * 10
+        store.append(_export(tmp_path / f'dia{day}.csv', np.arange(start, start + 10)))
+    # Nenhuma fusão releu o segmento grande
+    assert store._segments[0].name == 'ids-00001.npy'
+    assert all(path.name != 'ids-00001.npy' for path in loaded)
+    assert len(store._segments) <= 1 + int(np.log2(30)) + 1
+    assert sorted(p.name for p in (tmp_path / 'hist').glob('ids-*.npy')) == sorted(p.name for p in store._segments)
+    assert store.cube.rows == 10_300
+
+
+def test_stores_opened_before_each_other_appends_keep_both(tmp_path):
+    first = IncrementalStore(tmp_path / 'hist')
+    second = IncrementalStore(tmp_path / 'hist')
+    assert first.append(_export(tmp_path / 'd1.csv', [1, 2, 3])) == 3
+    # O segundo ainda tem o manifesto antigo em memória
+    assert second.append(_export(tmp_path / 'd2.csv', [3, 4, 5])) == 2
+
+    reopened = IncrementalStore(tmp_path / 'hist')
+    assert reopened.cube.rows == 5
+    assert reopened.append(_export(tmp_path / 'd1.csv', [1, 2, 3])) == 0
+
+
+def test_concurrent_appends_are_serialized(tmp_path):
+    exports = [_export(tmp_path / f'd{i}.csv', range(i * 100, i * 100 + 50)) for i in range(6)]
+    stores = [IncrementalStore(tmp_path / 'hist') for _ in exports]
+    with ThreadPoolExecutor(len(exports)) as pool:
+        added = list(pool.map(lambda pair: pair[0].append(pair[1]), zip(stores, exports)))
+    assert added == [50] * 6
+    reopened = IncrementalStore(tmp_path / 'hist')
+    assert reopened.cube.rows == 300
+    assert reopened.cube.rollup().iloc[0]['custo_total'] == 3000.0
+
+
+def test_manifest_gets_the_default_file_mode(tmp_path):
+    store = IncrementalStore(tmp_path / 'hist')
+    store.append(_export(tmp_path / 'd1.csv', [1]))
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(store._manifest_path.stat().st_mode) == 0o666 & ~umask
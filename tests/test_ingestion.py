@@ -0,0 +1,56 @@
+import io
+
+import pandas as pd
+
+from campaign_analytics.cube import build_cube
+from campaign_analytics.ingestion import MISSING_CATEGORY, read_csv_chunks
+from campaign_analytics.schema import CodeTable
+from campaign_analytics.storage import cache_csv, iter_chunks
+
+CSV = """canal,tipo_criativo,pais,impressoes,cliques,conversoes,custo_total
+Meta Ads,Vídeo,Brasil,1000,10,1,50.0
+Meta Ads,Vídeo,,1000,20,2,40.0
+Google Ads,Imagem,,500,5,0,60.0
+"""
+
+
+def test_blank_dimensions_are_kept_as_missing_category():
+    chunks = list(read_csv_chunks(io.StringIO(CSV)))
+    assert chunks[0]['pais'].isna().sum() == 0
+    assert (chunks[0]['pais'] == MISSING_CATEGORY).sum() == 2
+
+    cube = build_cube(chunks, table=CodeTable())
+    assert cube.rows == 3
+    total = cube.rollup().iloc[0]
+    assert total['custo_total'] == 150.0
+    assert total['linhas'] == 3
+    by_country = cube.rollup('pais')
+    assert by_country.loc[MISSING_CATEGORY, 'custo_total'] == 100.0
+
+
+# Contagens em branco e decimais, como vêm de exportações de planilha
+NUMBERS_CSV = """canal,impressoes,cliques,conversoes,custo_total,receita
+Meta Ads,1000,10,,50.0,
+Meta Ads,1000.0,20,2.0,,300
+Google Ads,500,,1,60.0,100
+"""
+
+
+def _check_numbers(chunks):
+    chunk = pd.concat(chunks)
+    assert chunk['conversoes'].tolist() == [0, 2, 1]
+    assert chunk['cliques'].tolist() == [10, 20, 0]
+    assert chunk['conversoes'].dtype == 'int32'
+    assert chunk['custo_total'].tolist() == [50.0, 0.0, 60.0]
+    assert chunk['receita'].sum() == 400.0
+
+
+def test_blank_and_decimal_counts_in_csv_chunks():
+    _check_numbers(list(read_csv_chunks(io.StringIO(NUMBERS_CSV))))
+
+
+def test_blank_and_decimal_counts_in_columnar_cache(tmp_path):
+    path = cache_csv(io.BytesIO(NUMBERS_CSV.encode()), name='contagens.csv', cache_dir=tmp_path)
+    _check_numbers(list(iter_chunks(path)))
+    cube = build_cube(iter_chunks(path), table=CodeTable())
+    assert cube.rollup().iloc[0]['conversoes'] == 3
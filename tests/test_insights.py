@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.insights import benjamini_hochberg, contingency_tensor, mine_insights
+from campaign_analytics.schema import CodeTable
+
+
+def _cube():
+    rng = np.random.default_rng(0)
+    n = 4_000
+    canal = rng.choice(['Meta Ads', 'Google Ads', 'TikTok Ads'], n)
+    # TikTok só usa um CTA: o par canal × cta dele repete o segmento do canal
+    cta = np.where(canal == 'TikTok Ads', 'Baixe agora', rng.choice(['Saiba mais', 'Comece grátis'], n))
+    cliques = rng.integers(50, 100, n)
+    rate = np.where(canal == 'Meta Ads', 0.2, 0.1)
+    df = pd.DataFrame({
+        'canal': canal,
+        'cta': cta,
+        'pais': 'Brasil',
+        'impressoes': cliques * 20,
+        'cliques': cliques,
+        'conversoes': rng.binomial(cliques, rate),
+        'custo_total': cliques * 1.5,
+    })
+    return Cube(['canal', 'cta', 'pais'], CodeTable()).update(df)
+
+
+def test_contingency_tensor_only_has_present_values():
+    table = CodeTable()
+    table.codes('pais', [f'p{i}' for i in range(500)])
+    cube = Cube(['canal', 'cta', 'pais'], table)
+    cube.cells = _cube().cells
+    tensors, levels = contingency_tensor(cube, ['cliques'])
+    assert tensors['cliques'].shape == (3, 3, 1)
+    assert tensors['cliques'].sum() == cube.cells['cliques'].sum()
+
+
+def test_single_valued_dimensions_and_redundant_pairs_are_skipped():
+    findings = mine_insights(_cube())
+    assert not findings['dimensoes'].str.contains('pais').any()
+    assert 'TikTok Ads + Baixe agora' not in set(findings['segmento'])
+    assert 'Baixe agora' in set(findings['segmento'])
+    assert {'Meta Ads + Saiba mais', 'Meta Ads + Comece grátis'} <= set(findings['segmento'])
+    meta = findings.set_index('segmento').loc['Meta Ads']
+    assert meta['significativo'] and meta['lift'] > 0
+
+
+def _bh_reference(p_values):
+    # Definição direta: q_(i) = min_{j >= i} p_(j) * n / j, limitado a 1
+    n = len(p_values)
+    order = sorted(range(n), key=lambda i: p_values[i])
+    q = [0.0] * n
+    for rank, i in enumerate(order, start=1):
+        q[i] = min(1.0, min(p_values[order[j - 1]] * n / j for j in range(rank, n + 1)))
+    return q
+
+
+@pytest.mark.parametrize('p_values', [
+    [0.01, 0.04, 0.03, 0.005],
+    [0.5, 0.5, 0.001, 0.9, 0.04, 0.04],
+    list(np.random.default_rng(1).uniform(0, 0.2, 50)),
+])
+def test_benjamini_hochberg_matches_definition(p_values):
+    np.testing.assert_allclose(benjamini_hochberg(p_values), _bh_reference(p_values))
+
+
+def test_benjamini_hochberg_known_values():
+    # Exemplo clássico: p ordenados e q-valores conhecidos
+    q = benjamini_hochberg([0.01, 0.02, 0.03, 0.04, 0.05])
+    np.testing.assert_allclose(q, [0.05] * 5)
+    assert len(benjamini_hochberg([])) == 0
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from campaign_analytics.live import (
+    CLICK, CONVERSION, EVENT_DTYPE, IMPRESSION, EventTail, LiveFeed, MinuteWindow, append_events,
+)
+
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % 60
+
+
+def _events(ts, kind=IMPRESSION, channel=0, cost=1.0, revenue=0.0):
+    events = np.zeros(len(ts), dtype=EVENT_DTYPE)
+    events['ts'] = ts
+    events['kind'] = kind
+    events['channel'] = channel
+    events['cost'] = cost
+    events['revenue'] = revenue
+    return events
+
+
+def test_partial_trailing_record_waits_for_the_rest(tmp_path):
+    path = tmp_path / 'events.bin'
+    data = _events([T0, T0 + 1, T0 + 2]).tobytes()
+    path.write_bytes(data[:2 * EVENT_DTYPE.itemsize + 5])
+    tail = EventTail(path)
+    assert len(tail.read()) == 2
+    assert len(tail.read()) == 0
+    with open(path, 'ab') as f:
+        f.write(data[2 * EVENT_DTYPE.itemsize + 5:])
+    last = tail.read()
+    assert len(last) == 1 and last['ts'][0] == T0 + 2
+
+
+def test_truncated_or_rewritten_file_is_read_from_the_start(tmp_path):
+    path = tmp_path / 'events.bin'
+    append_events(_events(T0 + np.arange(10)), path)
+    tail = EventTail(path)
+    assert len(tail.read()) == 10
+
+    # Truncado e menor que a posição lida
+    path.write_bytes(b'')
+    append_events(_events([T0 + 100]), path)
+    assert tail.read()['ts'].tolist() == [T0 + 100]
+
+    # Recomeçado e já maior que a posição lida: o primeiro registro mudou
+    path.write_bytes(b'')
+    append_events(_events(T0 + 200 + np.arange(5)), path)
+    assert tail.read()['ts'].tolist() == (T0 + 200 + np.arange(5)).tolist()
+
+
+def test_new_feed_starts_at_the_window_and_polls_are_bounded(tmp_path):
+    path = tmp_path / 'events.bin'
+    # Duas horas de eventos, um por segundo
+    append_events(_events(T0 + np.arange(7_200)), path)
+    now = T0 + 7_200
+    feed = LiveFeed(path, minutes=60, now=now)
+    # A janela vai do minuto atual (ainda sem eventos) aos 59 anteriores
+    assert feed.tail.offset == 3_660 * EVENT_DTYPE.itemsize
+    assert feed.poll(max_events=1_000, now=now) == 1_000
+    assert feed.poll(now=now) == 2_540
+    assert feed.window.totals()['spend'] == pytest.approx(3_540)
+
+
+def test_ring_wraparound_reuses_slots():
+    window = MinuteWindow(channels=['a', 'b'], minutes=3)
+    for minute in range(7):
+        window.add(_events([T0 + 60 * minute + 1], channel=minute % 2, cost=minute + 1))
+    series = window.series()
+    # Só os 3 últimos minutos, em ordem, cada um com o seu evento
+    assert series['spend'].tolist() == [5.0, 6.0, 7.0]
+    assert list(series['date']) == list(np.array([T0 + 60 * m for m in (4, 5, 6)]).astype('datetime64[s]'))
+    # Evento de um minuto que já saiu da janela é ignorado
+    window.add(_events([T0 + 60 * 2 + 5]))
+    assert window.totals()['spend'] == 18.0
+
+
+def test_window_follows_the_clock_without_events(tmp_path):
+    path = tmp_path / 'events.bin'
+    append_events(np.concatenate([
+        _events(T0 + np.arange(0, 10, 0.01)),
+        _events([T0 + 5], kind=CLICK, cost=0.0),
+        _events([T0 + 6], kind=CONVERSION, cost=0.0, revenue=150.0),
+    ]), path)
+    feed = LiveFeed(path, minutes=2, now=T0 + 10)
+    feed.poll(now=T0 + 10)
+    totals = feed.window.totals()
+    assert totals['conversions'] == 1 and totals['cac'] == pytest.approx(1_000)
+    assert feed.rate == pytest.approx(100, rel=0.02)
+
+    # Produtor parado: a taxa zera e, passada a janela, os totais também
+    feed.poll(now=T0 + 20)
+    assert feed.rate == 0.0
+    feed.poll(now=T0 + 200)
+    totals = feed.window.totals()
+    assert totals['conversions'] == 0 and np.isnan(totals['cac'])
+    assert feed.window.series().empty
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.metrics import grouped_metrics, grouped_sums, ratio_metrics
+
+
+def _frame(n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        # Código -1 = valor ausente (linha fora dos grupos)
+        'canal': pd.Categorical.from_codes(rng.integers(-1, 4, n), ['a', 'b', 'c', 'd']),
+        # Dicionário grande com poucos valores presentes
+        'pais': pd.Categorical.from_codes(rng.integers(0, 3, n) * 5_000, [f'p{i:05d}' for i in range(15_001)]),
+        'cta': pd.Categorical.from_codes(rng.integers(0, 2_000, n), [f'c{i:04d}' for i in range(2_000)]),
+        'cliques': rng.integers(0, 50, n),
+        'custo_total': rng.random(n) * 100,
+    })
+
+
+def _reference(df, by):
+    grouped = df.groupby(by, observed=True, sort=True)
+    sums = grouped[['cliques', 'custo_total']].sum().astype('float64')
+    sums['linhas'] = grouped.size()
+    return sums
+
+
+@pytest.mark.parametrize('by', [['canal'], ['canal', 'pais'], ['pais', 'cta'], ['canal', 'pais', 'cta']])
+def test_grouped_sums_matches_groupby(by):
+    df = _frame()
+    got = grouped_sums(df, by, ['cliques', 'custo_total'], count_column='linhas')
+    expected = _reference(df, by)
+    assert list(got.index) == list(expected.index)
+    np.testing.assert_allclose(got[['cliques', 'custo_total']], expected[['cliques', 'custo_total']])
+    np.testing.assert_array_equal(got['linhas'], expected['linhas'])
+
+
+def test_grouped_sums_fallback_for_text_columns():
+    df = _frame().assign(canal=lambda d: d['canal'].astype(object))
+    got = grouped_sums(df, ['canal', 'pais'], ['cliques', 'custo_total'], count_column='linhas')
+    expected = _reference(df, ['canal', 'pais'])
+    np.testing.assert_allclose(got, expected)
+
+
+def test_grouped_metrics_are_ratios_of_group_sums():
+    df = _frame().assign(
+        impressoes=lambda d: d['cliques'] * 30,
+        conversoes=lambda d: d['cliques'] // 10,
+    )
+    got = grouped_metrics(df, 'canal', ['ctr', 'cac'])
+    sums = df.groupby('canal', observed=True)[['cliques', 'impressoes', 'conversoes', 'custo_total']].sum()
+    np.testing.assert_allclose(got['ctr'], sums['cliques'] / sums['impressoes'])
+    np.testing.assert_allclose(got['cac'], sums['custo_total'] / sums['conversoes'])
+
+
+def test_ratio_metrics_zero_denominator():
+    sums = pd.DataFrame({'custo_total': [10.0, 5.0, 0.0], 'conversoes': [2, 0, 0]})
+    got = ratio_metrics(sums, ['cac'])
+    assert got['cac'].iloc[0] == 5.0
+    assert got['cac'].iloc[1:].isna().all()
+    assert ratio_metrics(sums, ['cac'], zero_division=0.0)['cac'].tolist() == [5.0, 0.0, 0.0]
+    # Métrica sem as colunas necessárias fica vazia
+    assert ratio_metrics(sums, ['ctr'])['ctr'].isna().all()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.optimizer import MIN_BUDGET_FRACTION, optimize_budget
+
+
+@pytest.fixture
+def channel_df():
+    return pd.DataFrame({
+        'channel': ['A', 'B', 'C'],
+        'spend': [100_000.0, 60_000.0, 40_000.0],
+        'conversions': [2_000.0, 1_500.0, 500.0],
+    })
+
+
+def test_feasible_budget_survives_larger_multiplier(channel_df):
+    # Alvo atingido com o orçamento atual continua atingido (com o mesmo
+    # orçamento e CAC) quando o multiplicador sobe
+    base = optimize_budget(channel_df, budget_multiplier=1.0, target_cac=40.0, mode='Conservative')
+    assert base['target_met']
+    for multiplier in (1.5, 2.0):
+        result = optimize_budget(channel_df, budget_multiplier=multiplier, target_cac=40.0, mode='Conservative')
+        assert result['target_met']
+        assert result['projected_cac'] <= 40.0
+        assert result['projected_cac'] == pytest.approx(base['projected_cac'], rel=1e-3)
+        assert result['budget'] == pytest.approx(base['budget'], rel=1e-3)
+
+
+def test_unreachable_target_reports_lowest_cac(channel_df):
+    result = optimize_budget(channel_df, budget_multiplier=2.0, target_cac=1.0, mode='Conservative')
+    assert not result['target_met']
+    # O CAC cresce com o orçamento: o menor CAC projetado está no piso da grade
+    assert result['budget'] == pytest.approx(channel_df['spend'].sum() * MIN_BUDGET_FRACTION)
+    for multiplier in (0.5, 1.0, 2.0):
+        other = optimize_budget(channel_df, budget_multiplier=multiplier, mode='Conservative')
+        assert result['projected_cac'] <= other['projected_cac']
+    assert result['projected_cac'] < result['current_cac']
+
+
+def test_budget_is_fully_allocated(channel_df):
+    result = optimize_budget(channel_df, budget_multiplier=1.3, mode='Balanced')
+    allocation = result['allocation']
+    assert allocation['optimized_spend'].sum() == pytest.approx(result['budget'], rel=1e-6)
+    assert np.all(allocation['optimized_spend'] > 0)
+
+
+def test_allocation_matches_brute_force(channel_df):
+    # Duas unidades: varre todas as divisões do orçamento dentro dos limites
+    two = channel_df.head(2)
+    result = optimize_budget(two, budget_multiplier=1.0, mode='Aggressive')
+    allocation = result['allocation']
+    b = allocation['elasticity'].to_numpy()
+    spend = two['spend'].to_numpy()
+    a = two['conversions'].to_numpy() / spend ** b
+    budget = result['budget']
+    shares = spend / spend.sum()
+    low, high = budget * shares * (1 - 0.75), budget * shares * (1 + 0.75)
+    first = np.linspace(max(low[0], budget - high[1]), min(high[0], budget - low[1]), 200_001)
+    conversions = a[0] * first ** b[0] + a[1] * (budget - first) ** b[1]
+    best = conversions.max()
+    assert allocation['projected_conversions'].sum() == pytest.approx(best, rel=1e-7)
+    assert allocation['optimized_spend'].iloc[0] == pytest.approx(first[conversions.argmax()], rel=1e-3)
+
+
+@pytest.mark.parametrize('row', [
+    {'channel': 'D', 'spend': 30_000.0, 'conversions': 0.0},
+    {'channel': 'D', 'spend': 0.0, 'conversions': 50.0},
+])
+def test_units_without_a_curve_keep_current_spend(channel_df, row):
+    df = pd.concat([channel_df, pd.DataFrame([row])], ignore_index=True)
+    result = optimize_budget(df, budget_multiplier=1.0, target_cac=60.0, mode='Balanced')
+    allocation = result['allocation'].set_index('channel')
+    assert np.isfinite(result['projected_cac']) and result['target_met']
+    assert allocation.loc['D', 'optimized_spend'] == row['spend']
+    assert allocation.loc['D', 'projected_conversions'] == row['conversions']
+    assert np.isnan(allocation.loc['D', 'elasticity'])
+    # O resto se comporta como a alocação sem a unidade, com o investimento dela somado
+    assert allocation['optimized_spend'].sum() == pytest.approx(result['budget'])
+    projected = allocation['projected_conversions'].sum()
+    assert result['projected_cac'] == pytest.approx(result['budget'] / projected)
+
+
+def test_no_unit_with_a_curve_is_an_error():
+    df = pd.DataFrame({'channel': ['A', 'B'], 'spend': [100.0, 0.0], 'conversions': [0.0, 0.0]})
+    with pytest.raises(ValueError):
+        optimize_budget(df)
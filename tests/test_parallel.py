@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.parallel import aggregate_shards
+
+
+def test_worker_processes_match_a_single_process(tmp_path):
+    df = generate_campaigns(3_000, seed=0)
+    for i in range(4):
+        df.iloc[i * 750:(i + 1) * 750].to_csv(tmp_path / f'shard-{i}.csv', index=False)
+
+    serial = aggregate_shards(tmp_path, workers=1)
+    parallel = aggregate_shards(tmp_path, workers=2)
+    assert serial.rows == parallel.rows == 3_000
+    pd.testing.assert_frame_equal(serial.cells.sort_index(), parallel.cells.sort_index())
+    assert serial.rollup().iloc[0]['conversoes'] == df['conversoes'].sum()
+    assert serial.rollup().iloc[0]['custo_total'] == pytest.approx(df['custo_total'].sum(), rel=1e-6)
@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from campaign_analytics.precompute import Precomputer
+from campaign_analytics.shared_cache import SharedCache
+
+
+def _wait(precomputer, key):
+    while precomputer.pending([key]):
+        threading.Event().wait(0.01)
+
+
+def test_failed_computation_is_retried_on_next_submit():
+    precomputer = Precomputer(SharedCache(), workers=1)
+    attempts = []
+
+    def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError('falha temporária')
+        return 42
+
+    precomputer.submit('aba', compute)
+    _wait(precomputer, 'aba')
+    with pytest.raises(ValueError):
+        precomputer.result('aba')
+    # O erro não fica guardado: sem novo submit, a chave simplesmente não existe
+    assert precomputer.result('aba', 'vazio') == 'vazio'
+
+    precomputer.submit('aba', compute)
+    _wait(precomputer, 'aba')
+    assert precomputer.result('aba') == 42
+    assert len(attempts) == 2
+    # Servido pelo cache a partir daqui, sem recalcular
+    precomputer.submit('aba', compute)
+    assert precomputer.result('aba') == 42
+    assert len(attempts) == 2
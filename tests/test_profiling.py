@@ -0,0 +1,55 @@
+import tracemalloc
+
+import pytest
+
+from campaign_analytics.profiling import Profiler
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_tracing_stops_when_the_last_profiler_closes():
+    first, second = Profiler(enabled=True), Profiler(enabled=True)
+    assert tracemalloc.is_tracing()
+    first.close()
+    first.close()
+    assert tracemalloc.is_tracing()
+    with second.stage('ainda medindo'):
+        pass
+    second.close()
+    assert not tracemalloc.is_tracing()
+    assert second.records[0]['peak_mb'] is not None
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    profiler = Profiler(enabled=True)
+    profiler.close()
+    assert tracemalloc.is_tracing()
+
+
+def test_close_runs_when_the_script_stops_early():
+    profiler = Profiler(enabled=True)
+    with pytest.raises(RuntimeError):
+        try:
+            with profiler.stage('load'):
+                raise RuntimeError('st.stop()')
+        finally:
+            profiler.close()
+    assert not tracemalloc.is_tracing()
+    assert [record['stage'] for record in profiler.records] == ['load']
+
+
+def test_disabled_profiler_does_not_trace():
+    profiler = Profiler(enabled=False)
+    assert not tracemalloc.is_tracing()
+    with profiler.stage('nada') as stage:
+        stage.rows = 10
+    profiler.close()
+    assert profiler.records == []
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.reports import REPORTS, compute_reports, report
+from campaign_analytics.schema import CodeTable
+from campaign_analytics.uncertainty import metric_intervals
+
+
+@pytest.fixture(scope='module')
+def cube():
+    return Cube(table=CodeTable()).update(generate_campaigns(5_000, seed=11))
+
+
+def test_reports_are_rollups_with_only_their_metrics(cube):
+    tables = compute_reports(cube)
+    assert list(tables) == list(REPORTS)
+    for name, (dims, metrics) in REPORTS.items():
+        assert list(tables[name].columns) == dims + metrics
+        expected = cube.metrics(dims, metrics)[metrics].reset_index()
+        np.testing.assert_allclose(tables[name][metrics], expected[metrics])
+
+
+def test_intervals_come_from_uncertainty(cube):
+    table = report(cube, 'roas_por_canal', intervals=True)
+    assert list(table.columns) == ['canal', 'roas', 'cac', 'ctr', 'roas_min', 'roas_max',
+                                   'cac_min', 'cac_max', 'ctr_min', 'ctr_max']
+    for metric in ['roas', 'cac', 'ctr']:
+        expected = metric_intervals(cube, ['canal'], metric).reset_index()
+        np.testing.assert_allclose(table[f'{metric}_min'], expected[f'{metric}_min'])
+        np.testing.assert_allclose(table[f'{metric}_max'], expected[f'{metric}_max'])
@@ -0,0 +1,59 @@
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from campaign_analytics.schema import CodeTable
+
+
+def test_codes_are_stable_and_missing_is_minus_one(tmp_path):
+    table = CodeTable.load(tmp_path / 'codigos.json')
+    codes = table.codes('canal', ['b', 'a', None, 'b'])
+    np.testing.assert_array_equal(codes, [0, 1, -1, 0])
+    # Outra instância lê os mesmos códigos do arquivo
+    again = CodeTable.load(tmp_path / 'codigos.json')
+    np.testing.assert_array_equal(again.codes('canal', ['a', 'b', 'c']), [1, 0, 2])
+
+
+def test_tables_sharing_a_file_never_reuse_a_code(tmp_path):
+    # Várias instâncias (como processos diferentes) acrescentando ao mesmo arquivo
+    path = tmp_path / 'codigos.json'
+
+    def add(worker):
+        table = CodeTable.load(path)
+        values = [f'w{worker}-{i}' for i in range(20)] + ['comum']
+        return dict(zip(values, table.codes('pais', values).tolist()))
+
+    with ThreadPoolExecutor(8) as pool:
+        assigned = list(pool.map(add, range(8)))
+
+    stored = json.loads(path.read_text(encoding='utf-8'))['pais']
+    assert len(stored) == len(set(stored)) == 8 * 20 + 1
+    for codes in assigned:
+        for value, code in codes.items():
+            assert stored[code] == value
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_table_without_path_never_writes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    CodeTable().codes('canal', ['x', 'y'])
+    assert not list(tmp_path.iterdir())
+
+
+def test_saved_table_gets_the_default_file_mode(tmp_path):
+    path = tmp_path / 'codigos.json'
+    CodeTable.load(path).codes('canal', ['a'])
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+
+def test_dimension_with_more_than_int16_values():
+    table = CodeTable()
+    values = [f'texto {i}' for i in range(40_000)]
+    codes = table.codes('texto_criativo', values)
+    np.testing.assert_array_equal(codes, np.arange(40_000))
+    assert table.categorical('texto_criativo', values[-2:]).codes.tolist() == [39_998, 39_999]
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.scoring import FEATURES, L2_PENALTY, ScoringModel, labels, score_csv
+
+
+@pytest.fixture(scope='module')
+def training():
+    rng = np.random.default_rng(5)
+    n = 3_000
+    df = pd.DataFrame({
+        col: rng.choice([f'{col}-{i}' for i in range(size)], n)
+        for col, size in zip(FEATURES, [3, 4, 3, 5, 4])
+    })
+    # Conversões mais frequentes em alguns canais e CTAs
+    rate = 1.5 + (df['canal'] == 'canal-0') * 2.0 + (df['cta'] == 'cta-1') * 1.0
+    df['conversoes'] = rng.poisson(rate)
+    return df, ScoringModel.fit(df)
+
+
+def _reference_fit(df):
+    # Regressão logística linha a linha (one-hot + intercepto), Newton com a mesma penalidade L2
+    blocks = [pd.get_dummies(df[col].astype(str)).sort_index(axis=1) for col in FEATURES]
+    design = np.column_stack([np.ones(len(df))] + [block.to_numpy(dtype='float64') for block in blocks])
+    y = labels(df)
+    penalty = np.full(design.shape[1], L2_PENALTY)
+    penalty[0] = 0.0
+    beta = np.zeros(design.shape[1])
+    for _ in range(50):
+        p = 1.0 / (1.0 + np.exp(-design @ beta))
+        hessian = (design * (p * (1 - p))[:, None]).T @ design + np.diag(penalty)
+        beta += np.linalg.solve(hessian, design.T @ (y - p) - penalty * beta)
+    return beta, [list(block.columns) for block in blocks]
+
+
+def test_fit_matches_row_level_logistic_regression(training):
+    df, model = training
+    beta, columns = _reference_fit(df)
+    assert model.intercept == pytest.approx(beta[0], abs=1e-6)
+    offset = 1
+    for col, names in zip(FEATURES, columns):
+        expected = dict(zip(names, beta[offset:offset + len(names)]))
+        got = dict(zip(map(str, model.categories[col]), model.weights[col][:-1]))
+        assert got == pytest.approx(expected, abs=1e-6)
+        offset += len(names)
+
+
+def test_save_load_round_trip(training, tmp_path):
+    df, model = training
+    loaded = ScoringModel.load(model.save(tmp_path / 'modelo.npz'))
+    assert loaded.categories == model.categories
+    np.testing.assert_allclose(loaded.predict_proba(df), model.predict_proba(df))
+    assert not list(tmp_path.glob('*.tmp*'))
+
+
+def test_unknown_categories_weigh_zero(training):
+    _, model = training
+    known = {col: model.categories[col][0] for col in FEATURES}
+    row = pd.DataFrame([known])
+    unknown = row.assign(canal='Canal novo')
+    # Mesma linha com o canal trocado por um desconhecido: só o peso do canal some
+    logit = lambda p: np.log(p / (1 - p))
+    difference = logit(model.predict_proba(row))[0] - logit(model.predict_proba(unknown))[0]
+    assert difference == pytest.approx(model.weights['canal'][0])
+    # Categórica com valores fora do modelo e coluna ausente
+    categorical = unknown.astype('category').drop(columns='cta')
+    assert np.isfinite(model.predict_proba(categorical)).all()
+
+
+def test_score_csv_streams_chunks(training, tmp_path):
+    df, model = training
+    source = io.StringIO(df.rename_axis('id').reset_index().to_csv(index=False))
+    output = tmp_path / 'previsoes.csv'
+    assert score_csv(source, output, chunksize=700, model=model) == len(df)
+    scored = pd.read_csv(output)
+    assert list(scored.columns) == ['id'] + FEATURES + ['probabilidade_sucesso', 'bom_desempenho']
+    np.testing.assert_allclose(scored['probabilidade_sucesso'], model.predict_proba(df), rtol=1e-6)
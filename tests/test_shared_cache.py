@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from campaign_analytics.shared_cache import SharedCache
+
+
+def _array(kb):
+    return np.zeros(kb * 1024 // 8)
+
+
+def test_hits_misses_and_read_only_arrays():
+    cache = SharedCache()
+    first = cache.get('a', lambda: _array(1))
+    again = cache.get('a', lambda: pytest.fail("recalculado"))
+    assert again is first
+    assert not first.flags.writeable
+    assert cache.peek('b') is None and 'b' not in cache
+    assert cache.stats() == {'entries': 1, 'nbytes': 1024, 'max_bytes': cache.max_bytes,
+                             'hits': 1, 'misses': 1, 'evictions': 0}
+
+
+def test_lru_eviction_is_bounded_by_bytes():
+    cache = SharedCache(max_bytes=3 * 1024)
+    for key in 'abc':
+        cache.get(key, lambda: _array(1))
+    # 'a' usado agora: o menos recente passa a ser 'b'
+    cache.get('a', lambda: _array(1))
+    cache.get('d', lambda: _array(1))
+    assert 'b' not in cache and all(key in cache for key in 'acd')
+    assert cache.nbytes == 3 * 1024
+
+    cache.get('grande', lambda: _array(2))
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.stats()['evictions'] == 3
+    # Maior que o limite inteiro: devolvido, mas não guardado
+    assert len(cache.get('enorme', lambda: _array(4))) == 512
+    assert 'enorme' not in cache and 'grande' in cache
+
+
+def test_concurrent_gets_compute_once():
+    cache = SharedCache()
+    calls = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return _array(1)
+
+    def get(_):
+        start.wait()
+        return cache.get('k', compute)
+
+    with ThreadPoolExecutor(8) as pool:
+        values = list(pool.map(get, range(8)))
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 7
+
+
+def test_failed_compute_is_not_cached():
+    cache = SharedCache()
+    with pytest.raises(RuntimeError):
+        cache.get('k', lambda: (_ for _ in ()).throw(RuntimeError("falhou")))
+    assert 'k' not in cache and not cache._pending
+    assert cache.get('k', lambda: 1) == 1
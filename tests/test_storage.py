@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from campaign_analytics import storage
+from campaign_analytics.storage import cache_csv, load_columns
+
+CSV = "canal,impressoes,cliques,custo_total\nMeta Ads,100,5,10.0\nGoogle Ads,200,8,{custo}\n"
+
+
+def _write(path, custo=20.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(CSV.format(custo=custo), encoding='utf-8')
+    return path
+
+
+def test_new_version_replaces_only_the_same_source(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    # Mesmo nome em outra pasta e nome que começa igual: caches independentes
+    first = cache_csv(_write(tmp_path / 'a' / 'd.csv'), cache_dir=cache_dir)
+    other_dir = cache_csv(_write(tmp_path / 'b' / 'd.csv', 30.0), cache_dir=cache_dir)
+    similar = cache_csv(_write(tmp_path / 'a' / 'd-x.csv'), cache_dir=cache_dir)
+
+    updated = cache_csv(_write(tmp_path / 'a' / 'd.csv', 99.0), cache_dir=cache_dir)
+    assert updated != first and not first.exists()
+    assert other_dir.exists() and similar.exists()
+    assert load_columns(updated)['custo_total'].tolist() == [10.0, 99.0]
+    assert not list(cache_dir.glob('*.tmp'))
+
+
+def test_failed_conversion_leaves_no_temporary_file(tmp_path):
+    source = tmp_path / 'ruim.csv'
+    source.write_text("canal,impressoes\nMeta Ads,não é número\n", encoding='utf-8')
+    with pytest.raises(Exception):
+        cache_csv(source, cache_dir=tmp_path / 'cache')
+    assert not list((tmp_path / 'cache').iterdir())
+
+
+def test_upload_entries_are_capped(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    first = cache_csv(io.BytesIO(CSV.format(custo=1.0).encode()), cache_dir=cache_dir)
+    monkeypatch.setattr(storage, 'UPLOAD_CACHE_BYTES', int(first.stat().st_size * 2.5))
+    paths = [first] + [
+        cache_csv(io.BytesIO(CSV.format(custo=float(custo)).encode()), cache_dir=cache_dir)
+        for custo in range(2, 6)
+    ]
+    remaining = sorted(cache_dir.glob('upload-*.arrow'))
+    assert len(remaining) == 2
+    assert paths[-1].exists() and paths[-2].exists()
+
+
+def test_known_digest_skips_rehashing(tmp_path, monkeypatch):
+    upload = io.BytesIO(CSV.format(custo=20.0).encode())
+    upload.name = 'dados.csv'
+    digest = storage.content_hash(upload)
+    first = cache_csv(upload, cache_dir=tmp_path)
+
+    def no_hash(source):
+        raise AssertionError("conteúdo relido")
+
+    monkeypatch.setattr(storage, 'content_hash', no_hash)
+    assert cache_csv(upload, cache_dir=tmp_path, digest=digest) == first
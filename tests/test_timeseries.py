@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.timeseries import TimeSeriesStore, ingest_csv
+
+
+@pytest.fixture
+def daily():
+    rng = np.random.default_rng(0)
+    # 2024-01-10 (quarta) a 2024-04-09 (terça): semanas e meses incompletos nas pontas
+    dates = pd.date_range('2024-01-10', '2024-04-09', freq='D')
+    frames = []
+    for channel in ('Meta Ads', 'Google Ads'):
+        frames.append(pd.DataFrame({
+            'date': dates,
+            'channel': channel,
+            'spend': rng.uniform(100, 200, len(dates)).round(2),
+            'conversions': rng.integers(0, 10, len(dates)).astype(float),
+            'revenue': rng.uniform(0, 500, len(dates)).round(2),
+            'impressions': rng.integers(1000, 2000, len(dates)).astype(float),
+            'clicks': rng.integers(10, 50, len(dates)).astype(float),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def store(tmp_path, daily):
+    store = TimeSeriesStore(tmp_path / 'series.sqlite')
+    # Gravado em duas partes: os rollups da semana/mês na emenda somam as duas
+    split = pd.Timestamp('2024-02-14')
+    store.write(daily[daily['date'] < split])
+    store.write(daily[daily['date'] >= split])
+    return store
+
+
+@pytest.mark.parametrize('granularity, freq', [('week', 'W-SUN'), ('month', 'M')])
+def test_rollups_match_resampled_days(store, daily, granularity, freq):
+    expected = (
+        daily.assign(date=daily['date'].dt.to_period(freq).dt.start_time)
+        .groupby('date')[['spend', 'conversions', 'revenue']].sum()
+    )
+    got = store.query(granularity=granularity).set_index('date')
+    assert list(got.index) == list(expected.index)
+    np.testing.assert_allclose(got[['spend', 'conversions', 'revenue']], expected)
+    np.testing.assert_allclose(got['cac'], expected['spend'] / expected['conversions'])
+
+
+def test_last_days_window_edges(store, daily):
+    window = store.last(7)
+    assert len(window) == 7
+    assert window['date'].min() == pd.Timestamp('2024-04-03')
+    assert window['date'].max() == pd.Timestamp('2024-04-09')
+    expected = daily[daily['date'] >= '2024-04-03'].groupby('date')['spend'].sum()
+    np.testing.assert_allclose(window['spend'], expected)
+
+
+def test_last_includes_whole_first_period(store):
+    # 2024-04-03 é uma quarta: a semana inteira (desde segunda, 04-01) entra,
+    # e a última semana (04-08, ainda incompleta) também
+    weeks = store.last(7, granularity='week')
+    assert list(weeks['date']) == [pd.Timestamp('2024-04-01'), pd.Timestamp('2024-04-08')]
+    assert weeks['spend'].iloc[-1] == pytest.approx(store.last(2)['spend'].sum())
+    months = store.last(45, granularity='month')
+    assert list(months['date']) == [pd.Timestamp('2024-02-01'), pd.Timestamp('2024-03-01'), pd.Timestamp('2024-04-01')]
+
+
+def test_ingest_sums_repeated_days_across_chunks(tmp_path):
+    csv = tmp_path / 'eventos.csv'
+    csv.write_text(
+        "data,canal,custo_total,conversoes,tipo_criativo\n"
+        "2024-05-01,Meta Ads,10.0,1,vídeo\n"
+        "2024-05-02,Meta Ads,5.0,0,vídeo\n"
+        "2024-05-01,Meta Ads,2.5,1,imagem\n"
+        "2024-05-01 18:30,Google Ads,7.0,0,imagem\n",
+        encoding='utf-8',
+    )
+    store = TimeSeriesStore(tmp_path / 'series.sqlite')
+    assert ingest_csv(csv, store, chunksize=2) == 3
+    got = store.query(by_channel=True).set_index(['date', 'channel'])
+    assert got.loc[(pd.Timestamp('2024-05-01'), 'Meta Ads'), 'spend'] == 12.5
+    assert got.loc[(pd.Timestamp('2024-05-01'), 'Meta Ads'), 'conversions'] == 2
+    assert got.loc[(pd.Timestamp('2024-05-01'), 'Google Ads'), 'spend'] == 7.0
+    assert got['revenue'].sum() == 0
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from campaign_analytics.cube import Cube
+from campaign_analytics.generator import generate_campaigns
+from campaign_analytics.metrics import RATIOS
+from campaign_analytics.schema import CodeTable
+from campaign_analytics.uncertainty import bootstrap_intervals, rate_intervals, wilson_interval
+
+
+def _wilson(successes, trials, z=1.959963984540054):
+    # Fórmula de Wilson escrita termo a termo
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = p + z ** 2 / (2 * trials)
+    margin = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2))
+    return (center - margin) / denominator, (center + margin) / denominator
+
+
+@pytest.mark.parametrize('successes, trials', [(0, 10), (5, 10), (10, 10), (3, 1000), (480, 500)])
+def test_wilson_matches_formula(successes, trials):
+    low, high = wilson_interval([successes], [trials])
+    expected = _wilson(successes, trials)
+    assert low[0] == pytest.approx(expected[0], abs=1e-12)
+    assert high[0] == pytest.approx(expected[1], abs=1e-12)
+
+
+def test_wilson_known_values_and_empty_groups():
+    low, high = wilson_interval([0, 5, 1], [10, 10, 0])
+    np.testing.assert_allclose(low[:2], [0.0, 0.236593], atol=1e-6)
+    np.testing.assert_allclose(high[:2], [0.277533, 0.763407], atol=1e-6)
+    assert np.isnan(low[2]) and np.isnan(high[2])
+
+
+@pytest.fixture(scope='module')
+def campaigns():
+    df = generate_campaigns(20_000, seed=3)
+    return df, Cube(['canal', 'tipo_criativo'], CodeTable()).update(df)
+
+
+def test_rate_intervals_use_group_totals(campaigns):
+    df, cube = campaigns
+    table = rate_intervals(cube, 'canal', 'ctr')
+    sums = df.groupby('canal', observed=True)[['cliques', 'impressoes']].sum()
+    sums = sums.set_axis(sums.index.astype(str)).loc[table.index]
+    expected = [_wilson(c, i) for c, i in zip(sums['cliques'], sums['impressoes'])]
+    np.testing.assert_allclose(table['ctr_min'], [e[0] for e in expected], rtol=1e-9)
+    np.testing.assert_allclose(table['ctr_max'], [e[1] for e in expected], rtol=1e-9)
+
+
+def _row_bootstrap(df, by, numerator, denominator, replicates=600, seed=1):
+    # Referência: pesos de Poisson(1) por linha, somas por grupo com bincount
+    rng = np.random.default_rng(seed)
+    codes, labels = pd.factorize(df[by].astype(str), sort=True)
+    x, y = df[numerator].to_numpy(dtype='float64'), df[denominator].to_numpy(dtype='float64')
+    ratios = np.empty((replicates, len(labels)))
+    for r in range(replicates):
+        weights = rng.poisson(1.0, len(df))
+        num = np.bincount(codes, weights=weights * x, minlength=len(labels))
+        den = np.bincount(codes, weights=weights * y, minlength=len(labels))
+        ratios[r] = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+    low, high = np.nanquantile(ratios, [0.025, 0.975], axis=0)
+    return pd.DataFrame({'low': low, 'high': high}, index=labels)
+
+
+@pytest.mark.parametrize('metric', ['cac', 'roas'])
+def test_bootstrap_matches_row_level_bootstrap(campaigns, metric):
+    df, cube = campaigns
+    table = bootstrap_intervals(cube, 'canal', metric)
+    expected = _row_bootstrap(df, 'canal', *RATIOS[metric]).loc[table.index]
+    width = expected['high'] - expected['low']
+    tolerance = 0.15 * width.max()
+    np.testing.assert_allclose(table[f'{metric}_min'], expected['low'], atol=tolerance)
+    np.testing.assert_allclose(table[f'{metric}_max'], expected['high'], atol=tolerance)
+    np.testing.assert_allclose(table[f'{metric}_max'] - table[f'{metric}_min'], width, rtol=0.15)